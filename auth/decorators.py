@@ -1,21 +1,141 @@
 import logging
-from functools import wraps
 import os
-from termcolor import colored
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+
 from dotenv import load_dotenv
-from auth.web_driver import perform_authorization
 from selenium.webdriver.chrome.webdriver import WebDriver
+from termcolor import colored
 
+from auth.session_manager import replace_driver
+from auth.web_driver import get_download_dir, perform_authorization
+from utils.tracing import traced
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
 )
 
+# Login and password are read from .env once, on the first re-authorization
+_credentials: dict[str, str | None] = {}
+# Minimum time in seconds between two checks of the same session
+SESSION_CHECK_INTERVAL: float = float(os.getenv("SESSION_CHECK_INTERVAL", "30"))
+# Driver session id -> time of the last successful check
+_last_checks: dict[str, float] = {}
+# Driver session ids that must be checked on the next call, because the previous call failed
+_sessions_with_errors: set[str] = set()
+_guard_stats: dict[str, int | float] = {
+    "calls": 0,  # calls of the decorated functions
+    "checks": 0,  # checks of the session with a request to the browser
+    "reauthorizations": 0,
+    "seconds": 0.0,  # time spent by the guard itself
+}
+_guard_lock: threading.Lock = threading.Lock()
+
+
+def get_credentials() -> tuple[str | None, str | None]:
+    """Returns the login and password for authorization on site, read from .env only once.
+
+    Returns:
+        (login, password) tuple[str | None, str | None]
+    """
+    if not _credentials:
+        load_dotenv()
+        _credentials["login"] = os.getenv("SITE_LOGIN")
+        _credentials["password"] = os.getenv("SITE_PASSWORD")
+    return (_credentials["login"], _credentials["password"])
+
+
+def get_session_guard_stats() -> dict[str, int | float]:
+    """Returns the counters of check_session.
+
+    Returns:
+        dict[str, int | float]:
+            For example:
+                {"calls": 1520, "checks": 41, "reauthorizations": 0, "seconds": 0.62}
+    """
+    with _guard_lock:
+        return dict(_guard_stats)
+
+
+def reauthorize(driver: WebDriver) -> WebDriver:
+    """Closes the old driver and logs in to the site again with the same download folder,
+    so that a browser of the worker pool keeps its own folder. Then opens the "New Malden Quality Plan"
+    table, where the repeated call expects to be. The new driver replaces the old one in the session manager.
+
+    Args:
+        driver (WebDriver): The old driver.
+
+    Returns:
+        WebDriver
+    """
+    # core.navigation imports this module
+    from core.navigation import go_to_new_malden_quality_plan
+
+    download_dir: Path | None = get_download_dir(driver)
+    try:
+        driver.quit()  # Close the old driver
+    except Exception:
+        pass
+    login, password = get_credentials()
+    new_driver: WebDriver = perform_authorization(login, password, download_dir)
+    # The new session is authorized, the steps of the navigation do not check it again
+    with _guard_lock:
+        _last_checks[new_driver.session_id] = time.monotonic()
+    new_driver = go_to_new_malden_quality_plan(new_driver)
+    replace_driver(driver, new_driver)
+    with _guard_lock:
+        _guard_stats["reauthorizations"] += 1
+    return new_driver
+
+
+def guard_session(driver: WebDriver) -> WebDriver:
+    """Checks if the client is authorized, but not more often than once in SESSION_CHECK_INTERVAL seconds
+    for the same driver or right after an error in the previous call. If not authorized, re-authorizes.
+
+    Args:
+        driver (WebDriver)
+
+    Returns:
+        WebDriver: Current copy of the driver (restarted if necessary).
+    """
+    session_id: str | None = None
+    try:
+        session_id = driver.session_id
+        now: float = time.monotonic()
+        with _guard_lock:
+            _guard_stats["calls"] += 1
+            need_check: bool = (
+                session_id in _sessions_with_errors
+                or now - _last_checks.get(session_id, float("-inf")) >= SESSION_CHECK_INTERVAL
+            )
+            if need_check:
+                _guard_stats["checks"] += 1
+        if not need_check:
+            return driver
+        is_authorized: bool = driver.title != "Unauthorised"
+        if not is_authorized:
+            logging.info(colored("Session is invalid. Re-authorization...", "red"))
+    except Exception as err:
+        logging.info(colored(f"Error checking session: {err}", "red"))
+        is_authorized = False
+    if not is_authorized:
+        # Exit the old driver where the crash occurred and log in to the site again
+        driver = reauthorize(driver)
+    with _guard_lock:
+        _sessions_with_errors.discard(session_id)
+        _last_checks.pop(session_id, None)
+        _last_checks[driver.session_id] = time.monotonic()
+    return driver
+
 
 def check_session(func):
     """
     DECORATOR for check status session.
+    Each call of the function is recorded as a span of the trace.
     """
+    traced_func = traced()(func)
 
     @wraps(func)
     def wrapper(driver: WebDriver, *args, **kwargs):
@@ -25,28 +145,16 @@ def check_session(func):
         Returns:
             webdriver.Chrome - current copy of the driver (restarted if necessary).
         """
-        load_dotenv()
-        # login = "andrii.khoroshchak@leemarley.com"
-        # password = "1992d1992D!"
-        login = os.getenv("SITE_LOGIN")
-        password = os.getenv("SITE_PASSWORD")
-        print(os)
+        start: float = time.perf_counter()
+        driver = guard_session(driver)
+        with _guard_lock:
+            _guard_stats["seconds"] += time.perf_counter() - start
         try:
-            # if "login" in driver.current_url or driver.title == "Unauthorised":
-            if driver.title == "Unauthorised":
-                logging.info(
-                    colored("Session is invalid. Re-authorization...", "red")
-                )
-                driver.quit()  # Close the old driver
-                driver = perform_authorization(login, password)
-            # else:
-            #     logging.info(colored("Сессия активна.", "green"))
-        except Exception as err:
-            logging.info(colored(f"Error checking session: {err}", "red"))
-            # Exit the old driver where the crash occurred
-            driver.quit()
-            # Log in to the site again
-            driver = perform_authorization(login, password)
-        return func(driver, *args, **kwargs)
+            return traced_func(driver, *args, **kwargs)
+        except Exception:
+            # Check the session on the next call, the error could be caused by a lost session
+            with _guard_lock:
+                _sessions_with_errors.add(driver.session_id)
+            raise
 
     return wrapper
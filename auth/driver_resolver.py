@@ -0,0 +1,153 @@
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from utils.lazy_import import lazy_import
+
+# ChromeDriverManager is used to install the driver without manually downloading the binary file.
+# It is imported only when the pinned driver is missing or outdated
+webdriver_manager_chrome = lazy_import("webdriver_manager.chrome")
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
+)
+
+# Commands that print the version of the installed Chrome on Linux and macOS
+CHROME_VERSION_COMMANDS: tuple[tuple[str, ...], ...] = (
+    ("google-chrome", "--version"),
+    ("google-chrome-stable", "--version"),
+    ("chromium", "--version"),
+    ("chromium-browser", "--version"),
+    ("/Applications/Google Chrome.app/Contents/MacOS/Google Chrome", "--version"),
+)
+
+# Path to chromedriver resolved in this process. Shared by all browsers of the worker pool
+_resolved: dict[str, str | None] = {"path": None}
+_resolve_lock: threading.Lock = threading.Lock()
+
+
+def get_pinned_driver_file() -> Path:
+    """Returns the JSON file with the pinned chromedriver path and its Chrome major version.
+    The file is set by the environment variable CHROMEDRIVER_PIN_FILE.
+
+    Returns:
+        Path: For example: Path("chromedriver_pin.json")
+    """
+    return Path(os.getenv("CHROMEDRIVER_PIN_FILE", "chromedriver_pin.json"))
+
+
+def parse_major_version(version: str) -> int | None:
+    """Returns the major version from a version string.
+
+    Args:
+        version (str):
+            For example:
+                "Google Chrome 124.0.6367.91"
+
+    Returns:
+        int | None: For example: 124
+    """
+    match = re.search(r"(\d+)\.\d+\.\d+", version)
+    return int(match.group(1)) if match else None
+
+
+def get_chrome_major_version() -> int | None:
+    """Returns the major version of the installed Chrome without network requests:
+    from the registry on Windows or from "chrome --version" on other systems.
+
+    Returns:
+        int | None: For example: 124. None if Chrome was not found.
+    """
+    if sys.platform == "win32":
+        import winreg
+
+        for root in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+            try:
+                with winreg.OpenKey(root, r"Software\Google\Chrome\BLBeacon") as key:
+                    version, _ = winreg.QueryValueEx(key, "version")
+                    return parse_major_version(version)
+            except OSError:
+                continue
+        return None
+    for command in CHROME_VERSION_COMMANDS:
+        try:
+            output: str = subprocess.run(
+                command, capture_output=True, text=True, timeout=10
+            ).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        major_version: int | None = parse_major_version(output)
+        if major_version is not None:
+            return major_version
+    return None
+
+
+def read_pinned_driver() -> dict | None:
+    """Reads the pinned chromedriver.
+
+    Returns:
+        dict | None:
+            For example:
+                {"path": "C:\\Users\\Human\\.wdm\\drivers\\chromedriver\\...\\chromedriver.exe", "major_version": 124}
+    """
+    try:
+        return json.loads(get_pinned_driver_file().read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def pin_driver(path: str, major_version: int | None) -> None:
+    """Saves the chromedriver path and the Chrome major version it was resolved for.
+
+    Args:
+        path (str): Path to the chromedriver binary.
+        major_version (int | None): Major version of the installed Chrome.
+    """
+    get_pinned_driver_file().write_text(
+        json.dumps({"path": path, "major_version": major_version}), encoding="utf-8"
+    )
+
+
+def resolve_chromedriver_path() -> str:
+    """Returns the path to chromedriver. The path resolved by ChromeDriverManager is pinned in a file
+    and reused while the binary exists and the major version of the installed Chrome has not changed.
+    ChromeDriverManager (network request) is called only on the first start and after a Chrome update.
+
+    Returns:
+        str: Path to the chromedriver binary.
+    """
+    with _resolve_lock:
+        if _resolved["path"] is not None:
+            return _resolved["path"]
+        start: float = time.perf_counter()
+        chrome_major_version: int | None = get_chrome_major_version()
+        pinned: dict | None = read_pinned_driver()
+        if (
+            pinned is not None
+            and Path(pinned["path"]).is_file()
+            and (
+                chrome_major_version is None
+                or pinned["major_version"] == chrome_major_version
+            )
+        ):
+            _resolved["path"] = pinned["path"]
+            logging.info(
+                f"Use the pinned chromedriver {pinned['path']} "
+                f"({time.perf_counter() - start:.2f}s)."
+            )
+            return pinned["path"]
+
+        logging.info(
+            f"Resolve chromedriver for Chrome {chrome_major_version}, pinned: {pinned}"
+        )
+        path: str = webdriver_manager_chrome.ChromeDriverManager().install()
+        pin_driver(path, chrome_major_version)
+        _resolved["path"] = path
+        logging.info(f"Resolved chromedriver {path} in {time.perf_counter() - start:.2f}s.")
+        return path
@@ -0,0 +1,181 @@
+import logging
+import time
+from pathlib import Path
+
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+from auth.session_store import (
+    delete_session_state,
+    get_profile_dir,
+    is_session_state_valid,
+    load_session_state,
+    restore_session,
+    save_session_state,
+)
+from auth.web_driver import perform_authorization
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
+)
+
+# One warm browser that is kept between the passes of the main loop
+_session: dict[str, WebDriver | str | None] = {
+    "driver": None,
+    # Address of the "New Malden Quality Plan" table, known after the first navigation through the menu
+    "quality_plan_url": None,
+}
+
+
+def is_driver_healthy(driver: WebDriver) -> bool:
+    """Checks with one request to the browser that the browser is alive and the session is authorized.
+
+    Args:
+        driver (WebDriver)
+
+    Returns:
+        bool
+    """
+    try:
+        title, url = driver.execute_script("return [document.title, location.href];")
+    except Exception as err:
+        logging.info(f"The browser does not respond: {err}")
+        return False
+    return title != "Unauthorised" and "/login" not in url.lower()
+
+
+def get_authorized_driver(
+    login: str, password: str, download_dir: Path | None = None
+) -> WebDriver:
+    """Returns the warm authorized browser if it is still healthy.
+    Otherwise closes it and restores the session saved on disk by the previous run, if it is still valid.
+    Logs in again only if there is no valid saved session. The new browser is kept for the next calls.
+
+    Args:
+        login (str): Login for authorization on site
+        password (str): Password for authorization on site
+        download_dir (Path | None, optional): Folder for files downloaded by the browser.
+            Used only when a new browser is started. Defaults to None.
+
+    Returns:
+        WebDriver
+    """
+    start: float = time.perf_counter()
+    driver = _session["driver"]
+    if driver is not None and is_driver_healthy(driver):
+        logging.info(f"Reuse the authorized browser ({time.perf_counter() - start:.2f}s).")
+        return driver
+    if driver is not None:
+        quit_driver()
+
+    start = time.perf_counter()
+    driver = restore_saved_session(password, download_dir)
+    if driver is not None:
+        _session["driver"] = driver
+        logging.info(f"Restored the saved session in {time.perf_counter() - start:.2f}s.")
+        return driver
+
+    start = time.perf_counter()
+    driver = perform_authorization(login, password, download_dir, get_profile_dir())
+    _session["driver"] = driver
+    logging.info(f"Started and authorized a new browser in {time.perf_counter() - start:.2f}s.")
+    return driver
+
+
+def restore_saved_session(
+    password: str, download_dir: Path | None = None
+) -> WebDriver | None:
+    """Starts a browser with the session saved on disk if the saved cookies are still accepted by the asite.
+
+    Args:
+        password (str): Password for authorization on site. Used for the decryption key.
+        download_dir (Path | None, optional): Folder for files downloaded by the browser. Defaults to None.
+
+    Returns:
+        WebDriver | None: Authorized driver on the "New Malden Quality Plan" table
+            or None if there is no valid saved session.
+    """
+    state: dict | None = load_session_state(password)
+    if state is None:
+        return None
+    if not is_session_state_valid(state):
+        logging.info("The saved session has expired.")
+        delete_session_state()
+        return None
+    try:
+        driver: WebDriver = restore_session(state, download_dir)
+    except Exception as err:
+        logging.info(f"Could not restore the saved session: {err}")
+        return None
+    if not is_driver_healthy(driver):
+        logging.info("The restored session is not authorized.")
+        driver.quit()
+        delete_session_state()
+        return None
+    set_quality_plan_url(state["quality_plan_url"])
+    return driver
+
+
+def save_session(driver: WebDriver, password: str) -> None:
+    """Saves the session of the authorized browser to disk, so that the next run starts without logging in.
+    The session is saved only when the address of the "New Malden Quality Plan" table is known.
+
+    Args:
+        driver (WebDriver): Authorized driver.
+        password (str): Password for authorization on site. Used for the encryption key.
+    """
+    quality_plan_url: str | None = get_quality_plan_url()
+    if quality_plan_url is None:
+        return
+    try:
+        save_session_state(driver, password, quality_plan_url)
+    except Exception as err:
+        logging.info(f"Could not save the session: {err}")
+
+
+def set_driver(driver: WebDriver) -> None:
+    """Remembers the driver as the warm browser.
+    Needed when the driver has been replaced, for example after re-authorization in check_session.
+
+    Args:
+        driver (WebDriver)
+    """
+    _session["driver"] = driver
+
+
+def replace_driver(old_driver: WebDriver, new_driver: WebDriver) -> None:
+    """Replaces the warm browser after re-authorization, if the old driver was the warm browser.
+    Browsers of the worker pool are not kept by the session manager.
+
+    Args:
+        old_driver (WebDriver)
+        new_driver (WebDriver)
+    """
+    if _session["driver"] is old_driver:
+        _session["driver"] = new_driver
+
+
+def get_quality_plan_url() -> str | None:
+    """Returns the remembered address of the "New Malden Quality Plan" table or None."""
+    return _session["quality_plan_url"]
+
+
+def set_quality_plan_url(url: str | None) -> None:
+    """Remembers the address of the "New Malden Quality Plan" table.
+
+    Args:
+        url (str | None):
+            For example:
+                "https://adoddleak.asite.com/adoddle/quality?action_id=1"
+    """
+    _session["quality_plan_url"] = url
+
+
+def quit_driver() -> None:
+    """Closes the warm browser if it is open."""
+    driver = _session["driver"]
+    _session["driver"] = None
+    if driver is not None:
+        try:
+            driver.quit()
+        except Exception as err:
+            logging.info(f"Error closing the browser: {err}")
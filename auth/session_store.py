@@ -0,0 +1,192 @@
+import base64
+import json
+import logging
+import os
+import time
+from pathlib import Path
+
+import requests
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+from auth.web_driver import initialize_web_driver
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
+)
+
+# Keys of a cookie accepted by the CDP command "Network.setCookies"
+COOKIE_PARAM_KEYS: tuple[str, ...] = (
+    "name",
+    "value",
+    "domain",
+    "path",
+    "secure",
+    "httpOnly",
+    "sameSite",
+    "expires",
+)
+
+
+def get_session_store_dir() -> Path:
+    """Returns the folder with the saved session: the encrypted state, the salt and the Chrome profile.
+    The folder is set by the environment variable SESSION_STORE_DIR.
+
+    Returns:
+        Path: For example: Path(".session")
+    """
+    session_store_dir: Path = Path(os.getenv("SESSION_STORE_DIR", ".session"))
+    session_store_dir.mkdir(parents=True, exist_ok=True)
+    return session_store_dir
+
+
+def get_profile_dir() -> Path:
+    """Returns the persistent Chrome profile folder (--user-data-dir) of the main browser.
+
+    Returns:
+        Path: For example: Path(".session/chrome_profile")
+    """
+    return get_session_store_dir() / "chrome_profile"
+
+
+def get_fernet(password: str) -> Fernet:
+    """Creates the cipher of the saved session.
+    The key is derived from the site password and a random salt stored next to the state.
+
+    Args:
+        password (str): Password for authorization on site.
+
+    Returns:
+        Fernet
+    """
+    salt_path: Path = get_session_store_dir() / "state.salt"
+    if not salt_path.exists():
+        salt_path.write_bytes(os.urandom(16))
+    kdf = PBKDF2HMAC(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=salt_path.read_bytes(),
+        iterations=390_000,
+    )
+    return Fernet(base64.urlsafe_b64encode(kdf.derive(password.encode())))
+
+
+def save_session_state(driver: WebDriver, password: str, quality_plan_url: str) -> None:
+    """Saves the cookies of all asite domains, the localStorage of the current page
+    and the address of the "New Malden Quality Plan" table to the encrypted state file.
+
+    Args:
+        driver (WebDriver): Authorized driver on the page of the asite.
+        password (str): Password for authorization on site. Used for the encryption key.
+        quality_plan_url (str): Address of the "New Malden Quality Plan" table.
+            For example:
+                "https://adoddleak.asite.com/adoddle/quality?action_id=1"
+    """
+    start: float = time.perf_counter()
+    cookies: list[dict] = driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+    local_storage: dict[str, str] = driver.execute_script(
+        "return Object.assign({}, window.localStorage);"
+    )
+    state: dict = {
+        "saved_at": time.time(),
+        "quality_plan_url": quality_plan_url,
+        "cookies": [
+            {key: value for key, value in cookie.items() if key in COOKIE_PARAM_KEYS}
+            for cookie in cookies
+        ],
+        "local_storage": local_storage,
+    }
+    token: bytes = get_fernet(password).encrypt(json.dumps(state).encode())
+    state_path: Path = get_session_store_dir() / "state.bin"
+    tmp_path: Path = state_path.with_suffix(".tmp")
+    tmp_path.write_bytes(token)
+    tmp_path.replace(state_path)
+    logging.info(
+        f"Saved the session ({len(cookies)} cookies) in {time.perf_counter() - start:.2f}s."
+    )
+
+
+def load_session_state(password: str) -> dict | None:
+    """Reads and decrypts the saved session.
+
+    Args:
+        password (str): Password for authorization on site.
+
+    Returns:
+        dict | None: The saved state or None if there is no state or it can not be decrypted
+            (for example, the password has been changed).
+    """
+    state_path: Path = get_session_store_dir() / "state.bin"
+    if not state_path.exists():
+        return None
+    try:
+        return json.loads(get_fernet(password).decrypt(state_path.read_bytes()))
+    except (InvalidToken, ValueError) as err:
+        logging.info(f"The saved session can not be read: {err!r}")
+        return None
+
+
+def delete_session_state() -> None:
+    """Deletes the saved session, so that the next start logs in from scratch."""
+    (get_session_store_dir() / "state.bin").unlink(missing_ok=True)
+
+
+def is_session_state_valid(state: dict, timeout: float = 10) -> bool:
+    """Checks with one HTTP request, without starting Chrome, that the saved cookies are still accepted:
+    the "New Malden Quality Plan" table is returned instead of a redirect to the login page.
+
+    Args:
+        state (dict): The saved state from load_session_state.
+        timeout (float, optional): Timeout of the request in seconds. Defaults to 10.
+
+    Returns:
+        bool
+    """
+    session = requests.Session()
+    for cookie in state["cookies"]:
+        session.cookies.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie.get("domain"),
+            path=cookie.get("path", "/"),
+        )
+    try:
+        response = session.get(
+            state["quality_plan_url"], allow_redirects=False, timeout=timeout
+        )
+    except requests.RequestException as err:
+        logging.info(f"Could not check the saved session: {err}")
+        return False
+    finally:
+        session.close()
+    # An expired session is redirected to the login page
+    return response.status_code == 200
+
+
+def restore_session(state: dict, download_dir: Path | None = None) -> WebDriver:
+    """Starts Chrome with the persistent profile and the saved cookies
+    and opens the "New Malden Quality Plan" table without logging in.
+
+    Args:
+        state (dict): The saved valid state from load_session_state.
+        download_dir (Path | None, optional): Folder for files downloaded by the browser. Defaults to None.
+
+    Returns:
+        WebDriver
+    """
+    driver: WebDriver = initialize_web_driver(
+        state["quality_plan_url"],
+        download_dir,
+        user_data_dir=get_profile_dir(),
+        cookies=state["cookies"],
+    )
+    if state["local_storage"]:
+        driver.execute_script(
+            "for (const [key, value] of Object.entries(arguments[0])) {"
+            " window.localStorage.setItem(key, value); }",
+            state["local_storage"],
+        )
+        driver.refresh()
+    return driver
@@ -1,4 +1,7 @@
 import logging
+import os
+import threading
+from pathlib import Path
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -13,69 +16,179 @@ from selenium.webdriver.support import expected_conditions as EC
 # Used for setting wait times
 from selenium.webdriver.support.ui import WebDriverWait
 
-# ChromeDriverManager is used to install the driver without manually downloading the binary file
-from webdriver_manager.chrome import ChromeDriverManager
+from auth.driver_resolver import resolve_chromedriver_path
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
 )
 
+# Driver session id -> download folder of the browser, so that a browser started again keeps its folder
+_download_dirs: dict[str, Path] = {}
+_download_dirs_lock: threading.Lock = threading.Lock()
 
-def initialize_web_driver(site: str) -> WebDriver:
+# Chrome arguments of the production mode: no window and no features that are not needed by the script
+PRODUCTION_CHROME_ARGUMENTS: tuple[str, ...] = (
+    "--headless=new",
+    "--window-size=1920,1080",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--mute-audio",
+    # Forms opened in background tabs must keep loading at full speed
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+)
+# Images blocked in the "New Malden Quality Plan" table in the production mode
+BLOCKED_IMAGE_URLS: tuple[str, ...] = (
+    "*.jpg",
+    "*.jpeg",
+    "*.png",
+    "*.gif",
+    "*.webp",
+)
+
+
+def is_production_mode() -> bool:
+    """Returns True if the script works in the production mode (environment variable ASITE_PRODUCTION_MODE=1):
+    headless lean Chrome, images blocked in the table and no highlighting of the table rows.
+
+    Returns:
+        bool
     """
+    return os.getenv("ASITE_PRODUCTION_MODE", "0").lower() in ("1", "true", "yes")
+
+
+def get_login_url() -> str:
+    """Returns the address of the login page of the asite (environment variable ASITE_LOGIN_URL).
+    The benchmarks set it to the login page of the local stand-in of the asite.
+
+    Returns:
+        str: For example: "https://system.asite.com/login"
+    """
+    return os.getenv("ASITE_LOGIN_URL", "https://system.asite.com/login")
+
+
+def set_images_blocked(driver: WebDriver, blocked: bool) -> WebDriver:
+    """Blocks or unblocks loading of images in the current tab in the production mode.
+    The blocking works only for the current tab, so the forms opened in new tabs load their images.
+    Does nothing in the visible mode.
+
+    Args:
+        driver (WebDriver)
+        blocked (bool): True - block images, False - unblock.
+
+    Returns:
+        WebDriver
+    """
+    if not is_production_mode():
+        return driver
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd(
+        "Network.setBlockedURLs", {"urls": list(BLOCKED_IMAGE_URLS) if blocked else []}
+    )
+    return driver
+
+
+def initialize_web_driver(
+    site: str,
+    download_dir: Path | None = None,
+    user_data_dir: Path | None = None,
+    cookies: list[dict] | None = None,
+) -> WebDriver:
+    r"""
     Initializes the Selenium WebDriver for Chrome and opens the target website.
 
     Args:
         site (str): The name of the site to be opened.
             For example:
                 "https://system.asite.com/login"
+        download_dir (Path | None, optional): Absolute path to the folder in which to save files downloaded
+            from the asite site of the Side-Rise inspection, paragraph 2.3.
+            Each browser of the worker pool has its own folder.
+            Defaults to None - Path(r"C:\Users\Human\Downloads\download_from_asite").
+        user_data_dir (Path | None, optional): Persistent Chrome profile folder.
+            Defaults to None - a new temporary profile.
+        cookies (list[dict] | None, optional): Cookies set before the site is opened,
+            in the format of the CDP command "Network.setCookies". Defaults to None.
 
     Returns:
         webdriver.Chrome: An instance of the Chrome WebDriver.
     """
     # Absolute path to the folder in which to save files downloaded
     # from the asite site of the Side-Rise inspection, paragraph 2.3
-    download_dir: str = r"C:\Users\Human\Downloads\download_from_asite"
+    if download_dir is None:
+        download_dir = Path(r"C:\Users\Human\Downloads\download_from_asite")
 
     options = Options()
     # Disable pop-up notifications
     prefs = {
         "profile.default_content_setting_values.notifications": 2,  # turn off notifications
-        "download.default_directory": download_dir,  # specify default download folder
+        "download.default_directory": str(download_dir),  # specify default download folder
         "download.prompt_for_download": False,  # do not ask for confirmation to download
         "directory_upgrade": True,  # allow directory change
         "safebrowsing.enabled": True,  # disable chrome blocking
     }
     options.add_experimental_option("prefs", prefs)
-    # Installing the ChromeDriverManager driver
-    service = Service(executable_path=ChromeDriverManager().install())
+    if user_data_dir is not None:
+        options.add_argument(f"--user-data-dir={Path(user_data_dir).resolve()}")
+    production_mode: bool = is_production_mode()
+    if production_mode:
+        for argument in PRODUCTION_CHROME_ARGUMENTS:
+            options.add_argument(argument)
+    # The chromedriver path is pinned after the first resolution by ChromeDriverManager
+    service = Service(executable_path=resolve_chromedriver_path())
     driver = webdriver.Chrome(service=service, options=options)
+    with _download_dirs_lock:
+        _download_dirs[driver.session_id] = download_dir
+    if cookies:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
     driver.get(site)
     # driver.set_window_size(1920, 1080)
 
-    # Expand window to full screen
-    driver.maximize_window()
+    # Expand window to full screen. In the production mode the size is set by "--window-size"
+    if not production_mode:
+        driver.maximize_window()
     # Explicit wait for element with tag-name "html"
     wait = WebDriverWait(driver, 10)
     wait.until(EC.visibility_of_element_located((By.TAG_NAME, "html")))
     return driver
 
 
-def perform_authorization(login: str, password: str) -> WebDriver:
-    """Performs authorization on the site "https://system.asite.com/login"
+def get_download_dir(driver: WebDriver) -> Path | None:
+    """Returns the download folder with which the browser was started, None for an unknown browser."""
+    with _download_dirs_lock:
+        return _download_dirs.get(driver.session_id)
+
+
+def perform_authorization(
+    login: str,
+    password: str,
+    download_dir: Path | None = None,
+    user_data_dir: Path | None = None,
+) -> WebDriver:
+    """Performs authorization on the site "https://system.asite.com/login" or on the site of ASITE_LOGIN_URL
 
     Args:
         login (str): Login for authorization on site
         password (str): Password for authorization on site
+        download_dir (Path | None, optional): Folder for files downloaded by the browser.
+            Defaults to None - the default folder of initialize_web_driver.
+        user_data_dir (Path | None, optional): Persistent Chrome profile folder. Defaults to None.
 
     Returns:
         driver (WebDriver)
     """
-    driver = initialize_web_driver("https://system.asite.com/login")
+    driver = initialize_web_driver(get_login_url(), download_dir, user_data_dir)
     # driver.fullscreen_window()  # ! Не раскрывает окно для людей, но для Selenium это работает
     # Раскрываем браузер на весь экран монитора
     # driver.set_window_size(1920, 1080)
-    driver.maximize_window()
+    if not is_production_mode():
+        driver.maximize_window()
     wait = WebDriverWait(driver, 10)
     # If there is an iframe then need to switch to it
     iframe = wait.until(
@@ -0,0 +1,123 @@
+"""End-to-end benchmark of moving_through_quality_checklist on the local stand-in of the asite.
+
+Starts benchmarks.mock_asite with synthetic blocks, levels and plots, creates new photos for the plots,
+logs in through the login iframe and runs the pass of the "New Malden Quality Plan" table:
+opening of the forms, download of item 2.3, dedup, upload and saving. Reports plots per minute.
+Needs Chrome and chromedriver, but not the live asite, so it can run in CI.
+
+Run from the root of the project:
+    python -m benchmarks.asite_end_to_end --blocks A B --levels 2 --plots-per-level 3 --latency 0.05
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from auth.session_manager import quit_driver, set_driver, set_quality_plan_url
+from auth.web_driver import perform_authorization
+from benchmarks.mock_asite import MockAsiteServer
+from benchmarks.mock_asite.server import create_photo
+from core.navigation import go_to_new_malden_quality_plan, moving_through_quality_checklist
+from utils.database import create_database_if_not_exist
+from utils.helpers import create_dict_plots_with_new_photos
+from utils.progress_journal import create_progress_table, get_plot_progress, queue_plots
+from utils.tracing import log_span_summary
+
+DIR_WITH_NEW_PHOTO: Path = Path("2.3") / "new_photos_send_to_asite"
+
+
+def create_new_photos(base_dir: Path, plots: list[str], photos_per_plot: int) -> None:
+    r"""Creates the new photos of the plots in base_dir\A_L1_Plot_1\2.3\new_photos_send_to_asite."""
+    for plot_index, block_level_plot in enumerate(plots):
+        photo_dir: Path = base_dir / block_level_plot / DIR_WITH_NEW_PHOTO
+        photo_dir.mkdir(parents=True, exist_ok=True)
+        for number in range(photos_per_plot):
+            photo: Path = photo_dir / f"new_{block_level_plot}_{number}.jpg"
+            photo.write_bytes(create_photo(plot_index * photos_per_plot + number))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--blocks", nargs="+", default=["A"], help="Letters of the blocks.")
+    parser.add_argument("--levels", type=int, default=2, help="Number of levels in each block.")
+    parser.add_argument("--plots-per-level", type=int, default=3, help="Number of plots on each level.")
+    parser.add_argument("--photos-per-plot", type=int, default=2, help="New photos of each plot.")
+    parser.add_argument("--photos-on-asite", type=int, default=3, help="Photos in item 2.3 of each form.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Delay of every response, s.")
+    parser.add_argument("--upload-latency", type=float, default=0.2, help="Delay of the upload of a photo, s.")
+    parser.add_argument("--save-latency", type=float, default=0.5, help="Delay of the saving of a form, s.")
+    parser.add_argument("--prefetch-tabs", type=int, default=0, help="Forms opened in background tabs.")
+    parser.add_argument("--headed", action="store_true", help="Visible Chrome instead of the production mode.")
+    args = parser.parse_args()
+
+    os.environ["ASITE_PRODUCTION_MODE"] = "0" if args.headed else "1"
+    # Re-authorization of check_session logs in to the stand-in, which accepts any login
+    os.environ.setdefault("SITE_LOGIN", "benchmark")
+    os.environ.setdefault("SITE_PASSWORD", "benchmark")
+
+    with MockAsiteServer(
+        blocks=args.blocks,
+        levels=args.levels,
+        plots_per_level=args.plots_per_level,
+        photos_on_asite=args.photos_on_asite,
+        latency=args.latency,
+        upload_latency=args.upload_latency,
+        save_latency=args.save_latency,
+    ) as server, tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ["ASITE_LOGIN_URL"] = server.login_url
+        # The journal, the database and the photo cache are created in the current folder
+        project_dir: Path = Path.cwd()
+        os.chdir(tmp_dir)
+        base_dir: Path = Path(tmp_dir) / "SideRise"
+        download_dir: Path = Path(tmp_dir) / "download_from_asite"
+        download_dir.mkdir()
+        plots: list[str] = server.get_plots()
+        create_new_photos(base_dir, plots, args.photos_per_plot)
+        create_database_if_not_exist()
+        create_progress_table()
+        dict_plots_with_new_photos, _ = queue_plots(
+            create_dict_plots_with_new_photos(base_dir, DIR_WITH_NEW_PHOTO)
+        )
+
+        start: float = time.perf_counter()
+        driver = perform_authorization(os.environ["SITE_LOGIN"], os.environ["SITE_PASSWORD"], download_dir)
+        login_seconds: float = time.perf_counter() - start
+        set_driver(driver)
+        set_quality_plan_url(server.quality_plan_url)
+        try:
+            start = time.perf_counter()
+            driver = go_to_new_malden_quality_plan(driver)
+            driver = moving_through_quality_checklist(
+                driver,
+                base_dir,
+                download_dir,
+                dict_plots_with_new_photos,
+                number_of_prefetch_tabs=args.prefetch_tabs,
+            )
+            pass_seconds: float = time.perf_counter() - start
+            set_driver(driver)
+        finally:
+            quit_driver()
+            os.chdir(project_dir)
+
+        saved: list[str] = [
+            plot
+            for plot in plots
+            if (get_plot_progress(plot, str(Path(tmp_dir) / "side_rise_database.db")) or {}).get("state")
+            == "saved"
+        ]
+        log_span_summary()
+        print(f"{'plots':<30} {len(plots)}")
+        print(f"{'saved plots':<30} {len(saved)}")
+        print(f"{'uploaded photos':<30} {server.stats.uploaded_photos}")
+        print(f"{'downloaded photos':<30} {server.stats.downloaded_photos}")
+        print(f"{'requests to the stand-in':<30} {server.stats.requests}")
+        print(f"{'login':<30} {login_seconds:.2f}s")
+        print(f"{'pass of the table':<30} {pass_seconds:.2f}s")
+        print(f"{'plots per minute':<30} {len(saved) / pass_seconds * 60:.2f}")
+
+
+if __name__ == "__main__":
+    main()
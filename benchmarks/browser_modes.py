@@ -0,0 +1,142 @@
+"""Comparison of the visible mode and the production mode (ASITE_PRODUCTION_MODE=1) of the browser.
+
+For each mode the script logs in, opens the "New Malden Quality Plan" table, opens the first block and level
+and opens the forms of the first plots "In Progress" one by one (the forms are only opened and closed,
+nothing is changed). It measures the memory of the browser (chromedriver and all Chrome processes)
+and the time per plot: moving to the row of the plot plus loading its form.
+
+psutil is optional, without it the memory is not measured.
+
+Run from the root of the project (SITE_LOGIN and SITE_PASSWORD are read from .env):
+    python -m benchmarks.browser_modes --plots 5
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+from dotenv import load_dotenv
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+from auth.web_driver import perform_authorization, set_images_blocked
+from core.navigation import (
+    click_arrow_to_open_block,
+    click_arrow_to_open_level,
+    is_end_of_table,
+    open_new_malden_quality_plan,
+    scroll_to_location_title,
+)
+from core.tab_pipeline import open_form_in_background_tab, wait_for_loaded_tab
+from utils.helpers import edit_or_create_inspection, get_location_title
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def get_browser_memory_mb(driver: WebDriver) -> float | None:
+    """Returns the resident memory of chromedriver and all its child processes in megabytes."""
+    if psutil is None:
+        return None
+    process = psutil.Process(driver.service.process.pid)
+    processes = [process] + process.children(recursive=True)
+    total: int = 0
+    for child in processes:
+        try:
+            total += child.memory_info().rss
+        except psutil.NoSuchProcess:
+            continue
+    return total / 1024 / 1024
+
+
+def measure_plots(driver: WebDriver, number_of_plots: int) -> list[float]:
+    """Moves down the table and opens the forms of the first "number_of_plots" plots "In Progress"
+    of the first block and level. Returns the time per plot in seconds.
+    """
+    durations: list[float] = []
+    number_line: int = 2
+    opened_block: bool = False
+    opened_level: bool = False
+    start: float = time.perf_counter()
+    while len(durations) < number_of_plots and not is_end_of_table(driver, number_line):
+        driver, location_title = get_location_title(driver, number_line)
+        driver = scroll_to_location_title(driver, number_line)
+        location_title = (location_title or "").lower()
+        if "block" in location_title:
+            if opened_block:
+                break
+            driver = click_arrow_to_open_block(driver, number_line)
+            opened_block = True
+        elif "level" in location_title:
+            if opened_level:
+                break
+            driver = click_arrow_to_open_level(driver, number_line)
+            opened_level = True
+        elif "plot" in location_title:
+            try:
+                driver, element, edit_or_create = edit_or_create_inspection(driver, number_line)
+            except Exception:
+                edit_or_create = None
+            if edit_or_create == "edit":
+                main_tab: str = driver.current_window_handle
+                driver, tab = open_form_in_background_tab(driver, element)
+                if tab is not None:
+                    wait_for_loaded_tab(driver, [tab])
+                    driver.close()
+                    driver.switch_to.window(main_tab)
+                    durations.append(time.perf_counter() - start)
+                    start = time.perf_counter()
+        number_line += 1
+    return durations
+
+
+def run_mode(production_mode: bool, login: str, password: str, number_of_plots: int) -> dict:
+    """Runs the measurement in one mode and returns the results."""
+    os.environ["ASITE_PRODUCTION_MODE"] = "1" if production_mode else "0"
+    start: float = time.perf_counter()
+    driver: WebDriver = perform_authorization(login, password)
+    try:
+        driver = open_new_malden_quality_plan(driver)
+        driver = set_images_blocked(driver, True)
+        startup: float = time.perf_counter() - start
+        durations: list[float] = measure_plots(driver, number_of_plots)
+        memory: float | None = get_browser_memory_mb(driver)
+    finally:
+        driver.quit()
+    return {
+        "mode": "production" if production_mode else "visible",
+        "startup": startup,
+        "plots": len(durations),
+        "time_per_plot": statistics.mean(durations) if durations else None,
+        "memory": memory,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--plots", type=int, default=5, help="Number of plot forms opened in each mode.")
+    args = parser.parse_args()
+
+    load_dotenv()
+    login = os.getenv("SITE_LOGIN")
+    password = os.getenv("SITE_PASSWORD")
+    results: list[dict] = [
+        run_mode(production_mode, login, password, args.plots)
+        for production_mode in (False, True)
+    ]
+    print(f"{'mode':<12}{'startup, s':>12}{'plots':>8}{'s / plot':>10}{'memory, MB':>12}")
+    for result in results:
+        time_per_plot: str = (
+            f"{result['time_per_plot']:.2f}" if result["time_per_plot"] is not None else "n/a"
+        )
+        memory: str = f"{result['memory']:.0f}" if result["memory"] is not None else "n/a"
+        print(
+            f"{result['mode']:<12}{result['startup']:>12.2f}{result['plots']:>8}"
+            f"{time_per_plot:>10}{memory:>12}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Benchmark of the driver creation time.
+
+Compares the resolution of the chromedriver path with ChromeDriverManager on every start
+with the pinned path of auth.driver_resolver, and measures the full start of Chrome.
+
+Run from the root of the project:
+    python -m benchmarks.driver_startup --runs 5
+"""
+
+import argparse
+import statistics
+import time
+from collections.abc import Callable
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service
+from webdriver_manager.chrome import ChromeDriverManager
+
+from auth import driver_resolver
+
+
+def measure(func: Callable[[], object], runs: int) -> list[float]:
+    """Calls the function "runs" times and returns the duration of each call in seconds."""
+    durations: list[float] = []
+    for _ in range(runs):
+        start: float = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def print_result(name: str, durations: list[float]) -> None:
+    """Prints the mean, min and max duration."""
+    print(
+        f"{name:<40} mean {statistics.mean(durations):7.3f}s  "
+        f"min {min(durations):7.3f}s  max {max(durations):7.3f}s"
+    )
+
+
+def resolve_pinned() -> str:
+    """Resolves the path as a new process does: without the path cached in memory."""
+    driver_resolver._resolved["path"] = None
+    return driver_resolver.resolve_chromedriver_path()
+
+
+def start_and_quit_chrome(headless: bool) -> None:
+    """Creates a driver with the pinned chromedriver and closes it."""
+    options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+    service = Service(executable_path=resolve_pinned())
+    driver = webdriver.Chrome(service=service, options=options)
+    driver.quit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Number of runs of each case.")
+    parser.add_argument(
+        "--no-chrome", action="store_true", help="Do not start Chrome, measure only the path resolution."
+    )
+    parser.add_argument("--headed", action="store_true", help="Start Chrome with a window.")
+    args = parser.parse_args()
+
+    print_result(
+        "ChromeDriverManager().install()",
+        measure(lambda: ChromeDriverManager().install(), args.runs),
+    )
+    # The first call pins the path if it has not been pinned yet
+    resolve_pinned()
+    print_result("resolve_chromedriver_path() (pinned)", measure(resolve_pinned, args.runs))
+    if not args.no_chrome:
+        print_result(
+            "Chrome start + quit (pinned driver)",
+            measure(lambda: start_and_quit_chrome(not args.headed), args.runs),
+        )
+
+
+if __name__ == "__main__":
+    main()
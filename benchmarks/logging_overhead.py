@@ -0,0 +1,120 @@
+"""Benchmark of the logging overhead per image.
+
+Compares the old logging of the OCR: a dozen appends to log.txt per image, each of which opens and closes the file,
+plus pprint of the photo list, with the JSON-lines logging of utils.structured_logging,
+where the details are DEBUG records dropped at the INFO level and the file is written by a separate thread.
+
+Run from the root of the project:
+    python -m benchmarks.logging_overhead --images 2000
+"""
+
+import argparse
+import contextlib
+import io
+import logging
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from pprint import pprint
+
+from utils.structured_logging import setup_structured_logging, stop_structured_logging
+
+# Records written for one image by the OCR: the groups of the regular expression and the result
+GROUP_LINES: tuple[str, ...] = (
+    "block(gr1) = B",
+    "level(gr2) = L",
+    "level_num(gr3) = 1",
+    "plot(gr4) = PLOT",
+    "plot_number(gr5) = 100",
+    "window(gr6) = W",
+    "window_number(gr7) = 12",
+    "B_L1_Plot_100",
+)
+
+
+def append_line(log_file: Path, line: str) -> None:
+    """The old log_func: opens the file, appends one line and closes it."""
+    with open(log_file, "a+", encoding="utf-8") as file:
+        file.write(line)
+
+
+def log_image_old(log_file: Path, image_name: str, photos: list[Path]) -> None:
+    """Logging of one image before: every line is a separate write to the file, the photo list is printed."""
+    append_line(log_file, f"\nProcessing {image_name}...\n")
+    append_line(log_file, f"image name: {image_name}\n")
+    append_line(log_file, "Extracted text: BL1PLOT100W12\n")
+    for line in GROUP_LINES:
+        append_line(log_file, line + "\n")
+    append_line(log_file, "Moved to folder B_L1_Plot_100\n")
+    pprint(photos)
+
+
+def log_image_new(logger: logging.Logger, image_name: str, photos: list[Path]) -> None:
+    """Logging of one image now: one INFO record, the details are DEBUG records."""
+    extra: dict = {"photo": image_name, "plot": "B_L1_Plot_100"}
+    logger.debug("Processing...", extra=extra)
+    logger.debug("Extracted text: %s", "BL1PLOT100W12", extra=extra)
+    for line in GROUP_LINES:
+        logger.debug("%s", line, extra=extra)
+    logger.info("Cleaned text: BL1PLOT100W12", extra=extra)
+    logging.debug("new_photos: %s", photos, extra=extra)
+
+
+def measure(func, images: int) -> list[float]:
+    """Calls the function for each image and returns the duration of each call in seconds.
+    The console output is discarded, so that only the cost of the logging is measured.
+    """
+    durations: list[float] = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for number in range(images):
+            start: float = time.perf_counter()
+            func(f"IMG_{number:05}.JPG")
+            durations.append(time.perf_counter() - start)
+    return durations
+
+
+def print_result(name: str, durations: list[float]) -> None:
+    """Prints the mean and p95 duration per image in microseconds."""
+    p95: float = statistics.quantiles(durations, n=100)[94]
+    print(
+        f"{name:<45} mean {statistics.mean(durations) * 1e6:9.1f} us  "
+        f"p95 {p95 * 1e6:9.1f} us  total {sum(durations):7.3f}s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=2000, help="Number of images.")
+    parser.add_argument("--photos", type=int, default=30, help="Number of photos in the printed list.")
+    parser.add_argument("--level", default="INFO", help="Level of the structured logging.")
+    args = parser.parse_args()
+
+    photos: list[Path] = [
+        Path("SideRise") / "B_L1_Plot_100" / "2.3" / "new_photos_send_to_asite" / f"IMG_{number:05}.JPG"
+        for number in range(args.photos)
+    ]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        old_log: Path = Path(tmp_dir) / "log.txt"
+        old: list[float] = measure(lambda name: log_image_old(old_log, name, photos), args.images)
+        print_result("log_func + pprint", old)
+
+        # Without the console handler of basicConfig, the records go only to the file
+        logging.getLogger().handlers.clear()
+        setup_structured_logging(Path(tmp_dir) / "run.jsonl", args.level)
+        logger: logging.Logger = logging.getLogger("ocr")
+        new: list[float] = measure(lambda name: log_image_new(logger, name, photos), args.images)
+        flush_start: float = time.perf_counter()
+        stop_structured_logging()
+        flush: float = time.perf_counter() - flush_start
+        print_result(f"structured logging ({args.level})", new)
+        print(f"{'flush of the queue at the end':<45} {flush:.3f}s")
+        print(
+            f"Overhead removed per image: "
+            f"{(statistics.mean(old) - statistics.mean(new)) * 1e6:.1f} us "
+            f"({statistics.mean(old) / statistics.mean(new):.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
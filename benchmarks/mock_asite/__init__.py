@@ -0,0 +1,3 @@
+from benchmarks.mock_asite.server import MockAsiteServer, MockAsiteStats
+
+__all__ = ["MockAsiteServer", "MockAsiteStats"]
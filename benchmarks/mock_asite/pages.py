@@ -0,0 +1,293 @@
+"""HTML pages of the local stand-in of the asite.
+
+The pages reproduce only the elements and the nesting that the XPATHs of the script depend on:
+the login iframe, the "New Malden Quality Plan" table with the "Activities / Locations" column
+and the Side-Rise column, and the inspection form with item 2.3 and the "Update" button.
+"""
+
+import html
+import json
+
+# Column of the Side-Rise inspection in the table, as in utils.helpers.edit_or_create_inspection
+SIDE_RISE_COLUMN: int = 33
+# Number of cells in a row of the table
+NUMBER_OF_COLUMNS: int = 40
+
+STYLE: str = """
+<style>
+    body { font-family: sans-serif; margin: 0; }
+    .table { display: flex; }
+    #table_body_header_scroller { width: 260px; flex: none; }
+    #table_body_content_scroller { overflow-x: auto; }
+    .row { height: 28px; white-space: nowrap; border-bottom: 1px solid #ddd; }
+    .row > div { display: flex; height: 28px; align-items: center; }
+    .row i { width: 16px; height: 16px; display: inline-block; cursor: pointer; }
+    .row i::before { content: ">"; }
+    .cells > div { display: inline-block; width: 80px; height: 24px; flex: none; }
+    .cells > div.side-rise { width: 120px; cursor: pointer; }
+    .activity-row { border: 1px solid #ccc; padding: 8px; margin: 8px 0; }
+    .attachments a, .uploaded-file { display: block; }
+    .hidden { display: none; }
+</style>
+"""
+
+
+def render_page(title: str, body: str, script: str = "") -> str:
+    """Wraps the body into an HTML page."""
+    return (
+        f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title>"
+        f"{STYLE}</head><body>{body}<script>{script}</script></body></html>"
+    )
+
+
+def render_unauthorised_page() -> str:
+    """The page of the asite shown when the session is lost. check_session looks for its title."""
+    return render_page("Unauthorised", "<h1>Unauthorised</h1>")
+
+
+def render_login_page() -> str:
+    """The login page with the iframe "iFrameAsite", as in auth.web_driver.perform_authorization."""
+    return render_page(
+        "Asite Login",
+        '<iframe id="iFrameAsite" src="/login/frame" style="width: 600px; height: 300px;"></iframe>',
+    )
+
+
+def render_login_frame() -> str:
+    """The content of the login iframe. The button sets the session cookie and opens the start page."""
+    body: str = """
+        <input id="_58_login" type="text">
+        <input id="_58_password" type="password">
+        <button id="login-cloud" onclick="logIn()">Login</button>
+    """
+    script: str = """
+        function logIn() {
+            document.cookie = "ASessionID=mock-session; path=/";
+            window.top.location.href = "/adoddle/home?action_id=1";
+        }
+    """
+    return render_page("Asite Login", body, script)
+
+
+def render_home_page() -> str:
+    """The start page with the "More" -> "Quality" menu of the header."""
+    body: str = """
+        <div id="header">
+            <a id="header_moreNav" href="#" onclick="document.getElementById('more-menu').classList.remove('hidden')">More</a>
+            <div id="more-menu" class="hidden"><a id="navquality" href="/adoddle/quality?action_id=1">Quality</a></div>
+        </div>
+    """
+    return render_page("Asite", body)
+
+
+def render_quality_list_page() -> str:
+    """The list of the quality plans. The second item opens the "New Malden Quality Plan" table."""
+    body: str = """
+        <div id="qualities-list"><div><div><adoddle-table-listing><div>
+            <div class="listing-header"></div>
+            <div><div class="filters"></div><div><div><ul>
+                <li><a href="#">Other Quality Plan</a></li>
+                <li><a href="/adoddle/quality?action_id=1&amp;plan=new-malden">New Malden Quality Plan</a></li>
+            </ul></div></div></div>
+        </div></adoddle-table-listing></div></div></div>
+    """
+    return render_page("Asite Quality", body)
+
+
+def render_quality_plan_page(blocks: list[str]) -> str:
+    """The "New Malden Quality Plan" table. Only the rows of the blocks are on the page at first,
+    the rows of the levels and the plots are loaded when the arrow of their parent row is clicked.
+
+    Args:
+        blocks (list[str]): Letters of the blocks. For example: ["A", "B"]
+    """
+    header_rows: str = '<div class="row header"><div><div class="location-title" title="Activities / Locations">Activities / Locations</div></div></div>'
+    content_rows: str = '<div class="row header"><div class="cells"></div></div>'
+    rows: list[dict] = [{"key": block, "title": f"Block {block}", "kind": "block"} for block in blocks]
+    body: str = f"""
+        <div class="table">
+            <div id="table_body_header_scroller"><div>{header_rows}</div></div>
+            <div id="table_body_content_scroller"><div>{content_rows}</div></div>
+        </div>
+    """
+    script: str = f"""
+        const SIDE_RISE_COLUMN = {SIDE_RISE_COLUMN};
+        const NUMBER_OF_COLUMNS = {NUMBER_OF_COLUMNS};
+        const headerList = document.querySelector("#table_body_header_scroller > div");
+        const contentList = document.querySelector("#table_body_content_scroller > div");
+
+        function createHeaderRow(row) {{
+            const element = document.createElement("div");
+            element.className = "row";
+            element.dataset.key = row.key;
+            const arrow = row.kind === "plot" ? "" : '<i class="fa fa-chevron-down" onclick="openRow(this)"></i>';
+            element.innerHTML = '<div>' + arrow + '<div class="location-title" title="' + row.title + '">'
+                + row.title + '</div></div>';
+            return element;
+        }}
+
+        function createContentRow(row) {{
+            const element = document.createElement("div");
+            element.className = "row";
+            const cells = [];
+            for (let column = 1; column <= NUMBER_OF_COLUMNS; column++) {{
+                if (column === SIDE_RISE_COLUMN && row.kind === "plot") {{
+                    cells.push('<div class="side-rise" onclick="window.open(\\'/form?plot=' + row.key + '\\', \\'_blank\\')">'
+                        + '<span class="ng-star-inserted">In Progress</span></div>');
+                }} else {{
+                    cells.push('<div></div>');
+                }}
+            }}
+            element.innerHTML = '<div class="cells">' + cells.join("") + '</div>';
+            return element;
+        }}
+
+        function insertRows(afterIndex, rows) {{
+            let headerAnchor = headerList.children[afterIndex];
+            let contentAnchor = contentList.children[afterIndex];
+            for (const row of rows) {{
+                const headerRow = createHeaderRow(row);
+                const contentRow = createContentRow(row);
+                headerAnchor.after(headerRow);
+                contentAnchor.after(contentRow);
+                headerAnchor = headerRow;
+                contentAnchor = contentRow;
+            }}
+        }}
+
+        // Loads the rows of the levels of a block or of the plots of a level, as the asite does
+        async function openRow(arrow) {{
+            if (arrow.classList.contains("chevron-up") || arrow.dataset.loading) {{
+                return;
+            }}
+            arrow.dataset.loading = "1";
+            const row = arrow.closest(".row");
+            const response = await fetch("/api/children?key=" + encodeURIComponent(row.dataset.key));
+            const children = await response.json();
+            insertRows(Array.from(headerList.children).indexOf(row), children);
+            arrow.classList.replace("chevron-down", "chevron-up");
+        }}
+
+        insertRows(0, {json.dumps(rows)});
+    """
+    return render_page("Asite Quality", body, script)
+
+
+def render_text_fields(edit_mode: bool) -> str:
+    """The five text fields of "Additional Fields". "." is an empty field, which the script fills in."""
+    if edit_mode:
+        return "".join('<div ng-switch-when="textbox"><input type="text" value="."></div>' for _ in range(5))
+    return "".join('<div ng-switch-when="textbox">.</div>' for _ in range(5))
+
+
+def render_item_2_3(block_level_plot: str, number_of_photos: int, edit_mode: bool) -> str:
+    """Item 2.3 with the links to the photos on the asite. In the edit mode it also has
+    the "Add New Attachment" button and the multi-file input.
+    """
+    links: str = "".join(
+        f'<a href="/download/{block_level_plot}/{number}">asite_{block_level_plot}_{number}.jpg</a>'
+        for number in range(1, number_of_photos + 1)
+    )
+    uploader: str = ""
+    if edit_mode:
+        uploader = """
+            <div class="uploader">
+                <div class="add-new-item"><span>Add New Attachment</span></div>
+                <div class="upload-box">
+                    <div class="hint">Drop files here</div>
+                    <div class="inputs">
+                        <div></div>
+                        <div></div>
+                        <div class="file-input">
+                            <input type="file" id="imgupload_multi_AttachedDocs_2_3" multiple onchange="uploadFiles(this)">
+                        </div>
+                    </div>
+                </div>
+            </div>
+        """
+    return f"""
+        <div class="activity-row">
+            <div class="activity-title"><div>2.3</div><i class="fa fa-paperclip"></i></div>
+            <div><div class="attachments">{links}</div>{uploader}</div>
+        </div>
+    """
+
+
+def render_form_page(block_level_plot: str, number_of_photos: int) -> str:
+    """The inspection form of the plot, opened by the "In Progress" card.
+    The "Edit" button replaces the view of the form with the editable form "custFormTD".
+
+    Args:
+        block_level_plot (str): For example: "A_L1_Plot_1"
+        number_of_photos (int): Number of photos in item 2.3 on the asite.
+    """
+    block, level, _, plot = block_level_plot.split("_")
+    location: str = f"Block {block}>Level {int(level[1:]):02}>Plot {int(plot):02}"
+    title: str = "QC4J Side-Rise Rain-Screen Firebreak"
+    body: str = f"""
+        <div class="form-container loaded">
+            <div id="form-holder">
+                <div id="header-section">
+                    <div><h3>{title} {html.escape(location)}</h3></div>
+                    <div id="edit-ori-btn"><i class="fa fa-pencil" onclick="editForm()">Edit</i></div>
+                    <button id="btnSaveForm" class="hidden" onclick="saveForm()">Update</button>
+                </div>
+                <div id="formWrapper">
+                    {render_text_fields(edit_mode=False)}
+                    <div class="comment-section">ITP and PQP uploaded on Asite</div>
+                    <div class="section">{render_item_2_3(block_level_plot, number_of_photos, edit_mode=False)}</div>
+                </div>
+            </div>
+        </div>
+        <template id="edit-template">
+            <div id="custFormTD">
+                <div class="form-title">Edit form</div>
+                <div><div>
+                    <section></section>
+                    <section><div>
+                        <div class="location-row">
+                            <div>Location</div>
+                            <div>Site / Area</div>
+                            <div><input type="text" disabled value="{html.escape(location)}"></div>
+                        </div>
+                        <div class="obr-section">{render_text_fields(edit_mode=True)}</div>
+                        <div class="comment-section">ITP and PQP uploaded on Asite</div>
+                        <div class="section">{render_item_2_3(block_level_plot, number_of_photos, edit_mode=True)}</div>
+                    </div></section>
+                </div></div>
+            </div>
+        </template>
+    """
+    script: str = f"""
+        const PLOT = {json.dumps(block_level_plot)};
+
+        function editForm() {{
+            const template = document.getElementById("edit-template");
+            document.getElementById("formWrapper").replaceWith(template.content.cloneNode(true));
+            document.getElementById("edit-ori-btn").classList.add("hidden");
+            document.getElementById("btnSaveForm").classList.remove("hidden");
+        }}
+
+        // Each file is shown with the loading indicator until the server answers
+        function uploadFiles(input) {{
+            const attachments = input.closest(".activity-row").querySelector(".attachments");
+            for (const file of input.files) {{
+                const item = document.createElement("div");
+                item.className = "uploaded-file";
+                item.innerHTML = '<span class="file-name"></span><img ng-if="file.isUploading" alt="">';
+                item.querySelector(".file-name").textContent = file.name;
+                attachments.appendChild(item);
+                fetch("/upload?plot=" + encodeURIComponent(PLOT) + "&name=" + encodeURIComponent(file.name),
+                      {{method: "POST", body: file}})
+                    .then(() => item.querySelector("img").remove());
+            }}
+        }}
+
+        function saveForm() {{
+            const container = document.querySelector(".form-container");
+            container.classList.remove("loaded");
+            fetch("/save?plot=" + encodeURIComponent(PLOT), {{method: "POST"}})
+                .then(() => container.classList.add("loaded"));
+        }}
+    """
+    return render_page(title, body, script)
@@ -0,0 +1,235 @@
+"""Local stand-in of the asite for the benchmarks.
+
+It serves the pages of benchmarks.mock_asite.pages with a configurable latency of every response,
+of the upload of every photo and of the saving of the form, and records what the script did.
+
+For example:
+    with MockAsiteServer(blocks=["A"], levels=2, plots_per_level=3, latency=0.05) as server:
+        print(server.login_url, server.quality_plan_url)
+"""
+
+import io
+import json
+import logging
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from PIL import Image
+
+from benchmarks.mock_asite import pages
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
+)
+
+
+@dataclass
+class MockAsiteStats:
+    """What the script did on the stand-in."""
+
+    requests: int = 0
+    uploaded_photos: int = 0
+    uploaded_bytes: int = 0
+    downloaded_photos: int = 0
+    saved_forms: list[str] = field(default_factory=list)
+
+
+def create_photo(seed: int, size: int = 64) -> bytes:
+    """Creates a small JPEG of one color. Different seeds give different photos,
+    so that the photos on the asite are not duplicates of the new photos.
+    """
+    color: tuple[int, int, int] = (seed * 37 % 256, seed * 91 % 256, seed * 53 % 256)
+    buffer = io.BytesIO()
+    Image.new("RGB", (size, size), color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class MockAsiteServer:
+    """HTTP server of the stand-in of the asite, which works in a separate thread.
+
+    Args:
+        blocks (list[str]): Letters of the blocks. For example: ["A", "B"]
+        levels (int): Number of levels in each block.
+        plots_per_level (int): Number of plots on each level. The plots are numbered through the block,
+            as on the asite: "Plot 01" ... "Plot 06" for two levels with three plots.
+        photos_on_asite (int): Number of photos in item 2.3 of each form.
+        latency (float): Delay of every response in seconds.
+        upload_latency (float): Delay of the upload of every photo in seconds.
+        save_latency (float): Delay of the saving of the form in seconds.
+    """
+
+    def __init__(
+        self,
+        blocks: list[str],
+        levels: int = 2,
+        plots_per_level: int = 3,
+        photos_on_asite: int = 3,
+        latency: float = 0.05,
+        upload_latency: float = 0.2,
+        save_latency: float = 0.5,
+    ) -> None:
+        self.blocks: list[str] = [block.upper() for block in blocks]
+        self.levels: int = levels
+        self.plots_per_level: int = plots_per_level
+        self.photos_on_asite: int = photos_on_asite
+        self.latency: float = latency
+        self.upload_latency: float = upload_latency
+        self.save_latency: float = save_latency
+        self.stats = MockAsiteStats()
+        self._stats_lock: threading.Lock = threading.Lock()
+        self._httpd: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def login_url(self) -> str:
+        return f"{self.base_url}/login"
+
+    @property
+    def quality_plan_url(self) -> str:
+        return f"{self.base_url}/adoddle/quality?action_id=1&plan=new-malden"
+
+    def get_plots(self) -> list[str]:
+        """Returns the codes of all plots of the table.
+
+        Returns:
+            list[str]: For example: ["A_L1_Plot_1", "A_L1_Plot_2", "A_L2_Plot_3"]
+        """
+        return [
+            f"{block}_L{level}_Plot_{(level - 1) * self.plots_per_level + plot}"
+            for block in self.blocks
+            for level in range(1, self.levels + 1)
+            for plot in range(1, self.plots_per_level + 1)
+        ]
+
+    def get_children(self, key: str) -> list[dict]:
+        """Returns the rows of the levels of the block "A" or of the plots of the level "A_L1"."""
+        if key in self.blocks:
+            return [
+                {"key": f"{key}_L{level}", "title": f"Level {level:02}", "kind": "level"}
+                for level in range(1, self.levels + 1)
+            ]
+        block, level = key.split("_L")
+        first_plot: int = (int(level) - 1) * self.plots_per_level + 1
+        return [
+            {"key": f"{block}_L{level}_Plot_{plot}", "title": f"Plot {plot:02}", "kind": "plot"}
+            for plot in range(first_plot, first_plot + self.plots_per_level)
+        ]
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self._stats_lock:
+            setattr(self.stats, name, getattr(self.stats, name) + value)
+
+    def start(self) -> "MockAsiteServer":
+        """Starts the server on a free port of 127.0.0.1."""
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), create_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logging.info(f"The stand-in of the asite works on {self.base_url}")
+        return self
+
+    def stop(self) -> None:
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> "MockAsiteServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def create_handler(server: MockAsiteServer) -> type[BaseHTTPRequestHandler]:
+    """Creates the request handler class bound to the stand-in."""
+
+    class MockAsiteHandler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args) -> None:
+            # The requests are counted in the statistics instead of being logged
+            pass
+
+        def send_body(self, body: bytes, content_type: str, headers: dict[str, str] | None = None) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def send_html(self, page: str) -> None:
+            self.send_body(page.encode("utf-8"), "text/html; charset=utf-8")
+
+        def send_json(self, data: object) -> None:
+            self.send_body(json.dumps(data).encode("utf-8"), "application/json")
+
+        def is_authorized(self) -> bool:
+            return "ASessionID=" in self.headers.get("Cookie", "")
+
+        def do_GET(self) -> None:
+            server.count("requests")
+            time.sleep(server.latency)
+            url = urlparse(self.path)
+            query: dict[str, list[str]] = parse_qs(url.query)
+            if url.path == "/login":
+                return self.send_html(pages.render_login_page())
+            if url.path == "/login/frame":
+                return self.send_html(pages.render_login_frame())
+            if url.path == "/favicon.ico":
+                self.send_response(404)
+                self.end_headers()
+                return
+            if not self.is_authorized():
+                return self.send_html(pages.render_unauthorised_page())
+            if url.path == "/adoddle/home":
+                return self.send_html(pages.render_home_page())
+            if url.path == "/adoddle/quality":
+                if query.get("plan") == ["new-malden"]:
+                    return self.send_html(pages.render_quality_plan_page(server.blocks))
+                return self.send_html(pages.render_quality_list_page())
+            if url.path == "/api/children":
+                return self.send_json(server.get_children(query["key"][0]))
+            if url.path == "/form":
+                return self.send_html(
+                    pages.render_form_page(query["plot"][0], server.photos_on_asite)
+                )
+            if url.path.startswith("/download/"):
+                _, _, block_level_plot, number = url.path.split("/")
+                server.count("downloaded_photos")
+                return self.send_body(
+                    create_photo(zlib.crc32(f"{block_level_plot}/{number}".encode())),
+                    "image/jpeg",
+                    {"Content-Disposition": f'attachment; filename="asite_{block_level_plot}_{number}.jpg"'},
+                )
+            self.send_response(404)
+            self.end_headers()
+
+        def do_POST(self) -> None:
+            server.count("requests")
+            url = urlparse(self.path)
+            query: dict[str, list[str]] = parse_qs(url.query)
+            body: bytes = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if url.path == "/upload":
+                time.sleep(server.upload_latency)
+                server.count("uploaded_photos")
+                server.count("uploaded_bytes", len(body))
+                return self.send_json({"uploaded": query["name"][0]})
+            if url.path == "/save":
+                time.sleep(server.save_latency)
+                with server._stats_lock:
+                    server.stats.saved_forms.append(query["plot"][0])
+                return self.send_json({"saved": query["plot"][0]})
+            self.send_response(404)
+            self.end_headers()
+
+    return MockAsiteHandler
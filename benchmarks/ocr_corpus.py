@@ -0,0 +1,250 @@
+"""Benchmark of the accuracy and the throughput of the OCR on a labelled corpus of photos.
+
+Each configuration (recognition backend, character allowlist, text detection, check of the orange label
+before the OCR, repeated OCR in other rotations, crop strategy, decode scale, batch size of the recognition, number of workers)
+runs recognize_plot of image_sorter_ocr.OCR.easy_ocr_type_2 (extract_text_from_image and output_path)
+over the corpus in a separate process, so that its peak memory is measured alone. The photos are not moved.
+
+The corpus is a folder with labels.json, which maps the file names to the expected folders:
+    {"DFKV5430.JPG": "B_L1_Plot_100", "Marius_175.jpg": "unsorted"}
+Without labels.json the subfolders of the corpus are the labels, as in image_sorter_ocr/sorted
+after the wrongly sorted photos are moved by hand: sorted/B_L1_Plot_100/DFKV5430.JPG
+
+Every row of the table is appended as a JSON line to the results file, to track regressions between runs.
+
+Run from the root of the project:
+    python -m benchmarks.ocr_corpus --corpus ocr_corpus --crops stamp full --scales 1.0 0.5 --workers 1 2
+    python -m benchmarks.ocr_corpus --corpus ocr_corpus --backends easyocr easyocr-int8 onnx --allowlists none plate
+    python -m benchmarks.ocr_corpus --corpus ocr_corpus --detections craft mask
+    python -m benchmarks.ocr_corpus --corpus ocr_corpus --prefilters 0 1 --retries 0 1
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+IMAGE_EXTENSIONS: tuple[str, ...] = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def load_corpus(corpus_dir: Path) -> dict[Path, str]:
+    """Returns the photos of the corpus with their expected folders.
+
+    Returns:
+        dict[Path, str]: For example: {Path("ocr_corpus/B_L1_Plot_100/DFKV5430.JPG"): "B_L1_Plot_100"}
+    """
+    labels_file: Path = corpus_dir / "labels.json"
+    if labels_file.exists():
+        labels: dict[str, str] = json.loads(labels_file.read_text(encoding="utf-8"))
+        return {corpus_dir / name: label for name, label in sorted(labels.items())}
+    return {
+        photo: photo.parent.name
+        for photo in sorted(corpus_dir.glob("*/*"))
+        if photo.suffix.lower() in IMAGE_EXTENSIONS
+    }
+
+
+def get_peak_rss_mb() -> float | None:
+    """Returns the peak resident memory of the current process in megabytes.
+    Without the resource module (Windows) psutil is used, without psutil the memory is not measured.
+    """
+    if resource is not None:
+        peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak / 1024 / (1024 if sys.platform == "darwin" else 1)
+    if psutil is not None:
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+    return None
+
+
+def run_configuration(
+    corpus: dict[Path, str],
+    name_dir_with_script: Path,
+    backend: str,
+    allowlist: str,
+    detection: str,
+    prefilter: bool,
+    retry: bool,
+    crop: str,
+    scale: float,
+    batch_size: int,
+    workers: int,
+) -> dict:
+    """Recognizes all photos of the corpus with one configuration. Runs in a separate process."""
+    # Imported here, so that each configuration loads the models in its own process
+    import image_sorter_ocr.OCR.easy_ocr_type_2 as easy_ocr
+
+    allowlist_characters: str | None = easy_ocr.PLATE_ALPHABET if allowlist == "plate" else None
+    start: float = time.perf_counter()
+    easy_ocr.get_reader(backend)
+    reader_seconds: float = time.perf_counter() - start
+
+    def recognize(photo: Path) -> tuple[Path, str, float]:
+        photo_start: float = time.perf_counter()
+        _, folder_name = easy_ocr.recognize_plot(
+            photo, name_dir_with_script, crop, scale, batch_size, backend, allowlist_characters, detection, prefilter, retry
+        )
+        return photo, folder_name, time.perf_counter() - photo_start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results: list[tuple[Path, str, float]] = list(executor.map(recognize, corpus))
+    total_seconds: float = time.perf_counter() - start
+
+    latencies: list[float] = [seconds for _, _, seconds in results]
+    correct: int = sum(folder_name == corpus[photo] for photo, folder_name, _ in results)
+    unsorted: int = sum(folder_name == "unsorted" for _, folder_name, _ in results)
+    errors: list[dict[str, str]] = [
+        {"photo": photo.name, "expected": corpus[photo], "got": folder_name}
+        for photo, folder_name, _ in results
+        if folder_name != corpus[photo]
+    ]
+    detection_stats: dict[str, int] = easy_ocr.get_detection_stats()
+    prefilter_stats: dict = easy_ocr.get_prefilter_stats()
+    retry_stats: dict = easy_ocr.get_retry_stats()
+    return {
+        "backend": backend,
+        "allowlist": allowlist,
+        "detection": detection,
+        # Part of the images that fell back from the lines of the mask to the detector
+        "fallback_rate": detection_stats["fallback"] / len(results) if detection == "mask" else None,
+        "prefilter": prefilter,
+        # Photos moved to "unsorted" without OCR and the OCR time saved on them
+        "skip_rate": prefilter_stats["skip_rate"],
+        "saved_seconds": prefilter_stats["saved_seconds"],
+        "retry": retry,
+        # Repeated OCRs in other rotations, the labels recognized by them and their extra time per image
+        "retry_rate": retry_stats["retries"] / len(results),
+        "recovered": retry_stats["recovered"],
+        "retry_seconds_per_image": retry_stats["retry_seconds"] / len(results),
+        "crop": crop,
+        "scale": scale,
+        "batch_size": batch_size,
+        "workers": workers,
+        "images": len(results),
+        "images_per_second": len(results) / total_seconds,
+        "p50_seconds": statistics.median(latencies),
+        "p95_seconds": statistics.quantiles(latencies, n=100)[94] if len(latencies) > 1 else latencies[0],
+        "reader_seconds": reader_seconds,
+        "peak_rss_mb": get_peak_rss_mb(),
+        "accuracy": correct / len(results),
+        "unsorted_rate": unsorted / len(results),
+        "errors": errors,
+    }
+
+
+def print_table(rows: list[dict]) -> None:
+    """Prints the results of the configurations as a table."""
+    print(
+        f"{'backend':<12} {'allowlist':<9} {'detect':<6} {'crop':<6} {'scale':>6} {'batch':>5} {'workers':>7} "
+        f"{'img/s':>7} {'p50':>7} {'p95':>7} {'rss MB':>7} {'accuracy':>8} {'unsorted':>8} {'fallback':>8} {'skipped':>8} {'retried':>8}"
+    )
+    for row in rows:
+        rss: str = f"{row['peak_rss_mb']:.0f}" if row["peak_rss_mb"] is not None else "-"
+        fallback: str = f"{row['fallback_rate']:.1%}" if row["fallback_rate"] is not None else "-"
+        print(
+            f"{row['backend']:<12} {row['allowlist']:<9} {row['detection']:<6} {row['crop']:<6} {row['scale']:>6} "
+            f"{row['batch_size']:>5} {row['workers']:>7} "
+            f"{row['images_per_second']:>7.2f} {row['p50_seconds']:>6.2f}s {row['p95_seconds']:>6.2f}s "
+            f"{rss:>7} {row['accuracy']:>8.1%} {row['unsorted_rate']:>8.1%} {fallback:>8} {row['skip_rate']:>8.1%} {row['retry_rate']:>8.1%}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=Path("ocr_corpus"), help="Folder of the labelled corpus.")
+    parser.add_argument(
+        "--name-dir-with-script",
+        type=Path,
+        default=Path("image_sorter_ocr"),
+        help="Folder with plot_mapping.json and window_mapping.json.",
+    )
+    parser.add_argument(
+        "--backends", nargs="+", default=["easyocr"], help="Recognition backends: easyocr, easyocr-int8, onnx."
+    )
+    parser.add_argument(
+        "--allowlists", nargs="+", default=["none"], help="none - all characters, plate - PLATE_ALPHABET."
+    )
+    parser.add_argument("--detections", nargs="+", default=["craft"], help="Text detections: craft, mask.")
+    parser.add_argument(
+        "--prefilters", nargs="+", type=int, default=[0], help="1 - check the orange label before the OCR, 0 - not."
+    )
+    parser.add_argument(
+        "--retries", nargs="+", type=int, default=[1], help="1 - repeat the OCR in other rotations, 0 - not."
+    )
+    parser.add_argument("--crops", nargs="+", default=["stamp"], help="Crop strategies: stamp, full.")
+    parser.add_argument("--scales", nargs="+", type=float, default=[1.0], help="Decode scales.")
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1], help="Batch sizes of the recognition.")
+    parser.add_argument("--workers", nargs="+", type=int, default=[1], help="Numbers of threads.")
+    parser.add_argument("--limit", type=int, default=None, help="Use only the first photos of the corpus.")
+    parser.add_argument(
+        "--results", type=Path, default=Path("ocr_benchmark.jsonl"), help="File to append the rows to."
+    )
+    args = parser.parse_args()
+
+    corpus: dict[Path, str] = load_corpus(args.corpus)
+    if args.limit:
+        corpus = dict(list(corpus.items())[: args.limit])
+    if not corpus:
+        parser.error(f"No labelled photos in {args.corpus}")
+    print(f"{len(corpus)} photos in the corpus, {len(set(corpus.values()))} labels")
+
+    run_id: str = datetime.now().isoformat(timespec="seconds")
+    # "spawn" gives each configuration a clean process, also on Linux, so that the peak memory is its own
+    context = multiprocessing.get_context("spawn")
+    rows: list[dict] = []
+    for backend, allowlist, detection, prefilter, retry, crop, scale, batch_size, workers in itertools.product(
+        args.backends,
+        args.allowlists,
+        args.detections,
+        args.prefilters,
+        args.retries,
+        args.crops,
+        args.scales,
+        args.batch_sizes,
+        args.workers,
+    ):
+        with context.Pool(processes=1) as pool:
+            row: dict = pool.apply(
+                run_configuration,
+                (
+                    corpus,
+                    args.name_dir_with_script,
+                    backend,
+                    allowlist,
+                    detection,
+                    bool(prefilter),
+                    bool(retry),
+                    crop,
+                    scale,
+                    batch_size,
+                    workers,
+                ),
+            )
+        row = {"run": run_id, "corpus": str(args.corpus), **row}
+        rows.append(row)
+        with open(args.results, "a", encoding="utf-8") as results_file:
+            results_file.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    print_table(rows)
+    print(f"Rows appended to {args.results}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark of the start time of main.py.
+
+Compares the eager imports of main.py before utils.lazy_import (easyocr with torch, selenium, PIL
+were imported at the start of every run) with the current main.py:
+    - "python -X importtime": the import time of the modules and the heaviest of them;
+    - the time to the first useful work: the whole run of "python main.py --mode report",
+      which prints the state of the database and exits.
+
+Each case runs in a new process, in an empty temporary folder, so that the database and the logs
+of the project are not touched.
+
+Run from the root of the project:
+    python -m benchmarks.startup_time --runs 3
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_DIR: Path = Path(__file__).resolve().parent.parent
+
+# Modules that main.py imported at its start before the lazy imports
+EAGER_MODULES: tuple[str, ...] = (
+    "image_sorter_ocr.OCR.easy_ocr_type_2",
+    "easyocr",
+    "auth.decorators",
+    "auth.session_manager",
+    "core.forms",
+    "core.navigation",
+    "core.pipeline",
+    "core.worker_pool",
+    "utils.helpers",
+    "imagehash",
+    "PIL.Image",
+    "utils.move_photos_fr_sorted_to_side_rise_structure",
+)
+
+# "import time:       450 |      12345 |   selenium.webdriver"
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+CASES: dict[str, str] = {
+    "eager imports (before)": f"import {', '.join(EAGER_MODULES)}; import main; main.main()",
+    "lazy imports": "import main; main.main()",
+}
+
+
+def run_python(code: str, cwd: Path, *options: str) -> subprocess.CompletedProcess:
+    """Runs the code in a new Python process with the project on sys.path and "--mode report" in sys.argv."""
+    env: dict[str, str] = {**os.environ, "PYTHONPATH": str(PROJECT_DIR)}
+    return subprocess.run(
+        [sys.executable, *options, "-c", code, "--mode", "report"],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def parse_importtime(stderr: str) -> tuple[float, list[tuple[float, str]]]:
+    """Returns the total import time in seconds and the top-level imports with their cumulative time.
+
+    Returns:
+        tuple[float, list[tuple[float, str]]]: For example: (6.2, [(5.1, "image_sorter_ocr"), (0.6, "selenium")])
+    """
+    total: float = 0
+    top_level: list[tuple[float, str]] = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        total += int(self_us) / 1e6
+        # One space of indentation is a module imported by the code itself, not by another module
+        if len(indent) == 1:
+            top_level.append((int(cumulative_us) / 1e6, module))
+    return total, sorted(top_level, reverse=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="Number of runs of each case.")
+    parser.add_argument("--top", type=int, default=8, help="Number of the heaviest imports to print.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, code in CASES.items():
+            result = run_python(code, Path(tmp_dir), "-X", "importtime")
+            import_seconds, top_level = parse_importtime(result.stderr)
+            durations: list[float] = []
+            for _ in range(args.runs):
+                start: float = time.perf_counter()
+                run_python(code, Path(tmp_dir))
+                durations.append(time.perf_counter() - start)
+            print(
+                f"{name:<25} imports {import_seconds:6.2f}s  "
+                f"first useful work: mean {statistics.mean(durations):6.2f}s  min {min(durations):6.2f}s"
+            )
+            for seconds, module in top_level[: args.top]:
+                print(f"    {module:<50} {seconds:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,7 @@
 import logging
-import shutil
 import time
 import datetime
 from pathlib import Path
-from pprint import pprint
 
 from selenium.webdriver import ActionChains
 from selenium.webdriver.chrome.webdriver import WebDriver
@@ -16,13 +14,28 @@ from selenium.webdriver.support.ui import WebDriverWait
 
 from auth.decorators import check_session
 from utils.database import add_photos_to_data_base
+from utils.download_tracker import (
+    get_expected_filenames_from_elements,
+    set_download_dir_for_driver,
+    wait_for_downloads,
+)
+from utils.downloader import (
+    clear_dir,
+    create_session_with_driver_cookies,
+    download_attachments_concurrently,
+    get_attachment_urls_from_elements,
+)
 from utils.helpers import (
     collect_photos_from_photo_dir,
     fill_photo_contractors_competency,
     get_hash_photo_by_dhash,
     get_location_site_area,
 )
+from utils.photo_recompress import get_photos_for_upload, log_recompression_savings, remove_cached_photos
+from utils.photo_store import move_photo
+from utils.progress_journal import get_photos_signature, set_plot_state
 from utils.scroll_to_element import scroll_down_to_element
+from utils.tracing import traced
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
@@ -180,6 +193,126 @@ def wait_for_upload_photo(
     return (driver, photo)
 
 
+def get_upload_states_of_photos(
+    driver: WebDriver, point_xpath: str, filenames: list[str]
+) -> tuple[dict[str, str], int]:
+    """With one request to the browser gets the upload state of each photo in point 2.3.
+
+    Args:
+        driver (WebDriver)
+        point_xpath (str): XPATH of the element of point 2.3 with the list of attachments.
+        filenames (list[str]): Names of the photos being uploaded.
+            For example:
+                ["WhatsApp Image 2025-04-29 at 16.00.05_71d3d084.jpg"]
+
+    Returns:
+        (states, spinners) tuple[dict[str, str], int]: The state of each photo - "pending" (the photo is not
+            in the list of attachments yet), "uploading" or "uploaded" and the number of loading indicators
+            "file.isUploading" in point 2.3.
+            For example:
+                ({"WhatsApp Image 2025-04-29 at 16.00.05_71d3d084.jpg": "uploading"}, 1)
+    """
+    result: dict = driver.execute_script(
+        """
+        const [pointXpath, names] = arguments;
+        const point = document.evaluate(
+            pointXpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+        ).singleNodeValue;
+        const states = {};
+        if (!point) {
+            names.forEach(name => states[name] = "pending");
+            return {states: states, spinners: 0};
+        }
+        const spinnerSelector = 'img[ng-if*="file.isUploading"]';
+        const leaves = Array.from(point.querySelectorAll("*")).filter(el => el.children.length === 0);
+        for (const name of names) {
+            const label = leaves.find(el =>
+                (el.textContent || "").trim() === name || el.getAttribute("title") === name
+            );
+            if (!label) {
+                states[name] = "pending";
+                continue;
+            }
+            // Go up to the element of this attachment, but not to the element with other attachments
+            let item = label;
+            while (
+                item.parentElement && item.parentElement !== point &&
+                !names.some(other => other !== name && item.parentElement.textContent.includes(other))
+            ) {
+                item = item.parentElement;
+            }
+            states[name] = item.querySelector(spinnerSelector) ? "uploading" : "uploaded";
+        }
+        return {states: states, spinners: point.querySelectorAll(spinnerSelector).length};
+        """,
+        point_xpath,
+        filenames,
+    )
+    return (result["states"], result["spinners"])
+
+
+def upload_photos_to_point_2_3_in_bulk(
+    driver: WebDriver,
+    btn_input: WebElement,
+    photos: list[Path],
+    point_xpath: str,
+    timeout: float = 300,
+    poll_interval: float = 0.5,
+) -> tuple[WebDriver, list[Path]]:
+    """Sends all photos into the multi-file input with one "send_keys" (paths joined with a new line),
+    so that the site uploads them in parallel.
+    Then waits until every photo is uploaded and writes to the log the upload time of each photo.
+    Only the photos seen in the "uploaded" state in the list of attachments count as uploaded.
+
+    Args:
+        driver (WebDriver)
+        btn_input (WebElement): Input element with the "multiple" attribute for sending images.
+        photos (list[Path]): Photos to upload.
+        point_xpath (str): XPATH of the element of point 2.3 with the list of attachments.
+        timeout (float, optional): Maximum waiting time for all uploads in seconds. Defaults to 300.
+        poll_interval (float, optional): Time between checks in seconds. Defaults to 0.5.
+
+    Returns:
+        (driver, uploaded_photos) tuple[WebDriver, list[Path]]: Photos that were uploaded.
+    """
+    filenames: list[str] = [photo.name for photo in photos]
+    latency: dict[str, float] = {}
+    start: float = time.perf_counter()
+    # Send all photos at once
+    btn_input.send_keys("\n".join(str(photo) for photo in photos))
+
+    while len(latency) < len(photos):
+        time.sleep(poll_interval)
+        elapsed: float = time.perf_counter() - start
+        states, spinners = get_upload_states_of_photos(driver, point_xpath, filenames)
+        for filename, state in states.items():
+            if state == "uploaded" and filename not in latency:
+                latency[filename] = elapsed
+                logging.info(f"Photo {filename} is upload in {elapsed:.2f}s.")
+        # If there are no loading indicators left, the site does not upload anything any more.
+        # A photo that never appeared as "uploaded" was not uploaded and stays in new_photos_send_to_asite
+        if spinners == 0 and elapsed > 2 and all(
+            state != "uploading" for state in states.values()
+        ):
+            if len(latency) < len(photos):
+                logging.info(
+                    "Photos not found among the attachments of point 2.3: "
+                    f"{[filename for filename in filenames if filename not in latency]}"
+                )
+            break
+        if elapsed > timeout:
+            logging.info(
+                f"Not all photos were uploaded in {timeout}s: "
+                f"{[filename for filename in filenames if filename not in latency]}"
+            )
+            break
+
+    logging.info(
+        f"Uploaded {len(latency)} of {len(photos)} photos in {time.perf_counter() - start:.2f}s."
+    )
+    return (driver, [photo for photo in photos if photo.name in latency])
+
+
 def add_photo_to_side_rise_point_2_3(
     driver: WebDriver,
     dict_plots_with_new_photos: dict[str, list[Path]],
@@ -311,17 +444,40 @@ def add_photo_to_side_rise_point_2_3(
     check_upload_xpath: str = '//img[contains(@ng-if, "file.isUploading")]'
     new_photos_on_asite: list = []
 
-    for new_photo in new_photos:
-        # Send photo
-        btn_input.send_keys(str(new_photo))
-        # Scroll to the add_new_attachment element
-        actions = ActionChains(driver)
-        actions.scroll_to_element(add_new_attachment).perform()
-        # Wait for the photo to load
-        driver, new_photo_on_asite = wait_for_upload_photo(
-            driver, check_upload_xpath, new_photo
+    # Recompressed copies of the photos (or the photos themselves if recompression is disabled):
+    # original photo -> photo to upload
+    photos_for_upload: dict[Path, Path] = get_photos_for_upload(block_level_plot, new_photos)
+    # Uploaded photo -> original photo
+    original_photos: dict[Path, Path] = {
+        photo_for_upload: photo for photo, photo_for_upload in photos_for_upload.items()
+    }
+    upload_start: float = time.perf_counter()
+
+    # ! Send all photos at once into the multi-file input if it is on the page
+    point_xpath: str = "//div[contains(text(), '2.3')]/ancestor::div[contains(@class, 'activity-row')]"
+    multi_input_xpath: str = '//div[.//div[normalize-space(text()) = "2.3"]]//input[contains(@id, "imgupload_multi_AttachedDocs")]'
+    multi_inputs: list[WebElement] = driver.find_elements(By.XPATH, multi_input_xpath)
+    if multi_inputs and multi_inputs[0].get_attribute("multiple") is not None and new_photos:
+        driver, uploaded_photos = upload_photos_to_point_2_3_in_bulk(
+            driver, multi_inputs[0], list(photos_for_upload.values()), point_xpath
         )
-        new_photos_on_asite.append(new_photo_on_asite)
+        new_photos_on_asite = [original_photos[photo] for photo in uploaded_photos]
+    else:
+        # Send photos one by one
+        for new_photo in new_photos:
+            # Send photo
+            btn_input.send_keys(str(photos_for_upload[new_photo]))
+            # Scroll to the add_new_attachment element
+            actions = ActionChains(driver)
+            actions.scroll_to_element(add_new_attachment).perform()
+            # Wait for the photo to load
+            driver, new_photo_on_asite = wait_for_upload_photo(
+                driver, check_upload_xpath, new_photo
+            )
+            new_photos_on_asite.append(new_photo_on_asite)
+    log_recompression_savings(
+        block_level_plot, photos_for_upload, time.perf_counter() - upload_start
+    )
     return (driver, new_photos_on_asite)
 
 
@@ -348,12 +504,90 @@ def download_photos_from_asite_block_level_plot_2_3_to_os(
         # Scroll to the top of the photo_element
         driver.execute_script(f"window.scrollBy(0, {height - 150});")
         time.sleep(1)
-        # Click on photo_element
+        # Click on photo_element.
+        # Completion of the download is checked by wait_for_downloads, so there is no need to wait here
         photo_element.click()
-        time.sleep(1)
     return driver
 
 
+@check_session
+def download_photos_from_asite_block_level_plot_2_3_over_http(
+    driver: WebDriver,
+    photos_on_asite_elements: list[WebElement],
+    download_dir: Path,
+    block_level_plot: str,
+) -> tuple[WebDriver, list[Path]]:
+    r"""Download photos from Side-Rise inspection of specific location block_level_plot from point 2.3
+    without clicking on them. The links to the photos are read from the page,
+    the cookies of the browser are copied into the "requests" session
+    and all photos are downloaded at the same time into a separate folder of the plot:
+    download_dir\block_level_plot
+
+    If the links can not be read from the page or some files could not be downloaded,
+    the photos are downloaded by clicking on them as before.
+
+    Args:
+        driver (WebDriver)
+
+        photos_on_asite_elements (list[WebElement]): List of photos that are already on asite in point 2.3
+
+        download_dir (Path): Folder for uploading photos from point 2.3.
+            For example:
+                Path(r"C:\Users\Human\Downloads\download_from_asite")
+
+        block_level_plot (str): The apartment code adopted in this project.
+            For example:
+                "A_L1_Plot_1"
+
+    Returns:
+        (driver, photos_from_download_dir) tuple[WebDriver, list[Path]]: List of downloaded photos.
+            For example:
+                (
+                    WebDriver,
+                    [WindowsPath('C:/Users/Human/Downloads/download_from_asite/A_L1_Plot_6/APIM8352.JPG')]
+                )
+    """
+    # Separate folder of the plot, so that photos of the previous plot do not get into it
+    plot_download_dir: Path = download_dir / block_level_plot
+    clear_dir(plot_download_dir)
+
+    urls: list[str] = get_attachment_urls_from_elements(driver, photos_on_asite_elements)
+    if len(urls) == len(photos_on_asite_elements):
+        session = create_session_with_driver_cookies(driver)
+        with session:
+            photos, failed = download_attachments_concurrently(
+                session, urls, plot_download_dir
+            )
+        if not failed:
+            return (driver, photos)
+        logging.info(f"{len(failed)} photos were not downloaded over http.")
+    else:
+        logging.info(
+            f"Found {len(urls)} links for {len(photos_on_asite_elements)} photos in point 2.3."
+        )
+    # Download the photos by clicking on them into the folder of the plot
+    logging.info("Download photos from point 2.3 by clicking on them.")
+    clear_dir(plot_download_dir)
+    expected_filenames: list[str] = get_expected_filenames_from_elements(
+        driver, photos_on_asite_elements
+    )
+    driver = set_download_dir_for_driver(driver, plot_download_dir)
+    try:
+        driver = download_photos_from_asite_block_level_plot_2_3_to_os(
+            driver, photos_on_asite_elements
+        )
+        # Wait exactly until every photo is downloaded: by the names of the links
+        # or, if Chrome saved them under other names, by the number of files in the cleared folder
+        photos_from_download_dir: list[Path] = wait_for_downloads(
+            plot_download_dir,
+            expected_filenames=expected_filenames,
+            expected_count=len(photos_on_asite_elements),
+        )
+    finally:
+        driver = set_download_dir_for_driver(driver, download_dir)
+    return (driver, photos_from_download_dir)
+
+
 def get_list_photos_from_download_dir_os(
     download_dir: Path = Path(r"C:\Users\Human\Downloads\download_from_asite"),
     extensions: tuple[str, ...] = (".jpg", ".jpeg"),
@@ -438,11 +672,12 @@ def move_photos_from_download_dir_to_photos_on_asite(
 
     for photo in photos_from_download_dir:
         dest = target_dir / photo.name
-        shutil.move(str(photo), str(dest))
+        move_photo(photo, dest)
 
     return list(target_dir.iterdir())
 
 
+@traced()
 def move_duplicate_photos_from_new_photos_send_to_asite_to_photos_to_delete(
     new_photos: list[Path],
     photos_on_asite: list[Path],
@@ -500,15 +735,12 @@ def move_duplicate_photos_from_new_photos_send_to_asite_to_photos_to_delete(
         # Move a photo from the new_photos folder, for example
         # D:\WORK\Horand_LTD\TASK TO DO\Locations with data for inspections\SideRise\A_L1_Plot_6\2.3\new_photos_send_to_asite\viewThumb (1).jpg
         # to folder C:\Users\Human\Downloads\photos_to_delete\viewThumb (1).jpg
-        shutil.move(str(new_photo_to_delete), str(dest))
+        move_photo(new_photo_to_delete, dest)
         new_photos_to_delete.remove(new_photo_to_delete)
         new_photos.remove(new_photo_to_delete)
 
-    logging.info("\n new_photos after delete")
-    pprint(new_photos)
-
-    logging.info("\n new_photos_to_delete after delete")
-    pprint(new_photos_to_delete)
+    logging.debug(f"new_photos after delete: {new_photos}")
+    logging.debug(f"new_photos_to_delete after delete: {new_photos_to_delete}")
     return new_photos
 
 
@@ -561,11 +793,54 @@ def move_photos_from_new_photos_to_photos_not_on_asite(
         dest: Path = base_dir / block_level_plot / photos_not_on_asite / new_photo.name
         # Move photos from new_photos_send_to_asite
         # to photos_not_on_asite_because_in_2_3_already_30_photos
-        shutil.move(str(new_photo), str(dest))
+        move_photo(new_photo, dest)
         logging.info(f"Move {str(new_photo)} to {str(dest)}")
 
 
-@check_session
+def move_uploaded_photos_to_photos_on_asite(
+    base_dir: Path, block_level_plot: str, new_photos_on_asite: list[Path]
+) -> None:
+    r"""Moves the photos uploaded to point 2.3 and saved in the form
+    from the new_photos_send_to_asite folder to the photos_on_asite folder of the plot
+    and adds the photos of the photos_on_asite folder to the database.
+    Called only after the form has been saved, so that photos of an unsaved form stay in the folder
+    with new photos and are uploaded again by the next run.
+
+    Args:
+        base_dir (Path): Base directory with plots.
+            Path(r"D:\WORK\Horand_LTD\TASK TO DO\Locations with data for inspections\SideRise")
+        block_level_plot (str): The apartment code. For example: "A_L1_Plot_1"
+        new_photos_on_asite (list[Path]): Uploaded photos that are still in the new_photos_send_to_asite folder.
+    """
+    dir_with_photos_uploaded_on_asite: Path = Path(r"2.3\photos_on_asite")
+    # The uploaded photos are not recompressed again
+    remove_cached_photos(new_photos_on_asite)
+    for new_photo in new_photos_on_asite:
+        dest: Path = (
+            base_dir
+            / block_level_plot
+            / dir_with_photos_uploaded_on_asite
+            / new_photo.name
+        )
+        # Move photos sent to Side-Rise inspection to block_level_plot location in step 2.3
+        # from new_photos_send_to_asite folder to photos_on_asite folder
+        move_photo(new_photo, dest)
+        logging.info(f"Move {str(new_photo)} to {str(dest)}")
+
+    photos_on_asite_path: Path = base_dir / block_level_plot / dir_with_photos_uploaded_on_asite
+    logging.info(f"{photos_on_asite_path=}")
+
+    photos_on_asite: list[Path] = collect_photos_from_photo_dir(photos_on_asite_path)
+    logging.info(f"{photos_on_asite=}")
+
+    # Add photos sent to asite to the database
+    add_photos_to_data_base(
+        block_level_plot,
+        str(dir_with_photos_uploaded_on_asite),
+        photos_on_asite,
+    )
+
+
 def fill_created_form(
     driver: WebDriver,
     dict_plots_with_new_photos: dict[str, list[Path]],
@@ -606,7 +881,6 @@ def fill_created_form(
     Returns:
         WebDriver
     """
-    dir_with_photos_uploaded_on_asite: Path = Path(r"2.3\photos_on_asite")
     wait: WebDriverWait = WebDriverWait(driver, 10)
     # Wait for the page to load
     iframe_with_form: WebElement = wait.until(
@@ -668,41 +942,15 @@ def fill_created_form(
 
     # List of new photos
     new_photos: list[Path] = dict_plots_with_new_photos[block_level_plot]
-    logging.info("new_photos")
-    pprint(new_photos)
+    logging.info(f"New photos: {len(new_photos)}", extra={"plot": block_level_plot})
+    logging.debug(f"new_photos: {new_photos}", extra={"plot": block_level_plot})
     # new_photos_on_asite: list[Path]]
     driver, new_photos_on_asite = add_photo_to_side_rise_point_2_3(
         driver, dict_plots_with_new_photos, block_level_plot
     )
-    logging.info("\n new_photos_on_asite:")
-    pprint(new_photos_on_asite)
-
-    for new_photo in new_photos_on_asite:
-        dest: Path = (
-            base_dir
-            / block_level_plot
-            / dir_with_photos_uploaded_on_asite
-            / new_photo.name
-        )
-        # Move photos sent to Side-Rise inspection to block_level_plot location in step 2.3
-        # from new_photos_send_to_asite folder to photos_on_asite folder
-        shutil.move(str(new_photo), str(dest))
-        logging.info(f"Move {str(new_photo)} to {str(dest)}")
-
-    photos_on_asite_path: Path = (
-        base_dir / block_level_plot / Path(r"2.3\photos_on_asite")
-    )
-    logging.info(f"{photos_on_asite_path=}")
-
-    photos_on_asite: list[Path] = collect_photos_from_photo_dir(photos_on_asite_path)
-    logging.info(f"{photos_on_asite=}")
-
-    # Add photos sent to asite to the database
-    add_photos_to_data_base(
-        block_level_plot,
-        str(dir_with_photos_uploaded_on_asite),
-        photos_on_asite,
-    )
+    logging.info(f"Uploaded photos: {len(new_photos_on_asite)}", extra={"plot": block_level_plot})
+    logging.debug(f"new_photos_on_asite: {new_photos_on_asite}", extra={"plot": block_level_plot})
+    set_plot_state(block_level_plot, "uploaded", get_photos_signature(new_photos_on_asite))
 
     # ! Set the date in the calendar - the current date and the month that will be in half a year
     driver = set_date_to_created_inspection(driver)
@@ -714,4 +962,7 @@ def fill_created_form(
     # # Switch to default iframe
     driver.switch_to.default_content()
     time.sleep(2)
+    set_plot_state(block_level_plot, "saved")
+    # Move the uploaded photos only after the form is saved
+    move_uploaded_photos_to_photos_on_asite(base_dir, block_level_plot, new_photos_on_asite)
     return driver
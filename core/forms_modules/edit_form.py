@@ -1,8 +1,6 @@
 import logging
-import shutil
 import time
 from pathlib import Path
-from pprint import pprint
 
 from selenium.webdriver import ActionChains
 from selenium.webdriver.chrome.webdriver import WebDriver
@@ -14,9 +12,12 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
 from auth.decorators import check_session
-from core.forms import add_photo_to_side_rise_point_2_3, insert_data_into_field
-from utils.database import add_photos_to_data_base
-from utils.helpers import collect_photos_from_photo_dir
+from core.forms import (
+    add_photo_to_side_rise_point_2_3,
+    insert_data_into_field,
+    move_uploaded_photos_to_photos_on_asite,
+)
+from utils.progress_journal import get_photos_signature, set_plot_state
 from utils.scroll_to_element import scroll_down_to_element
 
 
@@ -73,7 +74,6 @@ def edit_form(
     Returns:
         WebDriver
     """
-    final_dir_name_with_photos_uploaded_on_asite: Path = Path(r"2.3\photos_on_asite")
     wait: WebDriverWait = WebDriverWait(driver, 5)
     # Get a button to switch to the inspection form editing mode
     btn_edit_form_xpath: str = '//*[@id="edit-ori-btn"]/i'
@@ -192,41 +192,14 @@ def edit_form(
     # details, specifications and that only Barratt approved materials have been used.
     # Please attach various photos proving compliance.
     # ! Work if in the Side-Rise location in point 2.3 on asite there are less than 30 photos
+    new_photos_on_asite: list[Path] = []
     if add_photo_or_not != "Not add photo":
         driver, new_photos_on_asite = add_photo_to_side_rise_point_2_3(
             driver, dict_plots_with_new_photos, block_level_plot
         )
-        logging.info("\n new_photos_on_asite:")
-        pprint(new_photos_on_asite)
-
-        for new_photo in new_photos_on_asite:
-            dest: Path = (
-                base_dir
-                / block_level_plot
-                / final_dir_name_with_photos_uploaded_on_asite
-                / new_photo.name
-            )
-            # Move photos sent to Side-Rise inspection of block_level_plot location in point 2.3
-            # from new_photos_send_to_asite folder on PC to photos_on_asite folder on PC
-            shutil.move(str(new_photo), str(dest))
-            logging.info(f"Move {str(new_photo)} to {str(dest)}")
-
-        photos_on_asite_path: Path = (
-            base_dir / block_level_plot / Path(r"2.3\photos_on_asite")
-        )
-        logging.info(f"{photos_on_asite_path=}")
-
-        photos_on_asite_list: list[Path] = collect_photos_from_photo_dir(
-            photos_on_asite_path
-        )
-        logging.info(f"{photos_on_asite_list=}")
-
-        # Add to the database photos sent to Side-Rise inspection in item 2.3 on asite
-        add_photos_to_data_base(
-            block_level_plot,
-            str(final_dir_name_with_photos_uploaded_on_asite),
-            photos_on_asite_list,
-        )
+        logging.info(f"Uploaded photos: {len(new_photos_on_asite)}", extra={"plot": block_level_plot})
+        logging.debug(f"new_photos_on_asite: {new_photos_on_asite}", extra={"plot": block_level_plot})
+        set_plot_state(block_level_plot, "uploaded", get_photos_signature(new_photos_on_asite))
     # Get the "Update" button and click on it
     btn_update_xpath: str = '//*[@id="btnSaveForm"]'
     btn_update: WebElement = wait.until(EC.element_to_be_clickable((By.XPATH, btn_update_xpath)))
@@ -239,4 +212,9 @@ def edit_form(
             (By.XPATH, '//div[contains(@class, "form-container")]'), "class", "loaded"
         )
     )
+    set_plot_state(block_level_plot, "saved")
+    # Move photos sent to Side-Rise inspection of block_level_plot location in point 2.3
+    # from new_photos_send_to_asite folder on PC to photos_on_asite folder on PC
+    # only after the form is saved
+    move_uploaded_photos_to_photos_on_asite(base_dir, block_level_plot, new_photos_on_asite)
     return driver
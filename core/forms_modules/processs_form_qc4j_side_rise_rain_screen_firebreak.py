@@ -3,7 +3,6 @@ import logging
 # import shutil
 import time
 from pathlib import Path
-from pprint import pprint
 
 # from selenium.webdriver import ActionChains
 from selenium.webdriver.chrome.webdriver import WebDriver
@@ -16,14 +15,14 @@ from selenium.webdriver.support.ui import WebDriverWait
 
 from auth.decorators import check_session
 from core.forms import (
-    download_photos_from_asite_block_level_plot_2_3_to_os,
-    get_list_photos_from_download_dir_os,
+    download_photos_from_asite_block_level_plot_2_3_over_http,
     move_duplicate_photos_from_new_photos_send_to_asite_to_photos_to_delete,
     move_photos_from_download_dir_to_photos_on_asite,
     move_photos_from_new_photos_to_photos_not_on_asite,
 )
 from core.forms_modules.edit_form import edit_form
 from utils.database import add_photos_to_data_base
+from utils.progress_journal import set_plot_state
 from utils.scroll_to_element import scroll_down_to_element
 
 
@@ -117,6 +116,7 @@ def processs_form_qc4j_side_rise_rain_screen_firebreak(
         time.sleep(1)
         # If the page is not editable, then close it and return to the main page
         logging.info(f"Cтраница не редактируемая {bool(is_not_editable_inspection)=}")
+        set_plot_state(block_level_plot, "failed", error="The inspection form is not editable")
         main_tab = driver.window_handles[0]
         driver.close()
         # Go to the main page (change context for Selenium)
@@ -191,22 +191,23 @@ def processs_form_qc4j_side_rise_rain_screen_firebreak(
             if len(photos_on_asite_elements) < 30:
                 add_photo_or_not = "."
                 logging.info(f"{add_photo_or_not=}")
-                # Download Side-Rise inspection photos for location block_level_plot from section 2.3
-                driver = download_photos_from_asite_block_level_plot_2_3_to_os(
-                    driver, photos_on_asite_elements
-                )
-                # List of photos downloaded from Side-Rise inspection for location block_level_plot item 2.3,
-                # which are currently in the PC download folder
-                photos_from_download_dir: list[Path] = (
-                    get_list_photos_from_download_dir_os(download_dir)
+                # Download Side-Rise inspection photos for location block_level_plot from section 2.3.
+                # Get the list of photos downloaded from Side-Rise inspection for location block_level_plot
+                # item 2.3, which are currently in the PC download folder
+                photos_from_download_dir: list[Path]
+                driver, photos_from_download_dir = (
+                    download_photos_from_asite_block_level_plot_2_3_over_http(
+                        driver, photos_on_asite_elements, download_dir, block_level_plot
+                    )
                 )
                 # logging.info("photos_from_download_dir")
                 # pprint(photos_from_download_dir)
+                set_plot_state(block_level_plot, "downloaded")
 
                 # List of new photos to upload to the inspection form
                 new_photos: list[Path] = dict_plots_with_new_photos[block_level_plot]
-                logging.info("new_photos")
-                pprint(new_photos)
+                logging.info(f"New photos: {len(new_photos)}", extra={"plot": block_level_plot})
+                logging.debug(f"new_photos: {new_photos}", extra={"plot": block_level_plot})
                 # Move the list of photos downloaded from Side-Rise to the block_level_plot location of point 2.3
                 # (these photos are currently located in the download folder
                 # C:\Users\Human\Downloads\download_from_asite)
@@ -220,8 +221,8 @@ def processs_form_qc4j_side_rise_rain_screen_firebreak(
                         photos_from_download_dir,
                     )
                 )
-                logging.info("photos_on_asite")
-                pprint(photos_on_asite)
+                logging.info(f"Photos on asite: {len(photos_on_asite)}", extra={"plot": block_level_plot})
+                logging.debug(f"photos_on_asite: {photos_on_asite}", extra={"plot": block_level_plot})
                 # ! - - - - - - - - - - - - -
                 # From the new photos in the new_photos folder, move the photos duplicated in the photos_on_asite folder to the photos_to_delete folder.
                 new_photos_without_duplicates: list[Path] = (
@@ -234,6 +235,7 @@ def processs_form_qc4j_side_rise_rain_screen_firebreak(
                 dict_plots_with_new_photos[block_level_plot] = (
                     new_photos_without_duplicates
                 )
+                set_plot_state(block_level_plot, "deduped")
             # ! Work if there are more than or equal to 30 photos in the inspection.
             elif len(photos_on_asite_elements) >= 30:
                 add_photo_or_not = "Not add photo"
@@ -243,14 +245,13 @@ def processs_form_qc4j_side_rise_rain_screen_firebreak(
                 move_photos_from_new_photos_to_photos_not_on_asite(
                     base_dir, dict_plots_with_new_photos, block_level_plot
                 )
-                # Download Side-Rise inspection photos for location block_level_plot from point 2.3 to PC
-                driver = download_photos_from_asite_block_level_plot_2_3_to_os(
-                    driver, photos_on_asite_elements
-                )
-                # List of photos downloaded from Side-Rise by location block_level_plot point 2.3,
+                # Download Side-Rise inspection photos for location block_level_plot from point 2.3 to PC.
+                # Get the list of photos downloaded from Side-Rise by location block_level_plot point 2.3,
                 # which are currently in the PC download folder
-                photos_from_download_dir = get_list_photos_from_download_dir_os(
-                    download_dir
+                driver, photos_from_download_dir = (
+                    download_photos_from_asite_block_level_plot_2_3_over_http(
+                        driver, photos_on_asite_elements, download_dir, block_level_plot
+                    )
                 )
                 # logging.info("photos_from_download_dir")
                 # pprint(photos_from_download_dir)
@@ -266,8 +267,8 @@ def processs_form_qc4j_side_rise_rain_screen_firebreak(
                     block_level_plot,
                     photos_from_download_dir,
                 )
-                logging.info("photos_on_asite")
-                pprint(photos_on_asite)
+                logging.info(f"Photos on asite: {len(photos_on_asite)}", extra={"plot": block_level_plot})
+                logging.debug(f"photos_on_asite: {photos_on_asite}", extra={"plot": block_level_plot})
                 # Add to the Database photos that were not entered by the script,
                 # but were already and are now on asite
                 add_photos_to_data_base(
@@ -275,6 +276,17 @@ def processs_form_qc4j_side_rise_rain_screen_firebreak(
                     str(Path(r"2.3\photos_on_asite")),
                     photos_on_asite,
                 )
+                set_plot_state(block_level_plot, "downloaded")
+        except TimeoutError as err:
+            # The photos of point 2.3 were not downloaded: without them the new photos can not be
+            # compared with the photos on asite, so the plot is left for the next pass
+            logging.info(f"{err}", extra={"plot": block_level_plot})
+            set_plot_state(block_level_plot, "failed", error=str(err))
+            main_tab = driver.window_handles[0]
+            driver.close()
+            # Go to the main page (change context for Selenium)
+            driver.switch_to.window(main_tab)
+            return driver
         # ! Work if there are no photos in point 2.3
         except Exception:
             # Label for the inspection editing mechanism to work
@@ -304,6 +316,9 @@ def processs_form_qc4j_side_rise_rain_screen_firebreak(
                 block_level_plot,
                 add_photo_or_not,
             )
+        else:
+            # Nothing to change in the form
+            set_plot_state(block_level_plot, "saved")
         # Switch to main page
         main_tab = driver.window_handles[0]
         driver.close()
@@ -4,7 +4,10 @@ from pathlib import Path
 
 # Importing Selenium WebDriver to interact with the browser
 from selenium import webdriver
-from selenium.common.exceptions import ElementClickInterceptedException
+from selenium.common.exceptions import (
+    ElementClickInterceptedException,
+    ElementNotInteractableException,
+)
 from selenium.webdriver import ActionChains
 from selenium.webdriver.chrome.webdriver import WebDriver
 from selenium.webdriver.common.by import By
@@ -15,15 +18,21 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
 from auth.decorators import check_session
+from auth.session_manager import get_quality_plan_url, set_quality_plan_url
+from auth.web_driver import set_images_blocked
 from core.forms import fill_created_form
 from core.forms_modules.processs_form_qc4j_side_rise_rain_screen_firebreak import (
     processs_form_qc4j_side_rise_rain_screen_firebreak,
 )
+from core.tab_pipeline import process_plots_in_tabs
+from utils.checkpoint import save_checkpoint
 from utils.helpers import (
     edit_or_create_inspection,
     get_location_title,
     set_color_to_element,
 )
+from utils.photo_recompress import prepare_photos_for_upload
+from utils.progress_journal import track_plot_failure
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
@@ -98,6 +107,100 @@ def click_new_malden_quality_plan(driver: WebDriver) -> WebDriver:
     return driver
 
 
+def close_announcement_modal(driver: WebDriver) -> WebDriver:
+    """Closes the modal window with the announcement on the start page of the asite if it is shown.
+
+    Args:
+        driver (WebDriver)
+
+    Returns:
+        WebDriver
+    """
+    try:
+        btn_modal_xpath: str = (
+            '//div[contains(@class, "modal-scrollable")]//*[@id="myModal-annoucement"]/div[1]/button'
+        )
+        btn_modal: WebElement = WebDriverWait(driver, 5).until(
+            EC.visibility_of_element_located((By.XPATH, btn_modal_xpath))
+        )
+        btn_modal.click()
+    except Exception:
+        logging.info("There is no modal window.")
+    return driver
+
+
+def open_new_malden_quality_plan(driver: WebDriver) -> WebDriver:
+    """Goes from the start page of the asite to the "New Malden Quality Plan" table:
+    closes the announcement, clicks "More" -> "Quality" -> "New Malden Quality Plan".
+
+    Args:
+        driver (WebDriver): Authorized driver.
+
+    Returns:
+        WebDriver
+    """
+    driver = close_announcement_modal(driver)
+    time.sleep(1)
+    driver = click_btn_more(driver)
+    time.sleep(0.5)
+    driver = click_btn_quality(driver)
+    driver = click_new_malden_quality_plan(driver)
+    return driver
+
+
+def go_to_new_malden_quality_plan(driver: WebDriver) -> WebDriver:
+    """Opens the "New Malden Quality Plan" table directly by its address, if it is already known.
+    Otherwise goes to it through the menu and remembers the address for the next time.
+
+    Args:
+        driver (WebDriver): Authorized driver.
+
+    Returns:
+        WebDriver
+    """
+    table_xpath: str = '//*[@id="table_body_header_scroller"]'
+    quality_plan_url: str | None = get_quality_plan_url()
+    start: float = time.perf_counter()
+    if quality_plan_url:
+        try:
+            driver.get(quality_plan_url)
+            WebDriverWait(driver, 20).until(
+                EC.visibility_of_element_located((By.XPATH, table_xpath))
+            )
+            logging.info(
+                f"Opened the quality plan by address in {time.perf_counter() - start:.2f}s."
+            )
+            return driver
+        except Exception as err:
+            logging.info(f"Could not open the quality plan by address: {err}")
+            set_quality_plan_url(None)
+            driver.get("https://adoddleak.asite.com/adoddle/home?action_id=1")
+    driver = open_new_malden_quality_plan(driver)
+    WebDriverWait(driver, 100).until(
+        EC.visibility_of_element_located((By.XPATH, table_xpath))
+    )
+    set_quality_plan_url(driver.current_url)
+    logging.info(f"Opened the quality plan through the menu in {time.perf_counter() - start:.2f}s.")
+    return driver
+
+
+def is_end_of_table(driver: WebDriver, number_line: int) -> bool:
+    """Checks whether the row "number_line" is after the last row of the "Activities / Locations" column.
+    If the table has not been loaded yet, the end of the table is not reported.
+
+    Args:
+        driver (WebDriver)
+        number_line (int): The row number of the "Activities / Locations" column.
+
+    Returns:
+        bool
+    """
+    rows: list[WebElement] = driver.find_elements(
+        By.XPATH, '//*[@id="table_body_header_scroller"]/div/div'
+    )
+    return 0 < len(rows) < number_line
+
+
 @check_session
 def click_arrow_to_open_block(driver: WebDriver, number_line: int) -> WebDriver:
     """The function clicks on the arrow in the "Block N" cells on the next page of the asite.
@@ -222,9 +325,10 @@ def click_select_form_action(
     try:
         # Click to bring up the "Select Form Action" options popup
         btn_select_form_action.click()
-    except ElementClickInterceptedException:
+    except (ElementClickInterceptedException, ElementNotInteractableException):
         logging.info("Work click_select_form_action ElementClickInterceptedException")
         # Use JavaScript to click on an element if the element is covered
+        # or has no size (images are blocked in the production mode)
         driver.execute_script("arguments[0].click();", btn_select_form_action)
     return driver
 
@@ -334,6 +438,9 @@ def moving_through_quality_checklist(
     letter_block_to_start: str | bool = False,
     number_level_to_start: str | bool = False,
     number_plot_to_start: str | bool = False,
+    blocks_to_process: set[str] | None = None,
+    number_of_prefetch_tabs: int = 0,
+    checkpoint_file: Path | None = None,
 ) -> WebDriver:
     r"""
     The function moves from top to bottom along the rows of the "Activities / Locations" column of the
@@ -381,6 +488,18 @@ def moving_through_quality_checklist(
         number_level_to_start (str | bool): The floor number from which the script will start working.
             By default is False.
         number_plot_to_start (str | bool): Номер квартиры с которой скрипт начнет работу. By default is False.
+        blocks_to_process (set[str] | None): Letters of the blocks that this driver processes.
+            The other blocks are not opened and the function stops when all these blocks are processed.
+            Used by the worker pool, where each browser processes its own blocks.
+            For example:
+                {"A", "C"}
+            By default is None - all blocks are processed.
+        number_of_prefetch_tabs (int): Number of forms of the next plots of the level that are opened
+            in background tabs while the form of the current plot is being filled.
+            By default is 0 - each form is opened only when its row is reached.
+        checkpoint_file (Path | None): File where the last processed plot is saved,
+            so that an interrupted pass can be resumed from it.
+            By default is None - the checkpoint is not saved.
 
     Variables:
         block_level_plot (str): The apartment code adopted in this project.
@@ -398,8 +517,18 @@ def moving_through_quality_checklist(
     block_letter: str = ""
     level_number: int | None = None
     plot_number: int | None = None
+    # Plots whose forms have already been processed in the background tabs
+    processed_plots: set[str] = set()
+    # Blocks of "blocks_to_process" reached in the table
+    processed_blocks: set[str] = set()
+    # Do not load images of the table in the production mode
+    driver = set_images_blocked(driver, True)
 
     while stopword:
+        # Stop after the last row of the table
+        if is_end_of_table(driver, number_line):
+            logging.info(f"End of the table on the row {number_line}.")
+            break
         # Get the text content of the current cell of the "Activities / Locations" column
         # (Block or Level or Plot) of the "New Malden Quality Plan" table.
         driver, location_title = get_location_title(driver, number_line)
@@ -414,6 +543,16 @@ def moving_through_quality_checklist(
             if "block" in location_title:
                 # Block name letter from "location_title"
                 block_letter = str(location_title.split()[-1]).upper()
+                # Skip blocks of other workers and stop when all blocks of this worker are processed.
+                # The order of the blocks in the table is not relied on
+                if blocks_to_process is not None:
+                    if blocks_to_process <= processed_blocks:
+                        logging.info(f"All blocks {sorted(blocks_to_process)} are processed.")
+                        break
+                    if block_letter not in blocks_to_process:
+                        number_line += 1
+                        continue
+                    processed_blocks.add(block_letter)
                 # Works if "letter_block_to_start" is False.
                 # That is, if "letter_block_to_start" was never set by the user at the beginning of the script
                 # or when "letter_block_to_start" was set by the user,
@@ -465,16 +604,25 @@ def moving_through_quality_checklist(
                 logging.info(f"{block_level_plot=}")
                 logging.info(f"{block_level_plot in dict_plots_with_new_photos=}")
 
+                # The start plot is reached. It is checked for every plot and not only for the plots
+                # with new photos, otherwise a start plot without new photos would never start the work
+                if number_plot_to_start and location_title == f"plot {number_plot_to_start}":
+                    number_plot_to_start = False
+
                 # If location "block_level_plot" is in dictionary with new photos "dict_plots_with_new_photos"
-                if block_level_plot in dict_plots_with_new_photos:
-                    if (
-                        not number_plot_to_start
-                        or location_title == f"plot {number_plot_to_start}"
-                    ):
+                # and its form has not been processed in a background tab yet
+                if (
+                    block_level_plot in dict_plots_with_new_photos
+                    and block_level_plot not in processed_plots
+                ):
+                    if not number_plot_to_start:
                         # ! WORK HERE
                         # ! WORK HERE
-                        number_plot_to_start = False
                         logging.info(f"in elif plot {block_level_plot=}")
+                        # Start recompressing the new photos of the plot while the form is opening
+                        prepare_photos_for_upload(
+                            block_level_plot, dict_plots_with_new_photos[block_level_plot]
+                        )
                         # Determine what needs to be done: edit the inspection or create a new one
                         driver, element, edit_or_create = edit_or_create_inspection(
                             driver, number_line
@@ -496,38 +644,61 @@ def moving_through_quality_checklist(
                             element,
                         )
                         # time.sleep(1)
-                        if edit_or_create is not None:
-                            # Work if variable "edit_or_create" contains word "edit"
-                            if edit_or_create == "edit":
-                                # Click on "element" (inspection progress element with text "In Progress")
-                                driver = click_card_in_progress(driver, element)
-                                # If a new (second) tab is opened
-                                if len(driver.window_handles) > 1:
-                                    # Switch to a new tab with inspection by current apartment
-                                    driver = switch_to_new_tab(driver)
-                                    # Process the open tab with the inspection form of the current apartment
-                                    driver = processs_form_qc4j_side_rise_rain_screen_firebreak(
+                        # Record the plot as "failed" in the progress journal if its processing raises an error
+                        with track_plot_failure(block_level_plot):
+                            if edit_or_create is not None:
+                                # Work if variable "edit_or_create" contains word "edit"
+                                if edit_or_create == "edit" and number_of_prefetch_tabs > 0:
+                                    # Open the form of this plot and the forms of the next plots in tabs
+                                    # and process them as soon as each of them is loaded
+                                    driver = process_plots_in_tabs(
                                         driver,
                                         base_dir,
                                         download_dir,
                                         dict_plots_with_new_photos,
+                                        number_line,
+                                        block_letter,
+                                        level_number,
+                                        block_level_plot,
+                                        element,
+                                        processed_plots,
+                                        number_of_prefetch_tabs,
+                                    )
+                                elif edit_or_create == "edit":
+                                    # Click on "element" (inspection progress element with text "In Progress")
+                                    driver = click_card_in_progress(driver, element)
+                                    # If a new (second) tab is opened
+                                    if len(driver.window_handles) > 1:
+                                        # Switch to a new tab with inspection by current apartment
+                                        driver = switch_to_new_tab(driver)
+                                        # Process the open tab with the inspection form of the current apartment
+                                        driver = processs_form_qc4j_side_rise_rain_screen_firebreak(
+                                            driver,
+                                            base_dir,
+                                            download_dir,
+                                            dict_plots_with_new_photos,
+                                            block_level_plot,
+                                        )
+                                # Work if the variable "edit_or_create" contains the word "create"
+                                elif edit_or_create == "create":
+                                    # Click on the form creation icon to open the "Select Form Action" options window
+                                    driver = click_select_form_action(driver, element)
+                                    # The created form opens in the current tab, its images must be loaded
+                                    driver = set_images_blocked(driver, False)
+                                    # Click on the "Create Form" button to create a new inspection form
+                                    # for the current apartment
+                                    driver = click_btn_create_form(driver)
+                                    # Fill the created empty form with data (images, documents, data from files)
+                                    driver = fill_created_form(
+                                        driver,
+                                        dict_plots_with_new_photos,
                                         block_level_plot,
+                                        base_dir,
                                     )
-                            # Work if the variable "edit_or_create" contains the word "create"
-                            elif edit_or_create == "create":
-                                # Click on the form creation icon to open the "Select Form Action" options window
-                                driver = click_select_form_action(driver, element)
-                                # Click on the "Create Form" button to create a new inspection form
-                                # for the current apartment
-                                driver = click_btn_create_form(driver)
-                                # Fill the created empty form with data (images, documents, data from files)
-                                driver = fill_created_form(
-                                    driver,
-                                    dict_plots_with_new_photos,
-                                    block_level_plot,
-                                    base_dir,
-                                )
-                                time.sleep(2)
+                                    time.sleep(2)
+                                    driver = set_images_blocked(driver, True)
+                            if checkpoint_file is not None:
+                                save_checkpoint(checkpoint_file, block_level_plot)
         # Go to the next line below in the "New Malden Quality Plan" table
         number_line += 1
     return driver
@@ -0,0 +1,465 @@
+import logging
+import queue
+import statistics
+import threading
+import time
+from pathlib import Path
+
+from auth.session_manager import get_authorized_driver, quit_driver, save_session, set_driver
+from core.forms import move_uploaded_photos_to_photos_on_asite
+from core.navigation import go_to_new_malden_quality_plan, moving_through_quality_checklist
+from utils.helpers import (
+    collect_photos_from_photo_dir,
+    create_dict_plots_with_new_photos,
+    create_sub_dir,
+    get_hash_photo_by_pixel_plus_file_size,
+)
+from utils.downloader import reserve_file_path
+from utils.ingest_index import (
+    add_ingested_photo,
+    check_repeated_photo,
+    create_ingest_table,
+    get_ingest_stats,
+)
+from utils.lazy_import import lazy_import
+from utils.photo_store import move_photo
+from utils.progress_journal import create_progress_table, queue_plots
+from utils.tracing import export_chrome_trace, log_span_summary, span
+
+# cv2 and easyocr are imported by the OCR stage, while the ingest stage already copies photos
+easy_ocr = lazy_import("image_sorter_ocr.OCR.easy_ocr_type_2")
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
+)
+
+# Stages of the pipeline in the order in which a photo passes them
+STAGES: tuple[str, ...] = ("ingest", "ocr", "routing", "dedup", "upload")
+
+
+def create_pipeline_metrics() -> dict:
+    """Creates the counters of the pipeline.
+
+    Returns:
+        dict:
+            For example:
+                {
+                    "started_at": 1718000000.0,
+                    "stages": {"ocr": {"processed": 12, "failed": 0, "busy_seconds": 30.5}, ...},
+                    "latencies": [84.2, 91.0],
+                    "lock": threading.Lock(),
+                }
+    """
+    return {
+        "started_at": time.time(),
+        "stages": {
+            stage: {"processed": 0, "failed": 0, "busy_seconds": 0.0} for stage in STAGES
+        },
+        # Seconds from the arrival of a photo in the chat folder to its upload to the asite
+        "latencies": [],
+        "lock": threading.Lock(),
+    }
+
+
+def add_stage_result(metrics: dict, stage: str, seconds: float, failed: bool = False) -> None:
+    """Counts one processed (or failed) photo of the stage and the time spent on it."""
+    with metrics["lock"]:
+        stage_metrics: dict = metrics["stages"][stage]
+        stage_metrics["failed" if failed else "processed"] += 1
+        stage_metrics["busy_seconds"] += seconds
+
+
+def log_pipeline_metrics(metrics: dict, queues: dict[str, queue.Queue]) -> None:
+    """Logs the queue depth, throughput and time per photo of each stage and the end-to-end latency.
+
+    Args:
+        metrics (dict): Counters of the pipeline.
+        queues (dict[str, queue.Queue]): Stage -> input queue of the stage.
+    """
+    with metrics["lock"]:
+        elapsed: float = max(time.time() - metrics["started_at"], 1e-9)
+        lines: list[str] = []
+        for stage in STAGES:
+            stage_metrics: dict = metrics["stages"][stage]
+            processed: int = stage_metrics["processed"]
+            depth: str = str(queues[stage].qsize()) if stage in queues else "-"
+            per_photo: float = stage_metrics["busy_seconds"] / processed if processed else 0.0
+            lines.append(
+                f"{stage:<8} queue {depth:>4}  processed {processed:>5}  failed {stage_metrics['failed']:>3}  "
+                f"{processed / elapsed * 60:7.1f}/min  {per_photo:6.2f}s/photo"
+            )
+        latencies: list[float] = list(metrics["latencies"])
+    ingest_stats: dict = get_ingest_stats()
+    lines.append(f"repeated photos not sent to the OCR: {ingest_stats['ocr_calls_avoided']} of {ingest_stats['photos']}")
+    if latencies:
+        lines.append(
+            f"end-to-end latency: median {statistics.median(latencies):.1f}s, "
+            f"max {max(latencies):.1f}s, {len(latencies)} photos"
+        )
+    logging.info("Pipeline metrics:\n" + "\n".join(lines))
+
+
+def run_ingest_stage(
+    chat_dir: Path,
+    pics_dir: Path,
+    ocr_queue: queue.Queue,
+    metrics: dict,
+    stop_event: threading.Event,
+    poll_interval: float = 1,
+) -> None:
+    r"""Moves new photos from the WhatsApp chat folder to the "pics" folder of the OCR
+    and puts them into the OCR queue. The time of arrival of a photo is the time of its file in the chat folder.
+    A photo that was already received is moved to "duplicates" next to "pics" and does not go to the OCR.
+
+    Args:
+        chat_dir (Path): Folder with photos from WhatsApp.
+            For example:
+                Path(r"chats\Python dev chat")
+        pics_dir (Path): Folder with photos for the OCR.
+            For example:
+                Path.cwd() / Path("image_sorter_ocr/pics")
+        ocr_queue (queue.Queue): Queue of the OCR stage.
+        metrics (dict): Counters of the pipeline.
+        stop_event (threading.Event): Set when the pipeline stops.
+        poll_interval (float, optional): Time between checks of the chat folder in seconds. Defaults to 1.
+    """
+    pics_dir.mkdir(parents=True, exist_ok=True)
+    duplicates_dir: Path = pics_dir.parent / "duplicates"
+    duplicates_dir.mkdir(exist_ok=True)
+    create_ingest_table()
+    # Photos left in "pics" by the previous run are processed first
+    for photo in collect_photos_from_photo_dir(pics_dir):
+        ocr_queue.put({"photo": photo, "arrived_at": photo.stat().st_mtime})
+    while not stop_event.is_set():
+        photos: list[Path] = collect_photos_from_photo_dir(chat_dir) if chat_dir.exists() else []
+        for photo in photos:
+            start: float = time.perf_counter()
+            try:
+                arrived_at: float = photo.stat().st_mtime
+                # The file may still be being downloaded by synchronizer.py
+                if time.time() - arrived_at < 1:
+                    continue
+                try:
+                    repeat, sha256, dhash = check_repeated_photo(photo)
+                except OSError as err:
+                    # A photo that is still being written is read on the next pass
+                    logging.info(f"Ingest: {photo.name} can not be read yet, skipped: {err}")
+                    continue
+                if repeat is not None:
+                    # The copies of one photo often have the same name, a new name keeps the earlier ones
+                    duplicate: Path = move_photo(photo, reserve_file_path(duplicates_dir, photo.name))
+                    logging.info(f"Ingest: {photo.name} is a repeat ({repeat[0]}) of {repeat[1]}, moved to {duplicate}")
+                    add_stage_result(metrics, "ingest", time.perf_counter() - start)
+                    continue
+                dest: Path = pics_dir / photo.name
+                move_photo(photo, dest)
+                add_ingested_photo(sha256, dhash, photo.name)
+            except Exception as err:
+                logging.info(f"Ingest failed for {photo}: {err}")
+                add_stage_result(metrics, "ingest", time.perf_counter() - start, failed=True)
+                continue
+            add_stage_result(metrics, "ingest", time.perf_counter() - start)
+            # Blocks while the OCR is behind, so that the photos wait in the chat folder
+            ocr_queue.put({"photo": dest, "arrived_at": arrived_at})
+        stop_event.wait(poll_interval)
+
+
+def run_ocr_stage(
+    ocr_queue: queue.Queue,
+    routing_queue: queue.Queue,
+    metrics: dict,
+    stop_event: threading.Event,
+) -> None:
+    """Recognizes the location written on each photo and moves the photo to "sorted/<A_L1_Plot_1>"
+    or "sorted/unsorted". The recognized photos are put into the routing queue.
+    """
+    while not stop_event.is_set():
+        try:
+            item: dict = ocr_queue.get(timeout=1)
+        except queue.Empty:
+            continue
+        start: float = time.perf_counter()
+        try:
+            with span("ocr", photo=item["photo"].name):
+                folder_name, photo = easy_ocr.sort_image(item["photo"])
+        except Exception as err:
+            logging.info(f"OCR failed for {item['photo']}: {err}")
+            add_stage_result(metrics, "ocr", time.perf_counter() - start, failed=True)
+            continue
+        add_stage_result(metrics, "ocr", time.perf_counter() - start)
+        logging.info(f"OCR: {photo.name} -> {folder_name}")
+        if folder_name != "unsorted":
+            routing_queue.put({**item, "photo": photo, "block_level_plot": folder_name})
+
+
+def run_routing_stage(
+    base_dir: Path,
+    dir_with_new_photo: Path,
+    routing_queue: queue.Queue,
+    dedup_queue: queue.Queue,
+    metrics: dict,
+    stop_event: threading.Event,
+) -> None:
+    r"""Moves each recognized photo from "sorted/<A_L1_Plot_1>" to the folder with new photos of the plot:
+    base_dir\A_L1_Plot_1\2.3\new_photos_send_to_asite
+    """
+    while not stop_event.is_set():
+        try:
+            item: dict = routing_queue.get(timeout=1)
+        except queue.Empty:
+            continue
+        start: float = time.perf_counter()
+        try:
+            dest_dir: Path = base_dir / item["block_level_plot"] / dir_with_new_photo
+            dest_dir.mkdir(parents=True, exist_ok=True)
+            dest: Path = dest_dir / item["photo"].name
+            move_photo(item["photo"], dest)
+            # Remove the folder of the plot in "sorted" when it is empty
+            try:
+                item["photo"].parent.rmdir()
+            except OSError:
+                pass
+        except Exception as err:
+            logging.info(f"Routing failed for {item['photo']}: {err}")
+            add_stage_result(metrics, "routing", time.perf_counter() - start, failed=True)
+            continue
+        add_stage_result(metrics, "routing", time.perf_counter() - start)
+        dedup_queue.put({**item, "photo": dest})
+
+
+def run_dedup_stage(
+    base_dir: Path,
+    dedup_queue: queue.Queue,
+    upload_queue: queue.Queue,
+    metrics: dict,
+    stop_event: threading.Event,
+) -> None:
+    r"""Moves a photo that is a pixel duplicate of another new photo of the same plot
+    to base_dir\A_L1_Plot_1\2.3\duplicated_photos, as move_duplicate_photos_to_dir_double does.
+    The other photos are put into the upload queue. The hashes of the new photos are computed once.
+    """
+    # Plot -> photo -> hash of its pixels
+    hashes_by_plot: dict[str, dict[Path, str]] = {}
+    while not stop_event.is_set():
+        try:
+            item: dict = dedup_queue.get(timeout=1)
+        except queue.Empty:
+            continue
+        start: float = time.perf_counter()
+        photo: Path = item["photo"]
+        plot_hashes: dict[Path, str] = hashes_by_plot.setdefault(item["block_level_plot"], {})
+        try:
+            with span("dedup", plot=item["block_level_plot"]):
+                for other_photo in collect_photos_from_photo_dir(photo.parent):
+                    if other_photo not in plot_hashes:
+                        plot_hashes[other_photo] = get_hash_photo_by_pixel_plus_file_size(other_photo)
+                hash_photo: str = plot_hashes.pop(photo)
+            # Only the photos that are still waiting for the upload are compared
+            is_duplicate: bool = any(
+                other_hash == hash_photo and other_photo.exists()
+                for other_photo, other_hash in plot_hashes.items()
+            )
+            if is_duplicate:
+                plot_dir: Path = base_dir / item["block_level_plot"]
+                create_sub_dir(plot_dir, Path("2.3") / "duplicated_photos")
+                move_photo(photo, plot_dir / "2.3" / "duplicated_photos" / photo.name)
+                logging.info(f"Dedup: {photo.name} is a duplicate in {item['block_level_plot']}")
+            else:
+                plot_hashes[photo] = hash_photo
+        except Exception as err:
+            logging.info(f"Dedup failed for {photo}: {err}")
+            add_stage_result(metrics, "dedup", time.perf_counter() - start, failed=True)
+            continue
+        add_stage_result(metrics, "dedup", time.perf_counter() - start)
+        if not is_duplicate:
+            upload_queue.put(item)
+
+
+def run_upload_stage(
+    site_login: str,
+    site_password: str,
+    base_dir: Path,
+    download_dir: Path,
+    dir_with_new_photo: Path,
+    upload_queue: queue.Queue,
+    metrics: dict,
+    stop_event: threading.Event,
+    batch_window: float = 5,
+    number_of_prefetch_tabs: int = 0,
+    retry_interval: float = 60,
+    max_upload_retries: int = 3,
+) -> None:
+    """Uploads the new photos to the asite with one warm browser.
+    The photos that arrive within "batch_window" seconds after the first one are uploaded in one pass,
+    which opens only the blocks of their plots.
+    A plot whose new photos are still in its folder after the pass is uploaded again
+    in "retry_interval" seconds (twice as late after the second failure and so on),
+    without waiting for new photos of the plot, at most "max_upload_retries" times.
+    """
+    # Plot -> (number of failed uploads, time.monotonic() of the next upload)
+    retries: dict[str, tuple[int, float]] = {}
+    while not stop_event.is_set():
+        due_plots: set[str] = {plot for plot, (_, retry_at) in retries.items() if retry_at <= time.monotonic()}
+        batch: list[dict] = []
+        try:
+            batch.append(upload_queue.get(timeout=1))
+        except queue.Empty:
+            if not due_plots:
+                continue
+        deadline: float = time.monotonic() + (batch_window if batch else 0)
+        while (timeout := deadline - time.monotonic()) > 0:
+            try:
+                batch.append(upload_queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        plots: set[str] = {item["block_level_plot"] for item in batch} | due_plots
+        # All new photos of these plots, including the photos left by a failed pass
+        dict_plots_with_new_photos: dict[str, list[Path]] = {
+            plot: photos
+            for plot, photos in create_dict_plots_with_new_photos(base_dir, dir_with_new_photo).items()
+            if plot in plots
+        }
+        dict_plots_with_new_photos, plots_already_saved = queue_plots(dict_plots_with_new_photos)
+        for plot, photos in plots_already_saved.items():
+            try:
+                move_uploaded_photos_to_photos_on_asite(base_dir, plot, photos)
+            except Exception as err:
+                logging.info(f"Moving the saved photos of {plot} failed: {err}")
+        if not dict_plots_with_new_photos:
+            for plot in due_plots:
+                retries.pop(plot, None)
+            continue
+        logging.info(f"Upload: {sorted(dict_plots_with_new_photos)}")
+        start: float = time.perf_counter()
+        try:
+            driver = get_authorized_driver(site_login, site_password)
+            driver = go_to_new_malden_quality_plan(driver)
+            save_session(driver, site_password)
+            driver = moving_through_quality_checklist(
+                driver,
+                base_dir,
+                download_dir,
+                dict_plots_with_new_photos,
+                blocks_to_process={plot.split("_")[0].upper() for plot in dict_plots_with_new_photos},
+                number_of_prefetch_tabs=number_of_prefetch_tabs,
+            )
+            set_driver(driver)
+        except Exception as err:
+            logging.info(f"Upload failed for {sorted(dict_plots_with_new_photos)}: {err}")
+            quit_driver()
+        # The photos that were not uploaded stay in the folders of their plots
+        failed_plots: set[str] = set(dict_plots_with_new_photos) & set(
+            create_dict_plots_with_new_photos(base_dir, dir_with_new_photo)
+        )
+        for plot in dict_plots_with_new_photos:
+            if plot not in failed_plots:
+                retries.pop(plot, None)
+                continue
+            attempts: int = retries.get(plot, (0, 0.0))[0] + 1
+            if attempts > max_upload_retries:
+                logging.info(f"Upload of {plot} failed {attempts} times, it waits for new photos of the plot")
+                retries.pop(plot, None)
+            else:
+                retries[plot] = (attempts, time.monotonic() + retry_interval * 2 ** (attempts - 1))
+        uploaded_at: float = time.time()
+        for item in batch:
+            failed: bool = item["block_level_plot"] in failed_plots
+            add_stage_result(metrics, "upload", (time.perf_counter() - start) / len(batch), failed=failed)
+            if not failed:
+                with metrics["lock"]:
+                    metrics["latencies"].append(uploaded_at - item["arrived_at"])
+
+
+def run_pipeline(
+    site_login: str,
+    site_password: str,
+    base_dir: Path,
+    download_dir: Path,
+    chat_dir: Path,
+    dir_with_new_photo: Path = Path("2.3") / "new_photos_send_to_asite",
+    queue_size: int = 50,
+    report_interval: float = 60,
+    number_of_prefetch_tabs: int = 0,
+) -> None:
+    r"""Runs the stages ingest -> OCR -> routing -> dedup -> upload in their own threads, connected by bounded queues.
+    A photo goes through the stages as soon as it arrives in the chat folder, while the browser uploads other plots.
+    When a stage is behind, its full queue stops the previous stages. Works until KeyboardInterrupt.
+
+    Args:
+        site_login (str): Login for authorization on site.
+        site_password (str): Password for authorization on site.
+        base_dir (Path): Path to the folder where folders with apartment location names are stored.
+            For example:
+                Path(r"D:\WORK\Horand_LTD\TASK TO DO\Locations with data for inspections\SideRise")
+        download_dir (Path): Folder for uploading photos from point 2.3.
+            For example:
+                Path(r"C:\Users\Human\Downloads\download_from_asite")
+        chat_dir (Path): Folder with photos from WhatsApp.
+            For example:
+                Path(r"chats\Python dev chat")
+        dir_with_new_photo (Path, optional): Relative path to the folder with new photos of a plot.
+            Defaults to Path(r"2.3\new_photos_send_to_asite").
+        queue_size (int, optional): Maximum number of photos waiting in each queue. Defaults to 50.
+        report_interval (float, optional): Time between the logs of the metrics in seconds. Defaults to 60.
+        number_of_prefetch_tabs (int, optional): Number of forms opened in advance in background tabs.
+            Defaults to 0.
+    """
+    create_progress_table()
+    metrics: dict = create_pipeline_metrics()
+    stop_event: threading.Event = threading.Event()
+    queues: dict[str, queue.Queue] = {
+        stage: queue.Queue(maxsize=queue_size) for stage in STAGES if stage != "ingest"
+    }
+    pics_dir: Path = Path.cwd() / Path("image_sorter_ocr/pics")
+    threads: list[threading.Thread] = [
+        threading.Thread(
+            target=run_ingest_stage,
+            args=(chat_dir, pics_dir, queues["ocr"], metrics, stop_event),
+            name="ingest",
+        ),
+        threading.Thread(
+            target=run_ocr_stage,
+            args=(queues["ocr"], queues["routing"], metrics, stop_event),
+            name="ocr",
+        ),
+        threading.Thread(
+            target=run_routing_stage,
+            args=(base_dir, dir_with_new_photo, queues["routing"], queues["dedup"], metrics, stop_event),
+            name="routing",
+        ),
+        threading.Thread(
+            target=run_dedup_stage,
+            args=(base_dir, queues["dedup"], queues["upload"], metrics, stop_event),
+            name="dedup",
+        ),
+        threading.Thread(
+            target=run_upload_stage,
+            args=(
+                site_login,
+                site_password,
+                base_dir,
+                download_dir,
+                dir_with_new_photo,
+                queues["upload"],
+                metrics,
+                stop_event,
+            ),
+            kwargs={"number_of_prefetch_tabs": number_of_prefetch_tabs},
+            name="upload",
+        ),
+    ]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    try:
+        while True:
+            time.sleep(report_interval)
+            log_pipeline_metrics(metrics, queues)
+    except KeyboardInterrupt:
+        logging.info("Stop the pipeline...")
+    finally:
+        stop_event.set()
+        log_pipeline_metrics(metrics, queues)
+        log_span_summary()
+        export_chrome_trace()
+        quit_driver()
@@ -0,0 +1,234 @@
+import logging
+import time
+from pathlib import Path
+
+from selenium.webdriver.chrome.webdriver import WebDriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+
+from auth.decorators import check_session
+from core.forms_modules.processs_form_qc4j_side_rise_rain_screen_firebreak import (
+    processs_form_qc4j_side_rise_rain_screen_firebreak,
+)
+from utils.helpers import edit_or_create_inspection
+from utils.photo_recompress import prepare_photos_for_upload
+from utils.progress_journal import set_plot_state
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
+)
+
+
+@check_session
+def open_form_in_background_tab(
+    driver: WebDriver, element: WebElement
+) -> tuple[WebDriver, str | None]:
+    """Clicks on the "In Progress" card of the plot, which opens the inspection form in a new tab,
+    and leaves the Selenium context on the main tab, so that the form loads in the background.
+
+    Args:
+        driver (WebDriver)
+        element (WebElement): Element that contains the button for opening the inspection
+            of the plot in a new tab.
+
+    Returns:
+        (driver, new_tab) tuple[WebDriver, str | None]: Handle of the new tab or None if the tab did not open.
+    """
+    # Import here because core.navigation imports this module
+    from core.navigation import click_card_in_progress
+
+    main_tab: str = driver.current_window_handle
+    handles_before: set[str] = set(driver.window_handles)
+    driver = click_card_in_progress(driver, element)
+    # Wait up to 5 seconds for the new tab to appear
+    new_tabs: list[str] = []
+    for _ in range(50):
+        new_tabs = [handle for handle in driver.window_handles if handle not in handles_before]
+        if new_tabs:
+            break
+        time.sleep(0.1)
+    driver.switch_to.window(main_tab)
+    return (driver, new_tabs[0] if new_tabs else None)
+
+
+def is_form_loaded_in_tab(driver: WebDriver, tab: str) -> bool:
+    """Switches to the tab and checks whether the "form-holder" element of the inspection form is displayed.
+
+    Args:
+        driver (WebDriver)
+        tab (str): Handle of the tab.
+
+    Returns:
+        bool
+    """
+    driver.switch_to.window(tab)
+    form_holders: list[WebElement] = driver.find_elements(By.ID, "form-holder")
+    try:
+        return bool(form_holders) and form_holders[0].is_displayed()
+    except Exception:
+        return False
+
+
+def wait_for_loaded_tab(
+    driver: WebDriver, tabs: list[str], timeout: float = 60, poll_interval: float = 0.5
+) -> str:
+    """Waits until the inspection form is loaded in one of the tabs and returns this tab.
+    The tabs are checked in the order of the list. If no form is loaded in "timeout" seconds,
+    the first tab is returned and the processing function waits for it itself.
+
+    Args:
+        driver (WebDriver)
+        tabs (list[str]): Handles of the tabs with forms.
+        timeout (float, optional): Maximum waiting time in seconds. Defaults to 60.
+        poll_interval (float, optional): Time between checks in seconds. Defaults to 0.5.
+
+    Returns:
+        str: Handle of the tab with the loaded form.
+    """
+    start: float = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        for tab in tabs:
+            if is_form_loaded_in_tab(driver, tab):
+                return tab
+        time.sleep(poll_interval)
+    return tabs[0]
+
+
+def find_next_plots_to_edit(
+    driver: WebDriver,
+    number_line: int,
+    block_letter: str,
+    level_number: int | None,
+    dict_plots_with_new_photos: dict[str, list[Path]],
+    processed_plots: set[str],
+    limit: int,
+) -> list[tuple[str, WebElement]]:
+    """Looks at the rows below "number_line" of the open level and finds up to "limit" plots
+    with new photos whose inspection is "In Progress".
+    The search stops at the first row that is not a plot (the next level or block).
+
+    Args:
+        driver (WebDriver)
+        number_line (int): The row of the current plot in the "Activities / Locations" column.
+        block_letter (str): Letter of the current block. For example: "A"
+        level_number (int | None): Number of the current level. For example: 1
+        dict_plots_with_new_photos (dict[str, list[Path]]): Apartment code -> list with new photos.
+        processed_plots (set[str]): Plots that have already been processed.
+        limit (int): Maximum number of plots.
+
+    Returns:
+        list[tuple[str, WebElement]]: Apartment code and the "In Progress" element of its row.
+            For example:
+                [("A_L1_Plot_4", WebElement), ("A_L1_Plot_6", WebElement)]
+    """
+    next_plots: list[tuple[str, WebElement]] = []
+    line: int = number_line + 1
+    while len(next_plots) < limit:
+        location_cell_xpath: str = (
+            f'//*[@id="table_body_header_scroller"]/div/div[{line}]//div[contains(@class, "location-title")]'
+        )
+        location_cells: list[WebElement] = driver.find_elements(By.XPATH, location_cell_xpath)
+        if not location_cells:
+            break
+        location_title: str = (location_cells[0].get_attribute("title") or "").lower()
+        if "plot" not in location_title:
+            break
+        plot_number: int = int(location_title.split()[-1])
+        block_level_plot: str = f"{block_letter}_L{level_number}_Plot_{plot_number}"
+        if (
+            block_level_plot in dict_plots_with_new_photos
+            and block_level_plot not in processed_plots
+        ):
+            try:
+                driver, element, edit_or_create = edit_or_create_inspection(driver, line)
+            except Exception:
+                edit_or_create = None
+            if edit_or_create == "edit":
+                next_plots.append((block_level_plot, element))
+        line += 1
+    return next_plots
+
+
+def process_plots_in_tabs(
+    driver: WebDriver,
+    base_dir: Path,
+    download_dir: Path,
+    dict_plots_with_new_photos: dict[str, list[Path]],
+    number_line: int,
+    block_letter: str,
+    level_number: int | None,
+    block_level_plot: str,
+    element: WebElement,
+    processed_plots: set[str],
+    number_of_prefetch_tabs: int = 2,
+) -> WebDriver:
+    """Opens the inspection form of the current plot and the forms of the next "number_of_prefetch_tabs"
+    plots with new photos of the same level in background tabs.
+    Then processes the forms in the order in which they are loaded,
+    so that loading of the next forms overlaps with filling in the current one.
+    Processed plots are added to "processed_plots", so that moving_through_quality_checklist skips them.
+
+    Args:
+        driver (WebDriver)
+        base_dir (Path): Path to the folder where folders with apartment location names are stored.
+        download_dir (Path): Folder for uploading photos from point 2.3.
+        dict_plots_with_new_photos (dict[str, list[Path]]): Apartment code -> list with new photos.
+        number_line (int): The row of the current plot in the "Activities / Locations" column.
+        block_letter (str): Letter of the current block. For example: "A"
+        level_number (int | None): Number of the current level. For example: 1
+        block_level_plot (str): The apartment code of the current plot. For example: "A_L1_Plot_2"
+        element (WebElement): The "In Progress" element of the current plot.
+        processed_plots (set[str]): Plots that have already been processed.
+        number_of_prefetch_tabs (int, optional): Number of next forms opened in advance. Defaults to 2.
+
+    Returns:
+        WebDriver
+    """
+    main_tab: str = driver.current_window_handle
+    plots_to_open: list[tuple[str, WebElement]] = [(block_level_plot, element)]
+    plots_to_open += find_next_plots_to_edit(
+        driver,
+        number_line,
+        block_letter,
+        level_number,
+        dict_plots_with_new_photos,
+        processed_plots,
+        number_of_prefetch_tabs,
+    )
+    # Tab handle -> apartment code
+    tabs: dict[str, str] = {}
+    for plot, plot_element in plots_to_open:
+        driver, tab = open_form_in_background_tab(driver, plot_element)
+        if tab is None:
+            logging.info(f"The form of {plot} did not open in a new tab.")
+            continue
+        tabs[tab] = plot
+        prepare_photos_for_upload(plot, dict_plots_with_new_photos[plot])
+    logging.info(f"Opened forms in tabs: {list(tabs.values())}")
+
+    while tabs:
+        tab: str = wait_for_loaded_tab(driver, list(tabs))
+        plot = tabs.pop(tab)
+        logging.info(f"Process the form of {plot} in its tab.")
+        driver.switch_to.window(tab)
+        try:
+            # The function closes the tab of the form and switches to the main tab
+            driver = processs_form_qc4j_side_rise_rain_screen_firebreak(
+                driver,
+                base_dir,
+                download_dir,
+                dict_plots_with_new_photos,
+                plot,
+            )
+        except Exception as err:
+            set_plot_state(plot, "failed", error=repr(err)[:500])
+            # Close the forms that are still open, so that the main tab stays the only one
+            for pending_tab in tabs:
+                driver.switch_to.window(pending_tab)
+                driver.close()
+            driver.switch_to.window(main_tab)
+            raise
+        finally:
+            processed_plots.add(plot)
+    driver.switch_to.window(main_tab)
+    return driver
@@ -0,0 +1,187 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from selenium.webdriver.chrome.webdriver import WebDriver
+
+from auth.web_driver import perform_authorization
+from core.navigation import moving_through_quality_checklist, open_new_malden_quality_plan
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
+)
+
+
+def split_plots_into_block_shards(
+    dict_plots_with_new_photos: dict[str, list[Path]],
+) -> dict[str, dict[str, list[Path]]]:
+    """Splits the plots with new photos into shards by block.
+    Each shard is processed by one browser of the worker pool.
+
+    Args:
+        dict_plots_with_new_photos (dict[str, list[Path]]): A dictionary in which keys are
+            the apartment codes and values are lists with new photos.
+            For example:
+                {
+                    "A_L1_Plot_2": [WindowsPath(".../A_L1_Plot_2/2.3/new_photos_send_to_asite/WA0118.jpg")],
+                    "B_L2_Plot_105": [WindowsPath(".../B_L2_Plot_105/2.3/new_photos_send_to_asite/DFKV5430.JPG")],
+                }
+
+    Returns:
+        dict[str, dict[str, list[Path]]]: Block letter -> plots of this block with new photos.
+            For example:
+                {
+                    "A": {"A_L1_Plot_2": [...]},
+                    "B": {"B_L2_Plot_105": [...]},
+                }
+    """
+    shards: dict[str, dict[str, list[Path]]] = {}
+    for block_level_plot, photos in dict_plots_with_new_photos.items():
+        block_letter: str = block_level_plot.split("_")[0].upper()
+        shards.setdefault(block_letter, {})[block_level_plot] = photos
+    return dict(sorted(shards.items()))
+
+
+def run_worker(
+    worker_number: int,
+    shards_queue: queue.Queue,
+    site_login: str,
+    site_password: str,
+    base_dir: Path,
+    download_dir: Path,
+    results: dict[str, str],
+    results_lock: threading.Lock,
+    number_of_prefetch_tabs: int = 0,
+) -> None:
+    r"""One worker of the pool. Starts its own authorized browser with its own download folder
+    and processes block shards from the queue until the queue is empty.
+    An error in one shard does not stop the other workers: the browser of the worker is closed,
+    the shard is marked as "failed" and the worker logs in again for the next shard.
+
+    Args:
+        worker_number (int): Number of the worker. Used in the log and in the name of the download folder.
+        shards_queue (queue.Queue): Queue with tuples (block_letter, plots of the block with new photos).
+        site_login (str): Login for authorization on site.
+        site_password (str): Password for authorization on site.
+        base_dir (Path): Path to the folder where folders with apartment location names are stored.
+            For example:
+                Path(r"D:\WORK\Horand_LTD\TASK TO DO\Locations with data for inspections\SideRise")
+        download_dir (Path): Base folder for downloads. The worker downloads into download_dir\worker_<number>.
+        results (dict[str, str]): Block letter -> "done" or "failed". Filled by the workers.
+        results_lock (threading.Lock): Lock for "results".
+        number_of_prefetch_tabs (int, optional): Number of forms opened in advance in background tabs.
+            Defaults to 0.
+    """
+    worker_download_dir: Path = download_dir / f"worker_{worker_number}"
+    worker_download_dir.mkdir(parents=True, exist_ok=True)
+    driver: WebDriver | None = None
+    try:
+        while True:
+            try:
+                block_letter, shard = shards_queue.get_nowait()
+            except queue.Empty:
+                break
+            start: float = time.perf_counter()
+            logging.info(f"Worker {worker_number} starts block {block_letter}: {list(shard)}")
+            try:
+                if driver is None:
+                    driver = perform_authorization(
+                        site_login, site_password, worker_download_dir
+                    )
+                driver = open_new_malden_quality_plan(driver)
+                driver = moving_through_quality_checklist(
+                    driver,
+                    base_dir,
+                    worker_download_dir,
+                    shard,
+                    blocks_to_process={block_letter},
+                    number_of_prefetch_tabs=number_of_prefetch_tabs,
+                )
+                status: str = "done"
+            except Exception as err:
+                status = "failed"
+                logging.info(f"Worker {worker_number} failed on block {block_letter}: {err}")
+                # Start a new browser for the next shard
+                if driver is not None:
+                    try:
+                        driver.quit()
+                    except Exception:
+                        pass
+                    driver = None
+            with results_lock:
+                results[block_letter] = status
+            logging.info(
+                f"Worker {worker_number} {status} block {block_letter} "
+                f"in {time.perf_counter() - start:.1f}s"
+            )
+    finally:
+        if driver is not None:
+            driver.quit()
+
+
+def process_plots_with_worker_pool(
+    site_login: str,
+    site_password: str,
+    base_dir: Path,
+    download_dir: Path,
+    dict_plots_with_new_photos: dict[str, list[Path]],
+    number_of_workers: int = 2,
+    number_of_prefetch_tabs: int = 0,
+) -> dict[str, str]:
+    r"""Processes the plots with new photos with several browsers at the same time.
+    The plots are split into shards by block, each worker takes the next shard from the queue.
+
+    Args:
+        site_login (str): Login for authorization on site.
+        site_password (str): Password for authorization on site.
+        base_dir (Path): Path to the folder where folders with apartment location names are stored.
+            For example:
+                Path(r"D:\WORK\Horand_LTD\TASK TO DO\Locations with data for inspections\SideRise")
+        download_dir (Path): Base folder for downloads. Each worker uses its own subfolder.
+            For example:
+                Path(r"C:\Users\Human\Downloads\download_from_asite")
+        dict_plots_with_new_photos (dict[str, list[Path]]): Apartment code -> list with new photos.
+        number_of_workers (int, optional): Number of browsers working at the same time. Defaults to 2.
+        number_of_prefetch_tabs (int, optional): Number of forms each browser opens in advance
+            in background tabs. Defaults to 0.
+
+    Returns:
+        dict[str, str]: Block letter -> "done" or "failed".
+            For example:
+                {"A": "done", "B": "failed"}
+    """
+    shards: dict[str, dict[str, list[Path]]] = split_plots_into_block_shards(
+        dict_plots_with_new_photos
+    )
+    shards_queue: queue.Queue = queue.Queue()
+    for block_letter, shard in shards.items():
+        shards_queue.put((block_letter, shard))
+    results: dict[str, str] = {}
+    results_lock: threading.Lock = threading.Lock()
+    # There is no need for more browsers than blocks
+    number_of_workers = max(1, min(number_of_workers, len(shards)))
+    start: float = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=number_of_workers) as executor:
+        for worker_number in range(1, number_of_workers + 1):
+            executor.submit(
+                run_worker,
+                worker_number,
+                shards_queue,
+                site_login,
+                site_password,
+                base_dir,
+                download_dir,
+                results,
+                results_lock,
+                number_of_prefetch_tabs,
+            )
+
+    logging.info(
+        f"{number_of_workers} workers processed {len(shards)} blocks "
+        f"in {time.perf_counter() - start:.1f}s: {results}"
+    )
+    return results
@@ -1,12 +1,15 @@
 import json
 import locale
+import logging
+import os
 import re
 import shutil
 import sys
+import threading
+import time
 from pathlib import Path
 
 import cv2
-import easyocr
 import numpy as np
 
 # Set UTF-8 encoding for file operations
@@ -22,14 +25,79 @@ except locale.Error:
     pass
 
 
-def log_func(log_str):
-    with open("log.txt", "a+", encoding="utf-8") as log_file:
-        log_file.write(log_str)
+# Recognition backends. "easyocr" - the models of EasyOCR in fp32, on GPU if there is one,
+# "easyocr-int8" - the reader of EasyOCR as it is by default: on CPU its detector and recognizer are quantized
+# to int8 by torch, "onnx" - the fp32 detector and recognizer run by ONNX Runtime on CPU (onnx_backend.py).
+# The backend is chosen by the environment variable OCR_BACKEND
+OCR_BACKENDS = ("easyocr", "easyocr-int8", "onnx")
+OCR_BACKEND = os.getenv("OCR_BACKEND", "easyocr-int8")
 
+# Characters of the stamps: the blocks A-G, "L", "LV", "LVL" of the level, "PLOT", "BLOCK",
+# the windows "WA", "EDB", "DD" and the digits. "I" and "O" are read in place of "1" and "0".
+# readtext recognizes only these characters when the environment variable OCR_ALLOWLIST is "plate"
+PLATE_ALPHABET = "ABCDEFGIKLOPTVW0123456789"
+OCR_ALLOWLIST = PLATE_ALPHABET if os.getenv("OCR_ALLOWLIST") == "plate" else os.getenv("OCR_ALLOWLIST") or None
 
-def extract_text_from_image(image_path):
+# The OCR reader loads its models for several seconds, so it is created once for each backend and reused for all images
+_readers = {}
+
+
+def create_reader(backend):
+    """Creates the EasyOCR reader of the backend, see OCR_BACKENDS.
+    easyocr is imported here: with torch it takes seconds, which the runs without OCR do not need to wait.
+    """
+    import easyocr
+
+    # Reader quantizes its models on CPU unless quantize=False is passed
+    if backend == "easyocr":
+        return easyocr.Reader(["en"], quantize=False)
+    if backend == "easyocr-int8":
+        return easyocr.Reader(["en"], quantize=True)
+    if backend == "onnx":
+        if __package__:
+            from . import onnx_backend
+        else:
+            import onnx_backend
+
+        return onnx_backend.convert_reader_to_onnx(easyocr.Reader(["en"], gpu=False, quantize=False))
+    raise ValueError(f"Unknown OCR backend {backend!r}, expected one of {OCR_BACKENDS}")
+
+
+def get_reader(backend=None):
+    """Returns the EasyOCR reader of the backend, created on the first call.
+
+    Args:
+        backend (str | None, optional): One of OCR_BACKENDS. Defaults to None - OCR_BACKEND.
+    """
+    backend = backend or OCR_BACKEND
+    if backend not in _readers:
+        _readers[backend] = create_reader(backend)
+    return _readers[backend]
+
+
+# Details of the recognition of each image. When the run calls utils.structured_logging.setup_structured_logging,
+# the records are written as JSON lines to the log file only, and the DEBUG records are dropped at the INFO level
+logger = logging.getLogger("ocr")
+
+
+# Parts of the photo passed to the OCR: "stamp" is the left middle part, where the stamp is on the photos
+# of the site, "full" is the whole photo
+CROP_STRATEGIES = ("stamp", "full")
+
+# JPEG is decoded directly at a reduced scale with these flags, which is faster than decoding and resizing
+READ_FLAGS_BY_SCALE = {
+    1.0: cv2.IMREAD_COLOR,
+    0.5: cv2.IMREAD_REDUCED_COLOR_2,
+    0.25: cv2.IMREAD_REDUCED_COLOR_4,
+    0.125: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+def read_image(image_path, scale=1.0):
+    """Reads the image at the given scale. Returns None if the image can't be read."""
     # Convert Path to string with proper encoding
     image_path_str = str(image_path)
+    flags = READ_FLAGS_BY_SCALE.get(scale, cv2.IMREAD_COLOR)
 
     # For OpenCV on Windows with Cyrillic characters, use np.fromfile
     if sys.platform.startswith("win") and any(
@@ -38,57 +106,445 @@ def extract_text_from_image(image_path):
         try:
             # Read image using numpy for better Unicode support
             img_array = np.fromfile(image_path_str, dtype=np.uint8)
-            image = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
+            image = cv2.imdecode(img_array, flags)
         except Exception as e:
             print(f"Error reading image with numpy method: {e}")
-            image = cv2.imread(image_path_str)
+            image = cv2.imread(image_path_str, flags)
     else:
-        image = cv2.imread(image_path_str)
+        image = cv2.imread(image_path_str, flags)
+
+    if image is not None and scale not in READ_FLAGS_BY_SCALE:
+        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    return image
 
-    if image is None:
-        print(f"Error: Could not read image {image_path}")
-        log_func(f"Error: Could not read image {image_path}\n")
-        return None
+
+def crop_image(image, crop="stamp"):
+    """Returns the part of the image with the stamp, see CROP_STRATEGIES."""
+    if crop == "full":
+        return image
+    if crop != "stamp":
+        raise ValueError(f"Unknown crop strategy {crop!r}, expected one of {CROP_STRATEGIES}")
 
     height, width = image.shape[:2]
 
     if width > height:
         roi_width = int(width * 0.4)
         roi_height = int(height * 0.4)
-        roi = image[roi_height : int(height * 0.7), 0:roi_width]
-    else:
-        roi_width = int(width * 0.5)
-        roi_height = int(height * 0.4)
-        roi = image[roi_height : int(height * 0.8), 0:roi_width]
+        return image[roi_height : int(height * 0.7), 0:roi_width]
+    roi_width = int(width * 0.5)
+    roi_height = int(height * 0.4)
+    return image[roi_height : int(height * 0.8), 0:roi_width]
+
+
+# Text detection. "craft" - the detector of EasyOCR finds the text on the whole mask,
+# "mask" - the lines of text are found on the orange label by the mask and only the recognizer of EasyOCR runs,
+# with "craft" as the fallback when the label is not clear. Chosen by the environment variable OCR_DETECTION
+OCR_DETECTIONS = ("craft", "mask")
+OCR_DETECTION = os.getenv("OCR_DETECTION", "craft")
+
+# The label is not clear if it takes less than this part of the mask
+MIN_LABEL_AREA_RATIO = 0.02
+# or if the second orange region is at least this part of the label (two labels or an orange object)
+MAX_SECOND_REGION_RATIO = 0.5
+# or if it has more lines of text
+MAX_TEXT_LINES = 4
+
+# Images whose text was recognized by the lines of the mask and images that fell back to the detector
+_detection_stats = {"mask": 0, "fallback": 0}
+_detection_stats_lock = threading.Lock()
+
+
+def get_detection_stats():
+    """Returns the number of images recognized by the lines of the mask and of those that fell back to "craft"."""
+    return dict(_detection_stats)
+
+
+# HSV range of the orange of the labels
+LOWER_ORANGE = np.array([20, 120, 120])
+UPPER_ORANGE = np.array([25, 255, 255])
+
+# Photos without the orange label are moved to "unsorted" without OCR. Turned on by OCR_PREFILTER=1.
+# Off by default: the thresholds below are not tuned on the labelled corpus yet
+# (python -m benchmarks.ocr_corpus --prefilters 0 1), and a label taken for a general photo
+# goes to "unsorted" without an error, while the OCR would read it
+OCR_PREFILTER = os.getenv("OCR_PREFILTER", "0") == "1"
+# Scale of the thumbnail of the check, decoded directly at 1/8 of the size of the JPEG
+PREFILTER_SCALE = 0.125
+# A photo is not a label if the orange takes less than this part of the cropped thumbnail
+MIN_ORANGE_RATIO = 0.002
+# and it is a label if the orange takes at least this part
+CERTAIN_ORANGE_RATIO = 0.02
+# Between them the hue histogram decides: the orange of a label is a narrow peak, while the orange pixels
+# of a wall or wood are the edge of a wide range of warm hues. Part of the peak among the hues 10-35
+MIN_ORANGE_PEAK_SHARE = 0.3
+
+# Photos checked by is_label_photo, skipped photos and the time of the checks and of the OCR
+_prefilter_stats = {"checked": 0, "skipped": 0, "check_seconds": 0.0, "ocr_images": 0, "ocr_seconds": 0.0}
+_prefilter_stats_lock = threading.Lock()
+
+
+def get_prefilter_stats():
+    """Returns the number of photos skipped without OCR and the estimated time saved.
+
+    Returns:
+        dict: For example:
+            {"checked": 120, "skipped": 45, "skip_rate": 0.375, "check_seconds": 0.4, "saved_seconds": 71.6}
+    """
+    with _prefilter_stats_lock:
+        stats = dict(_prefilter_stats)
+    mean_ocr_seconds = stats["ocr_seconds"] / stats["ocr_images"] if stats["ocr_images"] else 0.0
+    stats["skip_rate"] = stats["skipped"] / stats["checked"] if stats["checked"] else 0.0
+    stats["saved_seconds"] = stats["skipped"] * mean_ocr_seconds - stats["check_seconds"]
+    return stats
 
-    hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
 
-    lower_orange = np.array([20, 120, 120])
-    upper_orange = np.array([25, 255, 255])
+def is_label_photo(image_path, crop="stamp"):
+    """Checks in a few milliseconds whether the photo can have the orange label: by the part of the orange pixels
+    in the thumbnail and by the hue histogram of its saturated pixels. Photos that can't be read are passed
+    to the OCR, which reports them.
+
+    Args:
+        image_path (Path): Path to the image.
+        crop (str, optional): Part of the image checked, see CROP_STRATEGIES. Defaults to "stamp".
 
-    orange_mask = cv2.inRange(hsv, lower_orange, upper_orange)
+    Returns:
+        bool: False for the general photos of the site without the label.
+    """
+    start = time.perf_counter()
+    thumbnail = read_image(image_path, PREFILTER_SCALE)
+    is_label = True
+    if thumbnail is not None:
+        hsv = cv2.cvtColor(crop_image(thumbnail, crop), cv2.COLOR_BGR2HSV)
+        orange_pixels = cv2.countNonZero(cv2.inRange(hsv, LOWER_ORANGE, UPPER_ORANGE))
+        orange_ratio = orange_pixels / (hsv.shape[0] * hsv.shape[1])
+        if orange_ratio < MIN_ORANGE_RATIO:
+            is_label = False
+        elif orange_ratio < CERTAIN_ORANGE_RATIO:
+            saturated = cv2.inRange(hsv, np.array([0, 120, 120]), np.array([179, 255, 255]))
+            hue_histogram = cv2.calcHist([hsv], [0], saturated, [180], [0, 180]).ravel()
+            warm = hue_histogram[10:36].sum()
+            is_label = warm > 0 and hue_histogram[20:26].sum() / warm >= MIN_ORANGE_PEAK_SHARE
+    with _prefilter_stats_lock:
+        _prefilter_stats["checked"] += 1
+        _prefilter_stats["skipped"] += not is_label
+        _prefilter_stats["check_seconds"] += time.perf_counter() - start
+    return is_label
+
+
+# Repeat the OCR of the label in other rotations if the text does not match PLATE_PATTERNS. Turned off by OCR_RETRY=0
+OCR_RETRY = os.getenv("OCR_RETRY", "1") == "1"
+# The label is on its side if its height is larger than its width by this factor
+SIDEWAYS_LABEL_ASPECT = 1.2
+
+# Repeated OCRs of extract_text_if_label, the labels recognized by them and their time
+_retry_stats = {"retries": 0, "recovered": 0, "retry_seconds": 0.0}
+_retry_stats_lock = threading.Lock()
+
+
+def get_retry_stats():
+    """Returns the number of repeated OCRs, the labels recognized by them and their extra time.
+
+    Returns:
+        dict: For example: {"retries": 6, "recovered": 4, "retry_seconds": 5.2}
+    """
+    with _retry_stats_lock:
+        return dict(_retry_stats)
+
+
+def estimate_rotation(text_mask_inv):
+    """Estimates by the shape of the label how the mask must be rotated to make the lines of text horizontal.
+    The labels are wider than high, so a label higher than wide is on its side. Whether it is turned
+    to the left or to the right can't be seen from the shape: 90 is returned, and extract_text_if_label
+    repeats the OCR with 0 and 270 if the text is not recognized. The shape can also be wrong: the crop
+    of the stamp can cut an upright label, or the largest orange region can be another orange object.
+    The EXIF orientation of the photo is already applied by cv2.imread.
+
+    Args:
+        text_mask_inv (np.ndarray): Mask of extract_text_from_image: the orange label is white.
+
+    Returns:
+        int: 0 or 90 degrees clockwise.
+    """
+    contours, _ = cv2.findContours(text_mask_inv, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return 0
+    _, _, width, height = cv2.boundingRect(max(contours, key=cv2.contourArea))
+    return 90 if height > SIDEWAYS_LABEL_ASPECT * width else 0
+
+
+# cv2.rotate codes of the rotations clockwise
+ROTATE_CODES = {90: cv2.ROTATE_90_CLOCKWISE, 180: cv2.ROTATE_180, 270: cv2.ROTATE_90_COUNTERCLOCKWISE}
+
+
+def get_retry_rotations(rotation):
+    """Returns the rotations of the repeated OCRs after the OCR with the estimated rotation failed.
+    After a turn on the side the label is read as it is, as before the estimate, and then on the other side.
+
+    For example:
+        get_retry_rotations(0) -> [180]
+        get_retry_rotations(90) -> [0, 270]
+    """
+    if rotation == 0:
+        return [180]
+    return [0, (rotation + 180) % 360]
+
+
+def reset_ocr_stats():
+    """Starts the counting of get_detection_stats, get_prefilter_stats and get_retry_stats again,
+    for example at the start of a pass.
+    """
+    for stats, lock in (
+        (_detection_stats, _detection_stats_lock),
+        (_prefilter_stats, _prefilter_stats_lock),
+        (_retry_stats, _retry_stats_lock),
+    ):
+        with lock:
+            for key in stats:
+                stats[key] = 0
+
+
+def extract_text_if_label(image_path, crop="stamp", prefilter=None, retry=None, **options):
+    """Runs extract_text_from_image only on the photos that can have the orange label, see is_label_photo.
+    If the text does not match PLATE_PATTERNS, the rotation estimated by estimate_rotation may be wrong,
+    and the OCR of the same mask is repeated with the rotations of get_retry_rotations
+    until the text matches: at most three OCRs of a photo.
+
+    Args:
+        image_path (Path): Path to the image.
+        crop (str, optional): Part of the image passed to the OCR, see CROP_STRATEGIES. Defaults to "stamp".
+        prefilter (bool | None, optional): Check the photo before the OCR. Defaults to None - OCR_PREFILTER.
+        retry (bool | None, optional): Repeat the OCR in other rotations. Defaults to None - OCR_RETRY.
+        **options: scale, batch_size, backend, allowlist and detection of extract_text_from_image.
+
+    Returns:
+        str | None: "" for the photos without the label, otherwise the result of extract_text_from_image.
+    """
+    image_name = Path(image_path).name
+    if (OCR_PREFILTER if prefilter is None else prefilter) and not is_label_photo(image_path, crop):
+        logger.info("No orange label, sorted without OCR", extra={"photo": image_name})
+        return ""
+    start = time.perf_counter()
+    text_mask_inv = get_label_mask(image_path, crop, options.pop("scale", 1.0))
+    if text_mask_inv is None:
+        return None
+    rotation = estimate_rotation(text_mask_inv)
+    text = recognize_label_mask(text_mask_inv, rotation, image_name, **options)
+    with _prefilter_stats_lock:
+        _prefilter_stats["ocr_images"] += 1
+        _prefilter_stats["ocr_seconds"] += time.perf_counter() - start
+    if not (OCR_RETRY if retry is None else retry) or is_plate_text(clean_text(text)):
+        return text
+
+    start = time.perf_counter()
+    is_recovered = False
+    for retry_rotation in get_retry_rotations(rotation):
+        retry_text = recognize_label_mask(text_mask_inv, retry_rotation, image_name, **options)
+        if is_plate_text(clean_text(retry_text)):
+            is_recovered = True
+            text = retry_text
+            break
+    retry_seconds = time.perf_counter() - start
+    with _retry_stats_lock:
+        _retry_stats["retries"] += 1
+        _retry_stats["recovered"] += is_recovered
+        _retry_stats["retry_seconds"] += retry_seconds
+    logger.info(
+        f"Retry in other rotations: +{retry_seconds:.2f}s, "
+        f"{f'recognized at {retry_rotation} degrees' if is_recovered else 'not recognized'}",
+        extra={"photo": image_name},
+    )
+    return text
+
+
+def find_text_lines(text_mask_inv):
+    """Finds the boxes of the lines of text on the orange label, so that the detector of EasyOCR is not needed.
+    The label is the largest white region of the mask, the text is the black pixels inside it.
+    The lines are the runs of rows of the label with text (the horizontal projection profile),
+    the box of a line spans the columns with text.
+
+    Args:
+        text_mask_inv (np.ndarray): Mask of extract_text_from_image: the orange label is white.
+
+    Returns:
+        list[list[int]] | None: Boxes [x_min, x_max, y_min, y_max] of the lines from top to bottom,
+            as horizontal_list of easyocr.Reader.recognize. None if the label is not clear.
+            For example: [[12, 310, 40, 92], [14, 280, 101, 150]]
+    """
+    contours, _ = cv2.findContours(text_mask_inv, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+    contours = sorted(contours, key=cv2.contourArea, reverse=True)
+    label_area = cv2.contourArea(contours[0])
+    if label_area < MIN_LABEL_AREA_RATIO * text_mask_inv.size:
+        return None
+    if len(contours) > 1 and cv2.contourArea(contours[1]) >= MAX_SECOND_REGION_RATIO * label_area:
+        return None
+
+    label = np.zeros_like(text_mask_inv)
+    cv2.drawContours(label, contours, 0, 255, thickness=cv2.FILLED)
+    x, y, width, height = cv2.boundingRect(contours[0])
+    text = cv2.bitwise_and(label, cv2.bitwise_not(text_mask_inv))[y : y + height, x : x + width] > 0
+
+    # Rows with more text pixels than the noise on the edges of the label
+    rows_with_text = text.sum(axis=1) > max(1, 0.02 * width)
+    min_line_height = max(3, int(0.05 * height))
+    lines = []
+    line_start = None
+    for row, has_text in enumerate(np.append(rows_with_text, False)):
+        if has_text and line_start is None:
+            line_start = row
+        elif not has_text and line_start is not None:
+            if row - line_start >= min_line_height:
+                lines.append((line_start, row))
+            line_start = None
+    if not lines or len(lines) > MAX_TEXT_LINES:
+        return None
+
+    mask_height, mask_width = text_mask_inv.shape[:2]
+    boxes = []
+    for top, bottom in lines:
+        columns = np.flatnonzero(text[top:bottom].any(axis=0))
+        padding = max(2, (bottom - top) // 5)
+        boxes.append(
+            [
+                int(max(0, x + columns[0] - padding)),
+                int(min(mask_width, x + columns[-1] + 1 + padding)),
+                int(max(0, y + top - padding)),
+                int(min(mask_height, y + bottom + padding)),
+            ]
+        )
+    return boxes
+
+
+def get_label_mask(image_path, crop="stamp", scale=1.0):
+    """Reads the image and returns the mask of its stamp, on which the OCR reads the text:
+    the orange label is white and its text is black.
+
+    Args:
+        image_path (Path): Path to the image.
+        crop (str, optional): Part of the image passed to the OCR, see CROP_STRATEGIES. Defaults to "stamp".
+        scale (float, optional): Scale at which the image is decoded, see extract_text_from_image. Defaults to 1.0.
+
+    Returns:
+        np.ndarray | None: The mask, None if the image can't be read.
+    """
+    image = read_image(image_path, scale)
+    if image is None:
+        print(f"Error: Could not read image {image_path}")
+        logger.error("Could not read image", extra={"photo": Path(image_path).name})
+        return None
+
+    roi = crop_image(image, crop)
+
+    hsv = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
+
+    orange_mask = cv2.inRange(hsv, LOWER_ORANGE, UPPER_ORANGE)
     text_mask = cv2.bitwise_not(orange_mask)
-    kernel = np.ones((4, 4), np.uint8)
+    # The kernel is scaled with the image, so that the same strokes are removed at a reduced scale
+    kernel_size = max(2, round(4 * scale))
+    kernel = np.ones((kernel_size, kernel_size), np.uint8)
     text_mask = cv2.morphologyEx(text_mask, cv2.MORPH_OPEN, kernel)
     text_mask = cv2.morphologyEx(text_mask, cv2.MORPH_CLOSE, kernel)
 
-    text_mask_inv = cv2.bitwise_not(text_mask)
+    return cv2.bitwise_not(text_mask)
+
 
-    # Create an OCR reader object
-    reader = easyocr.Reader(["en"])
+def recognize_label_mask(
+    text_mask_inv,
+    rotation,
+    image_name,
+    batch_size=1,
+    backend=None,
+    allowlist=None,
+    detection=None,
+):
+    """Recognizes the text on the mask of get_label_mask turned by the rotation.
+    The arguments batch_size, backend, allowlist and detection are described in extract_text_from_image.
 
-    # Read text from an image
-    result = reader.readtext(text_mask_inv)
+    Args:
+        text_mask_inv (np.ndarray): Mask of get_label_mask.
+        rotation (int): 0, 90, 180 or 270 degrees clockwise.
+        image_name (str): Name of the image for the log.
+
+    Returns:
+        str: The text of all detections joined together.
+    """
+    if rotation:
+        text_mask_inv = cv2.rotate(text_mask_inv, ROTATE_CODES[rotation])
+
+    # Get the OCR reader object
+    reader = get_reader(backend)
+
+    allowlist = allowlist or OCR_ALLOWLIST
+    result = []
+    if (detection or OCR_DETECTION) == "mask":
+        text_lines = find_text_lines(text_mask_inv)
+        if text_lines is not None:
+            # Only the recognizer runs on the lines of the label
+            result = reader.recognize(
+                text_mask_inv,
+                horizontal_list=text_lines,
+                free_list=[],
+                batch_size=batch_size,
+                allowlist=allowlist,
+            )
+        is_recognized = any(line[1].strip() for line in result)
+        with _detection_stats_lock:
+            _detection_stats["mask" if is_recognized else "fallback"] += 1
+        if not is_recognized:
+            logger.debug("The label is not clear, the text is detected by CRAFT", extra={"photo": image_name})
+            result = []
+    if not result:
+        # Read text from an image
+        result = reader.readtext(text_mask_inv, batch_size=batch_size, allowlist=allowlist)
 
     # Print the extracted text
     text = ""
     for detection in result:
         text += detection[1].strip()
 
-    log_func(text)
+    logger.debug(f"Extracted text: {text}", extra={"photo": image_name})
     return text
 
 
+def extract_text_from_image(
+    image_path,
+    crop="stamp",
+    scale=1.0,
+    batch_size=1,
+    backend=None,
+    allowlist=None,
+    detection=None,
+    rotation=None,
+):
+    """Recognizes the text of the stamp on the image.
+
+    Args:
+        image_path (Path): Path to the image.
+        crop (str, optional): Part of the image passed to the OCR, see CROP_STRATEGIES. Defaults to "stamp".
+        scale (float, optional): Scale at which the image is decoded. 0.5, 0.25 and 0.125 are decoded
+            directly at a reduced size, other values are resized after decoding. Defaults to 1.0.
+        batch_size (int, optional): Batch size of the recognition model of EasyOCR. Defaults to 1.
+        backend (str | None, optional): One of OCR_BACKENDS. Defaults to None - OCR_BACKEND.
+        allowlist (str | None, optional): The only characters to recognize, for example PLATE_ALPHABET.
+            Defaults to None - OCR_ALLOWLIST.
+        detection (str | None, optional): One of OCR_DETECTIONS. Defaults to None - OCR_DETECTION.
+        rotation (int | None, optional): Degrees clockwise by which the label is turned.
+            Defaults to None - estimate_rotation.
+
+    Returns:
+        str | None: The text of all detections joined together, None if the image can't be read.
+    """
+    text_mask_inv = get_label_mask(image_path, crop, scale)
+    if text_mask_inv is None:
+        return None
+    if rotation is None:
+        rotation = estimate_rotation(text_mask_inv)
+    return recognize_label_mask(
+        text_mask_inv, rotation, Path(image_path).name, batch_size, backend, allowlist, detection
+    )
+
+
 def process_images_in_folder(folder_path):
     folder_path = Path(folder_path)
     image_extensions = (".jpg", ".jpeg", ".png", ".bmp")
@@ -102,106 +558,125 @@ def process_images_in_folder(folder_path):
         ]
     except OSError as e:
         print(f"Error accessing folder: {e}")
-        log_func(f"Error accessing folder: {e}\n")
+        logger.error(f"Error accessing folder: {e}")
         return {}
 
     results = {}
     for image_file in image_files:
         try:
-            log_func(f"\nProcessing {image_file.name}...\n")
-            log_func(f"image name: {image_file.name}\n")
+            logger.debug("Processing...", extra={"photo": image_file.name})
 
-            text = extract_text_from_image(image_file)
-            if text:
+            text = extract_text_if_label(image_file)
+            if text == "":
+                # No label on the photo: output_path moves it to "unsorted"
+                results[image_file.name] = text
+            elif text:
                 # Use the actual filename as key, preserving Cyrillic characters
                 results[image_file.name] = text
-                log_func(f"Extracted text: {text}\n")
             else:
-                log_func(f"No text extracted from {image_file.name}\n")
+                logger.info("No text extracted", extra={"photo": image_file.name})
         except Exception as e:
             print(f"Error processing {image_file.name}: {e}")
-            log_func(f"Error processing {image_file.name}: {e}\n")
+            logger.error(f"Error processing: {e}", extra={"photo": image_file.name})
             continue
 
     return results
 
 
-def output_path(extracted_text, name_dir_with_script):
+# Formats of the text of the stamps: "BL1PLOT100W12", "BL1W12PLOT100" and "BL1PLOTW12"
+PLATE_PATTERNS = (
+    r"^((?:BLOCK)?)([A-G])((?:L|LV|LEV|LVL))((?:1[0-4]|[1-9]|I|L))((?:PLOT|PLT|PL|PT|P)?)(\d{1,3})([A-Za-z]+)?(\d{1,4})?",
+    r"^((?:BLOCK)?)([A-G])((?:L|LV|LEV|LVL))((?:1[0-4]|[1-9]))([A-Za-z]+)(\d{1,4})((?:PLOT|PLT|PL|PT|P))(\d{1,3})",
+    r"^((?:BLOCK)?)([A-G])((?:L|LV|LEV|LVL))((?:1[0-4]|[1-9]))((?:PLOT|PLT|PL|PT|P))([A-Za-z]+)(\d{1,4})",
+)
+
+
+def clean_text(text):
+    """Returns the text in upper case without the characters other than letters and digits."""
+    return re.sub(r"[^a-zA-Z0-9]+", "", text.upper())
+
+
+def is_plate_text(cleaned_text):
+    """Checks whether the cleaned text matches one of PLATE_PATTERNS."""
+    return any(re.match(pattern, cleaned_text) for pattern in PLATE_PATTERNS)
+
+
+def output_path(extracted_text, name_dir_with_script, image_name=None):
+    extra = {"photo": image_name}
 
     if len(extracted_text) < 4:
         return "unsorted"
 
-    pattern = r"^((?:BLOCK)?)([A-G])((?:L|LV|LEV|LVL))((?:1[0-4]|[1-9]|I|L))((?:PLOT|PLT|PL|PT|P)?)(\d{1,3})([A-Za-z]+)?(\d{1,4})?"
+    pattern = PLATE_PATTERNS[0]
     match = re.match(pattern, extracted_text)
     if not match:
-        pattern = r"^((?:BLOCK)?)([A-G])((?:L|LV|LEV|LVL))((?:1[0-4]|[1-9]))([A-Za-z]+)(\d{1,4})((?:PLOT|PLT|PL|PT|P))(\d{1,3})"
+        pattern = PLATE_PATTERNS[1]
         match = re.match(pattern, extracted_text)
         if not match:
-            pattern = r"^((?:BLOCK)?)([A-G])((?:L|LV|LEV|LVL))((?:1[0-4]|[1-9]))((?:PLOT|PLT|PL|PT|P))([A-Za-z]+)(\d{1,4})"
+            pattern = PLATE_PATTERNS[2]
             match = re.match(pattern, extracted_text)
             if not match:
-                log_func("Recognized text doesn`t match any format \n")
+                logger.debug("Recognized text doesn`t match any format", extra=extra)
                 return "unsorted"
             else:
                 window = match.group(6)
                 window = window.replace("O", "0")
-                log_func("window(gr6) = " + window + "\n")
+                logger.debug("window(gr6) = %s", window, extra=extra)
                 window_number = match.group(7)
-                log_func("window_number(gr7) = " + window_number + "\n")
+                logger.debug("window_number(gr7) = %s", window_number, extra=extra)
                 with open(
-                    "window_mapping.json", "r", encoding="utf-8"
+                    Path(name_dir_with_script) / "window_mapping.json", "r", encoding="utf-8"
                 ) as window_mapping_file:
                     window_mapping = json.load(window_mapping_file)
                 if window + window_number not in window_mapping.keys():
-                    log_func(f"Window {window+window_number} not found" + "\n")
+                    logger.debug(f"Window {window+window_number} not found", extra=extra)
                     return "unsorted"
                 else:
                     return window_mapping[window + window_number]
         else:
             block = match.group(2)
-            log_func("block(gr1) = " + block + "\n")
+            logger.debug("block(gr1) = %s", block, extra=extra)
             level = match.group(3)
-            log_func("level(gr2) = " + level + "\n")
+            logger.debug("level(gr2) = %s", level, extra=extra)
             level_num = match.group(4)
             if level_num == "I" or level_num == "L":
                 level_num = "1"
-            log_func("level_num(gr3) = " + level_num + "\n")
+            logger.debug("level_num(gr3) = %s", level_num, extra=extra)
             window = match.group(5)
             window = window.replace("O", "0")
-            log_func("window(gr4) = " + window + "\n")
+            logger.debug("window(gr4) = %s", window, extra=extra)
             window_number = match.group(6)
-            log_func("window_number(gr5) = " + window_number + "\n")
+            logger.debug("window_number(gr5) = %s", window_number, extra=extra)
             plot = match.group(7)
-            log_func("plot(gr6) = " + plot + "\n")
+            logger.debug("plot(gr6) = %s", plot, extra=extra)
             plot_number = match.group(8)
-            log_func("plot_number(gr7) = " + plot_number + "\n")
+            logger.debug("plot_number(gr7) = %s", plot_number, extra=extra)
     else:
         block = match.group(2)
-        log_func("block(gr1) = " + block + "\n")
+        logger.debug("block(gr1) = %s", block, extra=extra)
         level = match.group(3)
-        log_func("level(gr2) = " + level + "\n")
+        logger.debug("level(gr2) = %s", level, extra=extra)
         level_num = match.group(4)
         if level_num == "I" or level_num == "L":
             level_num = "1"
-        log_func("level_num(gr3) = " + level_num + "\n")
+        logger.debug("level_num(gr3) = %s", level_num, extra=extra)
         plot = match.group(5)
-        log_func("plot(gr4) = " + plot + "\n")
+        logger.debug("plot(gr4) = %s", plot, extra=extra)
         plot_number = match.group(6)
-        log_func("plot_number(gr5) = " + plot_number + "\n")
+        logger.debug("plot_number(gr5) = %s", plot_number, extra=extra)
         window = match.group(7)
         if window:
             window = window.replace("O", "0")
-            log_func("window(gr6) = " + window + "\n")
+            logger.debug("window(gr6) = %s", window, extra=extra)
             window_number = match.group(8)
-            log_func("window_number(gr7) = " + window_number + "\n")
+            logger.debug("window_number(gr7) = %s", window_number, extra=extra)
 
-    with open(f"{name_dir_with_script}\\plot_mapping.json", "r", encoding="utf-8") as plot_mapping_file:
+    with open(Path(name_dir_with_script) / "plot_mapping.json", "r", encoding="utf-8") as plot_mapping_file:
         plot_mapping = json.load(plot_mapping_file)
-    with open(f"{name_dir_with_script}\\window_mapping.json", "r", encoding="utf-8") as window_mapping_file:
+    with open(Path(name_dir_with_script) / "window_mapping.json", "r", encoding="utf-8") as window_mapping_file:
         window_mapping = json.load(window_mapping_file)
 
-    print(block + "_L" + level_num + "_Plot_" + plot_number)
-    log_func(block + "_L" + level_num + "_Plot_" + plot_number + "\n")
+    logger.debug(block + "_L" + level_num + "_Plot_" + plot_number, extra=extra)
     try:
         # Check if this plot exists in this block and level
         if (
@@ -209,29 +684,101 @@ def output_path(extracted_text, name_dir_with_script):
             or level_num not in plot_mapping[block]
             or plot_number not in plot_mapping[block][level_num]
         ):
-            log_func(
-                f"Plot {plot_number} not found on level {level_num} of block {block}"
-                + "\n"
+            logger.debug(
+                f"Plot {plot_number} not found on level {level_num} of block {block}", extra=extra
             )
             if window + window_number not in window_mapping.keys():
-                log_func(f"Window {window+window_number} not found" + "\n")
+                logger.debug(f"Window {window+window_number} not found", extra=extra)
                 return "unsorted"
             else:
-                log_func(
-                    "Moved to folder " + window_mapping[window + window_number] + "\n"
+                logger.debug(
+                    "Moved to folder " + window_mapping[window + window_number], extra=extra
                 )
                 return window_mapping[window + window_number]
 
     except Exception as e:
-        log_func("An error occurred during validation" + repr(e) + "\n")
+        logger.warning("An error occurred during validation " + repr(e), extra=extra)
         return "unsorted"
 
-    log_func(
-        "Moved to folder " + block + "_L" + level_num + "_Plot_" + plot_number + "\n"
+    logger.debug(
+        "Moved to folder " + block + "_L" + level_num + "_Plot_" + plot_number, extra=extra
     )
     return block + "_L" + level_num + "_Plot_" + plot_number
 
 
+def move_image(im_path, dest_path):
+    """Moves the image to the folder "dest_path", handling Unicode file names on Windows."""
+    dest_path.mkdir(parents=True, exist_ok=True)
+    if sys.platform.startswith("win") and (
+        any(ord(char) > 127 for char in im_path.name)
+        or any(ord(char) > 127 for char in str(dest_path))
+    ):
+        # For Windows with Unicode filenames, use shutil.move directly
+        shutil.move(str(im_path), str(dest_path / im_path.name))
+    else:
+        shutil.move(str(im_path), str(dest_path), copy_function=shutil.copy2)
+
+
+def recognize_plot(
+    image_path,
+    name_dir_with_script=Path("image_sorter_ocr"),
+    crop="stamp",
+    scale=1.0,
+    batch_size=1,
+    backend=None,
+    allowlist=None,
+    detection=None,
+    prefilter=None,
+    retry=None,
+):
+    """Recognizes the stamp on the image and returns the cleaned text and the folder of the plot.
+    The arguments crop, scale, batch_size, backend, allowlist and detection are passed to extract_text_from_image.
+    The photos without the orange label are not recognized if the check is on, and the labels that do not match PLATE_PATTERNS
+    are recognized again in other rotations, see extract_text_if_label.
+
+    Returns:
+        tuple[str, str]: For example: ("BL1PLOT100W12", "B_L1_Plot_100") or ("", "unsorted")
+    """
+    image_path = Path(image_path)
+    text = extract_text_if_label(
+        image_path,
+        crop,
+        prefilter,
+        retry,
+        scale=scale,
+        batch_size=batch_size,
+        backend=backend,
+        allowlist=allowlist,
+        detection=detection,
+    ) or ""
+    cleaned_text = clean_text(text)
+    try:
+        folder_name = output_path(cleaned_text, name_dir_with_script, image_path.name)
+    except Exception as e:
+        logger.warning(f"Error sorting: {e}", extra={"photo": image_path.name})
+        folder_name = "unsorted"
+    return cleaned_text, folder_name
+
+
+def sort_image(image_path, name_dir_with_script=Path("image_sorter_ocr")):
+    """
+    Распознает одно изображение и перемещает его в папку "sorted/<A_L1_Plot_1>" или "sorted/unsorted".
+    Используется конвейером, который обрабатывает фотографии по одной, по мере их поступления.
+
+    Returns:
+        tuple[str, Path]: Имя папки и новый путь к изображению.
+            Например: ("B_L1_Plot_100", Path(".../image_sorter_ocr/sorted/B_L1_Plot_100/DFKV5430.JPG"))
+    """
+    image_path = Path(image_path)
+    cleaned_text, folder_name = recognize_plot(image_path, name_dir_with_script)
+    logger.info(
+        f"Cleaned text: {cleaned_text}", extra={"photo": image_path.name, "plot": folder_name}
+    )
+    dest_path = Path.cwd() / name_dir_with_script / "sorted" / folder_name
+    move_image(image_path, dest_path)
+    return folder_name, dest_path / image_path.name
+
+
 def main():
     """
     Скрипт распознает все изображения (формата ".jpg", ".jpeg", ".png", ".bmp") из папки "pics".
@@ -250,24 +797,21 @@ def main():
 
     if not pictures_folder.exists():
         print("Error: Pictures folder not found!")
-        log_func("Error: Pictures folder not found!" + "\n")
+        logger.error("Pictures folder not found!")
         return
 
+    reset_ocr_stats()
     results = process_images_in_folder(pictures_folder)
-    with open(f"{name_dir_with_script}\\cache.json", "w", encoding="utf-8") as json_cache_file:
+    with open(name_dir_with_script / "cache.json", "w", encoding="utf-8") as json_cache_file:
         json.dump(results, json_cache_file, ensure_ascii=False, indent=2)
     # with open('cache.json','r', encoding='utf-8') as json_cache_file:
     #     results = json.load(json_cache_file)
 
-    log_func(str(results) + "\n")
     json_info = {}
     paths = set()
     for image_name, text in results.items():
         text = text.upper()
         cleaned_text = re.sub(r"[^a-zA-Z0-9]+", "", text)
-        log_func("image name: " + image_name + "\n")
-        log_func("Extracted text:" + text + "\n")
-        log_func("Cleaned text:" + cleaned_text + "\n")
 
         if cleaned_text not in json_info.keys():
             json_info[cleaned_text] = {
@@ -283,33 +827,41 @@ def main():
             }
 
         im_path = pictures_folder / image_name
-        dest_path = Path.cwd() / name_dir_with_script / "sorted" / output_path(cleaned_text, name_dir_with_script)
+        folder_name = output_path(cleaned_text, name_dir_with_script, image_name)
+        logger.info(f"Cleaned text: {cleaned_text}", extra={"photo": image_name, "plot": folder_name})
+        dest_path = Path.cwd() / name_dir_with_script / "sorted" / folder_name
         paths.add(str(dest_path.resolve()))
-        dest_path.mkdir(parents=True, exist_ok=True)
         try:
             # Handle file moving with proper encoding support
-            if sys.platform.startswith("win") and (
-                any(ord(char) > 127 for char in image_name)
-                or any(ord(char) > 127 for char in str(dest_path))
-            ):
-                # For Windows with Unicode filenames, use shutil.move directly
-                shutil.move(str(im_path), str(dest_path / image_name))
-            else:
-                shutil.move(str(im_path), str(dest_path), copy_function=shutil.copy2)
+            move_image(im_path, dest_path)
         except Exception as e:
             print(f"Error moving file {image_name}: {e}")
-            log_func(f"Error moving file {image_name}: {e}\n")
+            logger.error(f"Error moving file: {e}", extra={"photo": image_name})
             pass
         json_info[cleaned_text][cleaned_text]["Path"] = str(
             Path.cwd().resolve() / cleaned_text[:4]
         )
 
     json_info["Abs paths"] = list(paths)
-    with open(f"{name_dir_with_script}\\image_info_2.json", "w", encoding="utf-8") as json_info_file:
+    with open(name_dir_with_script / "image_info_2.json", "w", encoding="utf-8") as json_info_file:
         json.dump(json_info, json_info_file, ensure_ascii=False, indent=2)
 
-    log_func("\nProcessing complete! Results saved to extracted_text.txt")
+    logger.info(f"Processing complete! {len(results)} images are sorted")
+    prefilter_stats = get_prefilter_stats()
+    if prefilter_stats["skipped"]:
+        logger.info(
+            f"Without the orange label: {prefilter_stats['skipped']} of {prefilter_stats['checked']} photos "
+            f"({prefilter_stats['skip_rate']:.0%}) are moved to unsorted without OCR, "
+            f"about {prefilter_stats['saved_seconds']:.1f}s saved"
+        )
+    retry_stats = get_retry_stats()
+    if retry_stats["retries"]:
+        logger.info(
+            f"Upside down: {retry_stats['recovered']} of {retry_stats['retries']} repeated OCRs recognized the label, "
+            f"+{retry_stats['retry_seconds']:.1f}s"
+        )
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
     main()
@@ -0,0 +1,115 @@
+"""ONNX Runtime backend of the EasyOCR reader for computers without GPU.
+
+The detector (CRAFT) and the recognizer of the EasyOCR reader are exported to ONNX once,
+into the folder "onnx_models" next to this file, and are run by ONNX Runtime in place of torch.
+EasyOCR itself still does the pre- and post-processing, so the result has the same format as readtext of easyocr.
+
+onnxruntime is an optional dependency: pip install onnxruntime
+"""
+
+import copy
+import logging
+from pathlib import Path
+
+import onnxruntime
+import torch
+
+logger = logging.getLogger("ocr")
+
+MODEL_DIR = Path(__file__).resolve().parent / "onnx_models"
+
+
+class OnnxModule(torch.nn.Module):
+    """Runs the ONNX model where EasyOCR calls the torch model: net(*inputs).
+    The inputs that the export dropped as unused (the text of the recognizer) are skipped.
+    """
+
+    def __init__(self, model_path):
+        super().__init__()
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(
+            str(model_path), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+    def forward(self, *inputs):
+        feed = {
+            name: tensor.detach().cpu().numpy()
+            for name, tensor in zip(self.input_names, inputs)
+        }
+        outputs = [torch.from_numpy(output) for output in self.session.run(None, feed)]
+        return outputs[0] if len(outputs) == 1 else tuple(outputs)
+
+
+def export_detector(detector, model_path):
+    """Exports the CRAFT detector with any size of the image."""
+    torch.onnx.export(
+        detector,
+        torch.zeros(1, 3, 640, 640),
+        str(model_path),
+        input_names=["image"],
+        output_names=["y", "feature"],
+        dynamic_axes={
+            "image": {0: "batch", 2: "height", 3: "width"},
+            "y": {0: "batch", 1: "height", 2: "width"},
+            "feature": {0: "batch", 2: "height", 3: "width"},
+        },
+        opset_version=17,
+        # The TorchScript exporter does not need onnxscript
+        dynamo=False,
+    )
+
+
+class MeanOverLastDim(torch.nn.Module):
+    """AdaptiveAvgPool2d((None, 1)) of the recognizer: the mean over the height of the features.
+    ONNX can not export the adaptive pooling when the width of the line of text is not fixed.
+    """
+
+    def forward(self, x):
+        return x.mean(dim=3, keepdim=True)
+
+
+def export_recognizer(recognizer, model_path, image_height=64):
+    """Exports the recognizer with any batch size and any width of the line of text."""
+    recognizer = copy.deepcopy(recognizer)
+    if isinstance(getattr(recognizer, "AdaptiveAvgPool", None), torch.nn.AdaptiveAvgPool2d):
+        recognizer.AdaptiveAvgPool = MeanOverLastDim()
+    torch.onnx.export(
+        recognizer,
+        (torch.zeros(1, 1, image_height, 256), torch.zeros(1, 26, dtype=torch.long)),
+        str(model_path),
+        input_names=["image", "text"],
+        output_names=["preds"],
+        dynamic_axes={"image": {0: "batch", 3: "width"}, "preds": {0: "batch", 1: "length"}},
+        opset_version=17,
+        # The TorchScript exporter traces the LSTM of the recognizer without onnxscript
+        dynamo=False,
+    )
+
+
+def convert_reader_to_onnx(reader, model_dir=MODEL_DIR):
+    """Replaces the detector and the recognizer of the EasyOCR reader with their ONNX models.
+    The models are exported on the first call and reused by the next runs.
+
+    Args:
+        reader (easyocr.Reader): Reader created with gpu=False and quantize=False:
+            the models quantized by torch can not be exported.
+        model_dir (Path, optional): Folder of the exported models. Defaults to MODEL_DIR.
+
+    Returns:
+        easyocr.Reader: The same reader.
+    """
+    model_dir.mkdir(parents=True, exist_ok=True)
+    detector_path = model_dir / "craft_detector.onnx"
+    recognizer_path = model_dir / f"{reader.model_lang}_recognizer.onnx"
+    with torch.no_grad():
+        if not detector_path.exists():
+            logger.info(f"Export of the detector to {detector_path}")
+            export_detector(reader.detector.eval(), detector_path)
+        if not recognizer_path.exists():
+            logger.info(f"Export of the recognizer to {recognizer_path}")
+            export_recognizer(reader.recognizer.eval(), recognizer_path)
+    reader.detector = OnnxModule(detector_path)
+    reader.recognizer = OnnxModule(recognizer_path)
+    return reader
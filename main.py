@@ -5,42 +5,57 @@ import subprocess
 import sys
 import time
 from pathlib import Path
-from pprint import pprint
 
 from dotenv import load_dotenv
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
-
-import image_sorter_ocr.OCR.easy_ocr_type_2 as easy_ocr
-from auth.web_driver import perform_authorization
-from core.navigation import (
-    click_btn_more,
-    click_btn_quality,
-    click_new_malden_quality_plan,
-    moving_through_quality_checklist,
-)
+
+from utils.checkpoint import clear_checkpoint, load_checkpoint
+from utils.config import RunConfig, load_config
 from utils.database import (
+    count_photos_by_building_code,
     create_database_if_not_exist,
     create_index_for_column_data_base,
 )
-from utils.helpers import (
-    create_dict_plots_with_new_photos,
-    get_letter_block_to_start,
-    get_number_level_to_start,
-    get_number_plot_to_start,
-    move_duplicate_photos_to_dir_double,
-    transfer_files_received_from_whatsapp,
-)
-from utils.move_photos_fr_sorted_to_side_rise_structure import (
-    move_photos_sorted_to_side_rise_structure,
-)
+from utils.lazy_import import lazy_import
+from utils.photo_store import PHOTO_STORE_DIR_NAME, configure_photo_store, prune_photo_store
+from utils.progress_journal import count_plots_by_state, create_progress_table, queue_plots
+from utils.structured_logging import setup_structured_logging
+from utils.tracing import export_chrome_trace, log_span_summary, span
+
+# easyocr with torch, selenium and PIL take seconds to import. The modules are imported on the first use,
+# so the modes "sync" and "report" do not wait for them at all and a pass does not wait for easyocr
+# before the photos are transferred from the chats
+easy_ocr = lazy_import("image_sorter_ocr.OCR.easy_ocr_type_2")
+decorators = lazy_import("auth.decorators")
+session_manager = lazy_import("auth.session_manager")
+forms = lazy_import("core.forms")
+navigation = lazy_import("core.navigation")
+pipeline = lazy_import("core.pipeline")
+worker_pool = lazy_import("core.worker_pool")
+helpers = lazy_import("utils.helpers")
+sorted_to_side_rise = lazy_import("utils.move_photos_fr_sorted_to_side_rise_structure")
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
 )
 
 
+def print_report(name_database: str = "side_rise_database.db") -> None:
+    """Prints the states of the plots in the progress journal and the number of photos on the asite."""
+    if not Path(name_database).exists():
+        logging.info(f"The database {name_database} does not exist yet")
+        return
+    create_progress_table(name_database)
+    create_database_if_not_exist(name_database, "photos", subfolder="subfolder_with_photo")
+    plots_by_state: dict[str, int] = count_plots_by_state(name_database)
+    photos_by_plot: dict[str, int] = count_photos_by_building_code(name_database)
+    print("Plots by state:")
+    for state, number in plots_by_state.items():
+        print(f"    {state:<12} {number}")
+    print(f"Photos on the asite: {sum(photos_by_plot.values())} in {len(photos_by_plot)} plots")
+    for block_level_plot, number in photos_by_plot.items():
+        print(f"    {block_level_plot:<16} {number}")
+
+
 def main() -> None:
     """
     base_dir: (Path) Path to the folder where folders with apartment location names are stored.
@@ -54,50 +69,105 @@ def main() -> None:
     load_dotenv()
     site_login = os.getenv("SITE_LOGIN")
     site_password = os.getenv("SITE_PASSWORD")
+    # Settings of the run: config.json, environment variables and command line (python main.py --help)
+    config: RunConfig = load_config()
+    # JSON lines in a rotated file, written by a separate thread
+    setup_structured_logging(config.log_file, config.log_level)
+    logging.info(f"{config=}")
+    # Number of browsers that process plots at the same time
+    number_of_workers: int = config.number_of_workers
+    # Number of forms of the next plots opened in advance in background tabs
+    number_of_prefetch_tabs: int = config.number_of_prefetch_tabs
 
-    base_dir: Path = Path(
-        r"D:\WORK\Horand_LTD\TASK TO DO\Locations with data for inspections\SideRise"
-    )
+    base_dir: Path = config.base_dir
+    # Folder for uploading photos from point 2.3 of the current location block_level_plot
+    # of the Side-Rise inspection
+    download_dir: Path = config.download_dir
     # base_dir_sorted: Path = Path(
     #     r"D:\WORK\Horand_LTD\TASKS_DOING_NOW\side_rise_download_photo_to_asite_point_2_3_refactor_ready\image_sorter_ocr\sorted"
     # )
     base_dir_sorted: Path = Path.cwd() / Path("image_sorter_ocr/sorted")
+    if config.mode == "report":
+        print_report()
+        return
+    if config.mode == "sync":
+        # Only the synchronizer in this console, until it is stopped with Ctrl+C
+        subprocess.run([sys.executable, "synchronize/synchronizer.py"])
+        return
+    # The photos moved between the folders of the plots are hard links of the blobs of the store
+    configure_photo_store(base_dir / PHOTO_STORE_DIR_NAME if config.use_photo_store else None)
     # Запустить как отдельный процесс файл synchronizer.py для получения фото с WhatsApp в папку chats
     sync_proc = subprocess.Popen(
         [sys.executable, "synchronize/synchronizer.py"],
         creationflags=subprocess.CREATE_NEW_CONSOLE,
     )
+    # The start position of the settings is used only in the first pass
+    is_first_pass: bool = True
     try:
+        if config.use_pipeline:
+            create_database_if_not_exist(
+                "side_rise_database.db",
+                "photos",
+                subfolder="subfolder_with_photo",
+            )
+            create_index_for_column_data_base(
+                "side_rise_database.db",
+                "photos",
+                name_column="filename",
+            )
+            pipeline.run_pipeline(
+                site_login,
+                site_password,
+                base_dir,
+                download_dir,
+                Path.cwd() / config.chat_dir,
+                number_of_prefetch_tabs=number_of_prefetch_tabs,
+            )
+            return
+
         while True:
             # # Запустить файл synchronizer.py для получения фото с WhatsApp в папку chats
             # subprocess.run([sys.executable, "synchronize/synchronizer.py"])
 
-            transfer_files_received_from_whatsapp(Path(r"chats\Python dev chat"))
+            # Delete the blobs of the photos deleted by hand since the previous pass
+            prune_photo_store()
+
+            helpers.transfer_files_received_from_whatsapp(config.chat_dir)
 
             # Запустить сортировку
-            easy_ocr.main()
+            with span("ocr"):
+                easy_ocr.main()
 
             # Переместить фотографии из папки base_dir_sorted в base_dir
-            move_photos_sorted_to_side_rise_structure(base_dir_sorted, base_dir)
+            sorted_to_side_rise.move_photos_sorted_to_side_rise_structure(base_dir_sorted, base_dir)
 
             name_database: str = "side_rise_database.db"
             name_table: str = "photos"
 
-            # Folder for uploading photos from point 2.3 of the current location block_level_plot
-            # of the Side-Rise inspection
-            download_dir: Path = Path(r"C:\Users\Human\Downloads\download_from_asite")
-            # Get letter block where script start working
-            letter_block_to_start: str = get_letter_block_to_start()
-            # Get number lever where script start working
-            number_level_to_start: str = get_number_level_to_start()
-            # Get number plot where script start working
-            number_plot_to_start: str = get_number_plot_to_start()
+            # Get block, level and plot where script start working:
+            # from the user in the interactive mode, from the settings in the first pass
+            # or from the checkpoint of an interrupted pass. Otherwise from the beginning of the table
+            checkpoint: tuple[str, str, str] | None = load_checkpoint(config.checkpoint_file)
+            if config.interactive:
+                letter_block_to_start: str = helpers.get_letter_block_to_start()
+                number_level_to_start: str = helpers.get_number_level_to_start()
+                number_plot_to_start: str = helpers.get_number_plot_to_start()
+            elif is_first_pass and config.letter_block_to_start:
+                letter_block_to_start = config.letter_block_to_start
+                number_level_to_start = config.number_level_to_start
+                number_plot_to_start = config.number_plot_to_start
+            elif checkpoint is not None:
+                letter_block_to_start, number_level_to_start, number_plot_to_start = checkpoint
+                logging.info(f"Resume from the checkpoint: {checkpoint}")
+            else:
+                letter_block_to_start, number_level_to_start, number_plot_to_start = ("", "", "")
+            is_first_pass = False
 
             # ! WORK HERE
             # logging.info("Please wait before work function move_duplicate_photos_to_dir_double...")
             dir_with_new_photo: Path = Path(r"2.3\new_photos_send_to_asite")
             # # ! UNCOMMENT THIS BEFORE RUN SCRIPT
-            # move_duplicate_photos_to_dir_double(base_dir, dir_with_new_photo)
+            # helpers.move_duplicate_photos_to_dir_double(base_dir, dir_with_new_photo)
             # logging.info("Function move_duplicate_photos_to_dir_double end work.")
 
             """
@@ -115,26 +185,24 @@ def main() -> None:
             }
             """
             dict_plots_with_new_photos: dict[str, list[Path]] = (
-                create_dict_plots_with_new_photos(base_dir, dir_with_new_photo)
+                helpers.create_dict_plots_with_new_photos(base_dir, dir_with_new_photo)
             )
-            pprint(dict_plots_with_new_photos)
-
-            # Autorization
-            driver_authorized = perform_authorization(site_login, site_password)
-
-            # Close modal window in the start page
-            try:
-                btn_modal_xpath: str = (
-                    '//div[contains(@class, "modal-scrollable")]//*[@id="myModal-annoucement"]/div[1]/button'
-                )
-                btn_modal = WebDriverWait(driver_authorized, 5).until(
-                    EC.visibility_of_element_located((By.XPATH, btn_modal_xpath))
-                )
-                btn_modal.click()
-            except Exception:
-                logging.info("There is no modal window.")
-
-            time.sleep(1)
+            logging.info(
+                "Plots with new photos: "
+                f"{ {plot: len(photos) for plot, photos in dict_plots_with_new_photos.items()} }"
+            )
+            logging.debug(f"{dict_plots_with_new_photos=}")
+            # Skip the plots whose photos were saved on the asite by the previous run, which stopped
+            # before moving them to photos_on_asite. Only the moving of their photos is finished
+            create_progress_table(name_database)
+            dict_plots_with_new_photos, plots_already_saved = queue_plots(dict_plots_with_new_photos)
+            for block_level_plot, photos in plots_already_saved.items():
+                forms.move_uploaded_photos_to_photos_on_asite(base_dir, block_level_plot, photos)
+            # Wait for new photos without opening the browser
+            if not dict_plots_with_new_photos:
+                clear_checkpoint(config.checkpoint_file)
+                time.sleep(config.pass_interval)
+                continue
 
             # Создать базу данных
             create_database_if_not_exist(
@@ -150,14 +218,28 @@ def main() -> None:
                 name_column="filename",
             )
 
-            driver_first_page = click_btn_more(driver_authorized)
-            time.sleep(0.5)
+            # Process plots with several browsers, each browser processes its own blocks
+            if number_of_workers > 1:
+                worker_pool.process_plots_with_worker_pool(
+                    site_login,
+                    site_password,
+                    base_dir,
+                    download_dir,
+                    dict_plots_with_new_photos,
+                    number_of_workers,
+                    number_of_prefetch_tabs,
+                )
+                continue
 
-            driver_quality_page = click_btn_quality(driver_first_page)
+            # Autorization. The browser of the previous pass is reused while its session is valid
+            driver_authorized = session_manager.get_authorized_driver(site_login, site_password)
 
-            driver = click_new_malden_quality_plan(driver_quality_page)
+            # Go to the "New Malden Quality Plan" table (by address after the first pass)
+            driver = navigation.go_to_new_malden_quality_plan(driver_authorized)
+            # Save the session, so that the next start of the script does not need to log in
+            session_manager.save_session(driver, site_password)
 
-            driver = moving_through_quality_checklist(
+            driver = navigation.moving_through_quality_checklist(
                 driver,
                 base_dir,
                 download_dir,
@@ -165,9 +247,21 @@ def main() -> None:
                 letter_block_to_start=letter_block_to_start,
                 number_level_to_start=number_level_to_start,
                 number_plot_to_start=number_plot_to_start,
+                number_of_prefetch_tabs=number_of_prefetch_tabs,
+                # Open only the blocks with new photos and stop after the last of them
+                blocks_to_process={plot.split("_")[0].upper() for plot in dict_plots_with_new_photos},
+                checkpoint_file=config.checkpoint_file,
             )
-            driver.quit()
+            # The pass is finished, the next pass starts from the beginning of the table
+            clear_checkpoint(config.checkpoint_file)
+            # The driver could be replaced after re-authorization, keep the current one for the next pass
+            session_manager.set_driver(driver)
+            logging.info(f"Session guard: {decorators.get_session_guard_stats()}")
+            # Where the time of the pass went: the slowest steps and the trace for chrome://tracing
+            log_span_summary()
+            export_chrome_trace()
     finally:
+        session_manager.quit_driver()
         sync_proc.terminate()
 
 
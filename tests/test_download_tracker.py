@@ -0,0 +1,34 @@
+import pytest
+
+from utils.download_tracker import wait_for_downloads
+
+
+def test_files_with_expected_names_are_waited_for(tmp_path):
+    (tmp_path / "viewThumb.jpg").write_bytes(b"1")
+    (tmp_path / "viewThumb (1).jpg").write_bytes(b"2")
+
+    photos = wait_for_downloads(
+        tmp_path, expected_filenames=["viewThumb.jpg", "viewThumb.jpg"], timeout=2, poll_interval=0.05
+    )
+
+    assert sorted(photo.name for photo in photos) == ["viewThumb (1).jpg", "viewThumb.jpg"]
+
+
+def test_files_saved_under_other_names_are_counted(tmp_path):
+    # The links show "Photo 1", Chrome saved the files under the names of the server
+    (tmp_path / "IMG-20250204-WA0036.jpg").write_bytes(b"1")
+    (tmp_path / "APIM8352.JPG").write_bytes(b"2")
+
+    photos = wait_for_downloads(
+        tmp_path, expected_filenames=["Photo 1.jpg", "Photo 2.jpg"], timeout=2, poll_interval=0.05
+    )
+
+    assert sorted(photo.name for photo in photos) == ["APIM8352.JPG", "IMG-20250204-WA0036.jpg"]
+
+
+def test_unfinished_download_raises_timeout(tmp_path):
+    (tmp_path / "APIM8352.JPG").write_bytes(b"1")
+    (tmp_path / "IMG-20250204-WA0036.jpg.crdownload").write_bytes(b"2")
+
+    with pytest.raises(TimeoutError):
+        wait_for_downloads(tmp_path, expected_filenames=["APIM8352.JPG", "IMG.jpg"], timeout=0.3, poll_interval=0.05)
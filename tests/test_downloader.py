@@ -0,0 +1,139 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.downloader import create_session_with_driver_cookies, download_attachments_concurrently
+
+SESSION_COOKIE: str = "JSESSIONID=abc123"
+PHOTO_BYTES: bytes = b"\xff\xd8\xff\xe0" + b"photo" * 1000
+# Time the server takes to answer each file
+FILE_DELAY: float = 0.3
+
+
+class AsiteFilesHandler(BaseHTTPRequestHandler):
+    """Serves the attachments of item 2.3 only to a request with the cookie of the browser."""
+
+    def do_GET(self):
+        if SESSION_COOKIE not in self.headers.get("Cookie", ""):
+            # The asite answers with the login page when the session is not valid
+            self.send_body(b"<html>login</html>", "text/html")
+        elif self.path.startswith("/download/"):
+            time.sleep(FILE_DELAY)
+            name: str = self.path.rsplit("/", 1)[1]
+            self.send_body(PHOTO_BYTES, "image/jpeg", f'attachment; filename="{name}"')
+        elif self.path == "/broken":
+            # The connection is closed in the middle of the file
+            self.send_response(200)
+            self.send_header("Content-Type", "image/jpeg")
+            self.send_header("Content-Disposition", 'attachment; filename="broken.jpg"')
+            self.send_header("Content-Length", str(len(PHOTO_BYTES)))
+            self.end_headers()
+            self.wfile.write(PHOTO_BYTES[:100])
+            self.close_connection = True
+        else:
+            self.send_error(404)
+
+    def send_body(self, body: bytes, content_type: str, content_disposition: str | None = None):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        if content_disposition:
+            self.send_header("Content-Disposition", content_disposition)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeDriver:
+    """The part of the WebDriver read by create_session_with_driver_cookies."""
+
+    def __init__(self, cookies: list[dict]):
+        self.cookies = cookies
+
+    def execute_script(self, script: str, *args):
+        return "Mozilla/5.0 (test)"
+
+    def get_cookies(self) -> list[dict]:
+        return self.cookies
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), AsiteFilesHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def session():
+    name, value = SESSION_COOKIE.split("=")
+    driver = FakeDriver([{"name": name, "value": value, "domain": "127.0.0.1", "path": "/"}])
+    return create_session_with_driver_cookies(driver)
+
+
+def test_session_has_cookies_and_user_agent_of_driver(session):
+    assert session.cookies.get("JSESSIONID") == "abc123"
+    assert session.headers["User-Agent"] == "Mozilla/5.0 (test)"
+
+
+def test_files_are_downloaded_concurrently(server_url, session, tmp_path):
+    names: list[str] = [f"IMG_{number}.jpg" for number in range(6)]
+    start: float = time.perf_counter()
+    downloaded, failed = download_attachments_concurrently(
+        session, [f"{server_url}/download/{name}" for name in names], tmp_path, max_workers=6
+    )
+    elapsed: float = time.perf_counter() - start
+
+    assert failed == []
+    assert sorted(photo.name for photo in downloaded) == names
+    assert all(photo.read_bytes() == PHOTO_BYTES for photo in downloaded)
+    # One after another the files would take 6 * FILE_DELAY
+    assert elapsed < 3 * FILE_DELAY
+
+
+def test_same_names_do_not_overwrite_each_other(server_url, session, tmp_path):
+    downloaded, failed = download_attachments_concurrently(
+        session, [f"{server_url}/download/viewThumb.jpg"] * 3, tmp_path
+    )
+
+    assert failed == []
+    assert sorted(photo.name for photo in downloaded) == [
+        "viewThumb (1).jpg",
+        "viewThumb (2).jpg",
+        "viewThumb.jpg",
+    ]
+
+
+def test_partial_file_is_removed(server_url, session, tmp_path):
+    downloaded, failed = download_attachments_concurrently(session, [f"{server_url}/broken"], tmp_path)
+
+    assert downloaded == []
+    assert failed == [f"{server_url}/broken"]
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_errors_are_reported_per_file(server_url, session, tmp_path):
+    good_url: str = f"{server_url}/download/IMG_1.jpg"
+    missing_url: str = f"{server_url}/missing"
+    downloaded, failed = download_attachments_concurrently(session, [good_url, missing_url], tmp_path)
+
+    assert [photo.name for photo in downloaded] == ["IMG_1.jpg"]
+    assert failed == [missing_url]
+
+
+def test_login_page_is_not_saved_as_photo(server_url, tmp_path):
+    driver = FakeDriver([])
+    downloaded, failed = download_attachments_concurrently(
+        create_session_with_driver_cookies(driver), [f"{server_url}/download/IMG_1.jpg"], tmp_path
+    )
+
+    assert downloaded == []
+    assert len(failed) == 1
+    assert list(tmp_path.iterdir()) == []
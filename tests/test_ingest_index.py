@@ -0,0 +1,123 @@
+import io
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from utils import helpers, ingest_index
+from utils.helpers import transfer_files_received_from_whatsapp
+
+CHAT_DIR: Path = Path("chats/Python dev chat")
+
+
+def make_jpeg(path: Path, step: int) -> bytes:
+    """Writes a JPEG with stripes "step" pixels wide: photos with other steps have other dhashes."""
+    image = Image.new("L", (64, 64))
+    image.putdata([255 * (x // step % 2) for y in range(64) for x in range(64)])
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG")
+    path.write_bytes(buffer.getvalue())
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def project_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / CHAT_DIR).mkdir(parents=True)
+    (tmp_path / "image_sorter_ocr" / "pics").mkdir(parents=True)
+    return tmp_path
+
+
+def test_photo_not_moved_is_not_a_repeat_of_itself(project_dir, monkeypatch):
+    make_jpeg(project_dir / CHAT_DIR / "Marius_175.jpg", 3)
+    move_photo = helpers.move_photo
+
+    def fail_move_photo(photo: Path, dest: Path) -> Path:
+        raise PermissionError(f"{photo} is open in another process")
+
+    monkeypatch.setattr(helpers, "move_photo", fail_move_photo)
+    with pytest.raises(PermissionError):
+        transfer_files_received_from_whatsapp(CHAT_DIR)
+
+    monkeypatch.setattr(helpers, "move_photo", move_photo)
+    transfer_files_received_from_whatsapp(CHAT_DIR)
+
+    assert [photo.name for photo in (project_dir / "image_sorter_ocr" / "pics").iterdir()] == ["Marius_175.jpg"]
+    assert list((project_dir / "image_sorter_ocr" / "duplicates").iterdir()) == []
+
+
+def test_moved_photo_is_a_repeat_when_received_again(project_dir):
+    photo_bytes: bytes = make_jpeg(project_dir / CHAT_DIR / "Marius_175.jpg", 3)
+    transfer_files_received_from_whatsapp(CHAT_DIR)
+
+    (project_dir / CHAT_DIR / "IMG-20250204-WA0036.jpg").write_bytes(photo_bytes)
+    transfer_files_received_from_whatsapp(CHAT_DIR)
+
+    assert [photo.name for photo in (project_dir / "image_sorter_ocr" / "duplicates").iterdir()] == [
+        "IMG-20250204-WA0036.jpg"
+    ]
+
+
+def test_truncated_photo_is_skipped_until_it_is_written(project_dir):
+    make_jpeg(project_dir / CHAT_DIR / "Marius_175.jpg", 3)
+    photo_bytes: bytes = make_jpeg(project_dir / CHAT_DIR / "Marius_176.jpg", 16)
+    # WhatsApp has written only a part of the file
+    truncated_photo: Path = project_dir / CHAT_DIR / "Marius_176.jpg"
+    truncated_photo.write_bytes(photo_bytes[: len(photo_bytes) // 2])
+
+    transfer_files_received_from_whatsapp(CHAT_DIR)
+
+    pics_dir: Path = project_dir / "image_sorter_ocr" / "pics"
+    assert [photo.name for photo in pics_dir.iterdir()] == ["Marius_175.jpg"]
+    assert truncated_photo.exists()
+
+    truncated_photo.write_bytes(photo_bytes)
+    transfer_files_received_from_whatsapp(CHAT_DIR)
+
+    assert sorted(photo.name for photo in pics_dir.iterdir()) == ["Marius_175.jpg", "Marius_176.jpg"]
+    assert list((project_dir / "image_sorter_ocr" / "duplicates").iterdir()) == []
+
+
+def test_photo_with_same_dhash_goes_to_ocr_by_default(project_dir):
+    make_jpeg(project_dir / CHAT_DIR / "Marius_175.jpg", 3)
+    transfer_files_received_from_whatsapp(CHAT_DIR)
+    # The same picture with other bytes: the label of the next plot taken from the same place
+    Image.open(project_dir / "image_sorter_ocr" / "pics" / "Marius_175.jpg").save(
+        project_dir / CHAT_DIR / "Marius_176.jpg", quality=60
+    )
+
+    transfer_files_received_from_whatsapp(CHAT_DIR)
+
+    assert sorted(photo.name for photo in (project_dir / "image_sorter_ocr" / "pics").iterdir()) == [
+        "Marius_175.jpg",
+        "Marius_176.jpg",
+    ]
+
+
+def test_photo_with_same_dhash_is_a_repeat_when_near_repeats_are_on(project_dir, monkeypatch):
+    monkeypatch.setattr(ingest_index, "INGEST_NEAR_REPEATS", True)
+    make_jpeg(project_dir / CHAT_DIR / "Marius_175.jpg", 3)
+    transfer_files_received_from_whatsapp(CHAT_DIR)
+    Image.open(project_dir / "image_sorter_ocr" / "pics" / "Marius_175.jpg").save(
+        project_dir / CHAT_DIR / "IMG-20250204-WA0036.jpg", quality=60
+    )
+
+    transfer_files_received_from_whatsapp(CHAT_DIR)
+
+    assert [photo.name for photo in (project_dir / "image_sorter_ocr" / "duplicates").iterdir()] == [
+        "IMG-20250204-WA0036.jpg"
+    ]
+
+
+def test_repeats_with_same_name_do_not_overwrite_each_other(project_dir):
+    photo_bytes: bytes = make_jpeg(project_dir / CHAT_DIR / "Marius_175.jpg", 3)
+    transfer_files_received_from_whatsapp(CHAT_DIR)
+
+    for _ in range(2):
+        (project_dir / CHAT_DIR / "Marius_175.jpg").write_bytes(photo_bytes)
+        transfer_files_received_from_whatsapp(CHAT_DIR)
+
+    assert sorted(photo.name for photo in (project_dir / "image_sorter_ocr" / "duplicates").iterdir()) == [
+        "Marius_175 (1).jpg",
+        "Marius_175.jpg",
+    ]
@@ -0,0 +1,57 @@
+import os
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from image_sorter_ocr.OCR import easy_ocr_type_2 as easy_ocr
+
+# BGR of the orange of the labels (hue 22 in HSV)
+LABEL_ORANGE: tuple[int, int, int] = (0, 190, 255)
+
+
+def write_photo(path: Path, image: np.ndarray) -> Path:
+    cv2.imwrite(str(path), image)
+    return path
+
+
+@pytest.fixture
+def label_photo(tmp_path) -> Path:
+    """Landscape photo of a grey wall with the orange label in the left middle part, where the stamp is."""
+    image = np.full((1200, 1600, 3), 120, np.uint8)
+    cv2.rectangle(image, (100, 550), (500, 780), LABEL_ORANGE, thickness=cv2.FILLED)
+    cv2.putText(image, "BL1 PLOT100", (120, 680), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 0), 4)
+    return write_photo(tmp_path / "APIM8352.JPG", image)
+
+
+@pytest.fixture
+def plain_photo(tmp_path) -> Path:
+    """General photo of the site: a blue sky over a grey wall and green grass."""
+    image = np.full((1200, 1600, 3), 120, np.uint8)
+    image[:400] = (220, 160, 90)
+    image[1000:] = (40, 140, 50)
+    return write_photo(tmp_path / "IMG-20250204-WA0036.jpg", image)
+
+
+def test_photo_with_orange_label_is_a_label(label_photo):
+    assert easy_ocr.is_label_photo(label_photo)
+
+
+def test_photo_without_orange_is_not_a_label(plain_photo):
+    assert not easy_ocr.is_label_photo(plain_photo)
+
+
+def test_unreadable_photo_goes_to_ocr(tmp_path):
+    photo: Path = tmp_path / "broken.jpg"
+    photo.write_bytes(b"not a jpeg")
+
+    assert easy_ocr.is_label_photo(photo)
+
+
+@pytest.mark.skipif("OCR_PREFILTER" in os.environ, reason="OCR_PREFILTER is set")
+def test_prefilter_is_off_by_default(plain_photo, monkeypatch):
+    monkeypatch.setattr(easy_ocr, "recognize_label_mask", lambda *args, **kwargs: "BL1PLOT100W12")
+
+    assert easy_ocr.OCR_PREFILTER is False
+    assert easy_ocr.extract_text_if_label(plain_photo, retry=False) == "BL1PLOT100W12"
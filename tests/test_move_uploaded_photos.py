@@ -0,0 +1,30 @@
+import sqlite3
+from pathlib import Path
+
+from core.forms import move_uploaded_photos_to_photos_on_asite
+from utils.database import create_database_if_not_exist
+
+
+def test_uploaded_photos_are_moved_and_recorded(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    create_database_if_not_exist("side_rise_database.db", "photos", subfolder="subfolder_with_photo")
+    base_dir: Path = tmp_path / "SideRise"
+    new_dir: Path = base_dir / "A_L1_Plot_6" / "2.3" / "new_photos_send_to_asite"
+    # The same relative path as in the function: a folder with a backslash on Linux
+    on_asite_dir: Path = base_dir / "A_L1_Plot_6" / Path(r"2.3\photos_on_asite")
+    new_dir.mkdir(parents=True)
+    on_asite_dir.mkdir(parents=True)
+    photos: list[Path] = []
+    for name in ("APIM8352.JPG", "IMG-20250204-WA0036.jpg"):
+        photo: Path = new_dir / name
+        photo.write_bytes(name.encode())
+        photos.append(photo)
+
+    move_uploaded_photos_to_photos_on_asite(base_dir, "A_L1_Plot_6", photos)
+
+    assert list(new_dir.iterdir()) == []
+    assert sorted(photo.name for photo in on_asite_dir.iterdir()) == ["APIM8352.JPG", "IMG-20250204-WA0036.jpg"]
+    connection = sqlite3.connect("side_rise_database.db")
+    rows = connection.execute("SELECT building_code, filename FROM photos ORDER BY filename").fetchall()
+    connection.close()
+    assert rows == [("A_L1_Plot_6", "APIM8352.JPG"), ("A_L1_Plot_6", "IMG-20250204-WA0036.jpg")]
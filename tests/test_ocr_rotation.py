@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from image_sorter_ocr.OCR import easy_ocr_type_2 as easy_ocr
+
+# BGR of the orange of the labels (hue 22 in HSV)
+LABEL_ORANGE: tuple[int, int, int] = (0, 190, 255)
+PLATE_TEXT: str = "BL1PLOT100W12"
+
+
+class FakeReader:
+    """Reads the plate only from the mask as it was cropped, like a label that is upright on the photo."""
+
+    def __init__(self, upright_shape: tuple[int, int]):
+        self.upright_shape = upright_shape
+        self.shapes: list[tuple[int, int]] = []
+
+    def readtext(self, image, batch_size=1, allowlist=None):
+        self.shapes.append(image.shape[:2])
+        text: str = PLATE_TEXT if image.shape[:2] == self.upright_shape else "I0I"
+        return [([[0, 0], [1, 0], [1, 1], [0, 1]], text, 0.9)]
+
+
+@pytest.fixture
+def clipped_label_photo(tmp_path) -> Path:
+    """Portrait photo with an upright label that the crop of the stamp (the left half) cuts,
+    so that the part of it in the crop is higher than wide.
+    """
+    image = np.full((1200, 1000, 3), 90, np.uint8)
+    cv2.rectangle(image, (380, 500), (900, 900), LABEL_ORANGE, thickness=cv2.FILLED)
+    cv2.putText(image, "BL1", (400, 700), cv2.FONT_HERSHEY_SIMPLEX, 3, (0, 0, 0), 8)
+    photo: Path = tmp_path / "APIM8352.JPG"
+    cv2.imwrite(str(photo), image)
+    return photo
+
+
+def test_retry_rotations_read_label_as_it_is_after_turn_on_side():
+    assert easy_ocr.get_retry_rotations(0) == [180]
+    assert easy_ocr.get_retry_rotations(90) == [0, 270]
+
+
+def test_upright_clipped_label_is_read_at_zero_degrees(clipped_label_photo, monkeypatch):
+    text_mask_inv = easy_ocr.get_label_mask(clipped_label_photo)
+    assert easy_ocr.estimate_rotation(text_mask_inv) == 90
+    reader = FakeReader(text_mask_inv.shape[:2])
+    monkeypatch.setattr(easy_ocr, "get_reader", lambda backend=None: reader)
+
+    text = easy_ocr.extract_text_if_label(clipped_label_photo, prefilter=False, retry=True, detection="craft")
+
+    assert text == PLATE_TEXT
+    # The estimate on its side first, then the mask as it is
+    assert reader.shapes == [text_mask_inv.shape[::-1], text_mask_inv.shape]
+
+
+def test_failed_label_is_read_at_most_three_times(clipped_label_photo, monkeypatch):
+    reader = FakeReader((0, 0))
+    monkeypatch.setattr(easy_ocr, "get_reader", lambda backend=None: reader)
+
+    text = easy_ocr.extract_text_if_label(clipped_label_photo, prefilter=False, retry=True, detection="craft")
+
+    assert text == "I0I"
+    assert len(reader.shapes) == 3
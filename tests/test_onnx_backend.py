@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("onnxruntime")
+pytest.importorskip("easyocr")
+
+from easyocr.craft import CRAFT
+from easyocr.model.vgg_model import Model
+
+from image_sorter_ocr.OCR import onnx_backend
+
+# Largest difference of the outputs of torch and ONNX Runtime
+TOLERANCE: float = 1e-4
+
+
+@pytest.fixture
+def reader():
+    """Reader with the architectures of EasyOCR ("english" recognizer), the weights are random:
+    the export must give the outputs of torch for any weights.
+    """
+    torch.manual_seed(0)
+    return SimpleNamespace(
+        detector=CRAFT().eval(),
+        recognizer=Model(1, 256, 256, 97).eval(),
+        model_lang="english",
+    )
+
+
+def test_onnx_models_give_outputs_of_torch(reader, tmp_path):
+    # Sizes different from the sizes of the export: the axes of the models must be dynamic
+    image = torch.rand(1, 3, 320, 480)
+    lines = torch.rand(2, 1, 64, 200)
+    text = torch.zeros(2, 21, dtype=torch.long)
+    with torch.no_grad():
+        y, feature = reader.detector(image)
+        preds = reader.recognizer(lines, text)
+
+    onnx_backend.convert_reader_to_onnx(reader, tmp_path)
+
+    assert (tmp_path / "craft_detector.onnx").exists()
+    assert (tmp_path / "english_recognizer.onnx").exists()
+    assert isinstance(reader.detector, onnx_backend.OnnxModule)
+    onnx_y, onnx_feature = reader.detector(image)
+    onnx_preds = reader.recognizer(lines, text)
+    assert onnx_y.shape == y.shape
+    assert onnx_feature.shape == feature.shape
+    assert onnx_preds.shape == preds.shape
+    assert (onnx_y - y).abs().max() < TOLERANCE
+    assert (onnx_feature - feature).abs().max() < TOLERANCE
+    assert (onnx_preds - preds).abs().max() < TOLERANCE
+
+
+def test_exported_models_are_reused(reader, tmp_path):
+    onnx_backend.convert_reader_to_onnx(reader, tmp_path)
+    modified: float = (tmp_path / "english_recognizer.onnx").stat().st_mtime
+
+    other_reader = SimpleNamespace(detector=None, recognizer=None, model_lang="english")
+    onnx_backend.convert_reader_to_onnx(other_reader, tmp_path)
+
+    assert (tmp_path / "english_recognizer.onnx").stat().st_mtime == modified
+    assert isinstance(other_reader.recognizer, onnx_backend.OnnxModule)
@@ -0,0 +1,30 @@
+from pathlib import Path
+
+from PIL import Image
+
+from utils.photo_recompress import recompress_photo, remove_cached_photos
+
+
+def make_photo(path: Path, color: tuple[int, int, int]) -> Path:
+    Image.new("RGB", (3000, 2000), color).save(path, quality=100)
+    return path
+
+
+def test_cached_copies_of_moved_photos_are_removed(tmp_path, monkeypatch):
+    cache_dir: Path = tmp_path / "photo_cache"
+    monkeypatch.setenv("PHOTO_CACHE_DIR", str(cache_dir))
+    uploaded_photo: Path = make_photo(tmp_path / "APIM8352.JPG", (200, 100, 50))
+    other_photo: Path = make_photo(tmp_path / "IMG-20250204-WA0036.jpg", (50, 100, 200))
+    # The same photo recompressed with two settings and another photo that is still waiting for upload
+    recompress_photo(uploaded_photo, cache_dir, 2048, 85)
+    recompress_photo(uploaded_photo, cache_dir, 1024, 70)
+    other_copy: Path = recompress_photo(other_photo, cache_dir, 2048, 85)
+
+    assert remove_cached_photos([uploaded_photo]) == 2
+    assert [cached_dir.name for cached_dir in cache_dir.iterdir()] == [other_copy.parent.name]
+
+
+def test_nothing_is_removed_without_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("PHOTO_CACHE_DIR", str(tmp_path / "photo_cache"))
+
+    assert remove_cached_photos([make_photo(tmp_path / "APIM8352.JPG", (200, 100, 50))]) == 0
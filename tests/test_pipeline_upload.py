@@ -0,0 +1,49 @@
+import queue
+import threading
+import time
+from pathlib import Path
+
+import core.pipeline as pipeline
+
+
+def test_failed_plot_is_uploaded_again_without_new_photos(monkeypatch, tmp_path):
+    new_photos: dict[str, list[Path]] = {"A_L1_Plot_1": [tmp_path / "IMG_1.jpg"]}
+    passes: list[list[str]] = []
+
+    def moving_through_quality_checklist(driver, base_dir, download_dir, plots, **kwargs):
+        passes.append(sorted(plots))
+        if len(passes) == 1:
+            raise RuntimeError("The browser crashed")
+        new_photos.clear()
+        return driver
+
+    monkeypatch.setattr(pipeline, "create_dict_plots_with_new_photos", lambda base_dir, sub_dir: dict(new_photos))
+    monkeypatch.setattr(pipeline, "queue_plots", lambda plots: (plots, {}))
+    monkeypatch.setattr(pipeline, "get_authorized_driver", lambda login, password: object())
+    monkeypatch.setattr(pipeline, "go_to_new_malden_quality_plan", lambda driver: driver)
+    monkeypatch.setattr(pipeline, "save_session", lambda driver, password: None)
+    monkeypatch.setattr(pipeline, "set_driver", lambda driver: None)
+    monkeypatch.setattr(pipeline, "quit_driver", lambda: None)
+    monkeypatch.setattr(pipeline, "moving_through_quality_checklist", moving_through_quality_checklist)
+
+    upload_queue: queue.Queue = queue.Queue()
+    upload_queue.put({"block_level_plot": "A_L1_Plot_1", "arrived_at": time.time()})
+    metrics: dict = pipeline.create_pipeline_metrics()
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=pipeline.run_upload_stage,
+        args=(
+            "login", "password", tmp_path, tmp_path, Path("2.3"), upload_queue, metrics, stop_event,
+        ),
+        kwargs={"batch_window": 0, "retry_interval": 0.1},
+        daemon=True,
+    )
+    thread.start()
+    deadline: float = time.monotonic() + 10
+    while len(passes) < 2 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    stop_event.set()
+    thread.join(timeout=5)
+
+    assert passes == [["A_L1_Plot_1"], ["A_L1_Plot_1"]]
+    assert metrics["stages"]["upload"]["failed"] == 1
@@ -0,0 +1,46 @@
+from pathlib import Path
+
+import auth.decorators as decorators
+import core.navigation as navigation
+
+
+class FakeDriver:
+    def __init__(self, session_id: str, title: str = "Quality"):
+        self._session_id = session_id
+        self.title = title
+        self.quit_called = False
+
+    @property
+    def session_id(self) -> str:
+        if self._session_id is None:
+            raise ConnectionError("The browser does not respond")
+        return self._session_id
+
+    def quit(self) -> None:
+        self.quit_called = True
+
+
+def test_dead_driver_is_reauthorized(monkeypatch):
+    new_driver = FakeDriver("new")
+    monkeypatch.setattr(decorators, "reauthorize", lambda driver: new_driver)
+
+    assert decorators.guard_session(FakeDriver(None)) is new_driver
+
+
+def test_reauthorization_keeps_download_dir_and_opens_quality_plan(monkeypatch):
+    old_driver = FakeDriver("worker-2", title="Unauthorised")
+    new_driver = FakeDriver("worker-2-new")
+    calls: list = []
+    monkeypatch.setattr(decorators, "get_download_dir", lambda driver: Path("downloads/worker_2"))
+    monkeypatch.setattr(
+        decorators,
+        "perform_authorization",
+        lambda login, password, download_dir: calls.append(("login", download_dir)) or new_driver,
+    )
+    monkeypatch.setattr(
+        navigation, "go_to_new_malden_quality_plan", lambda driver: calls.append(("quality plan", driver)) or driver
+    )
+
+    assert decorators.guard_session(old_driver) is new_driver
+    assert old_driver.quit_called
+    assert calls == [("login", Path("downloads/worker_2")), ("quality plan", new_driver)]
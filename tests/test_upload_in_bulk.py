@@ -0,0 +1,52 @@
+from pathlib import Path
+
+import core.forms as forms
+
+
+class FakeInput:
+    def __init__(self):
+        self.sent: list[str] = []
+
+    def send_keys(self, value: str) -> None:
+        self.sent.append(value)
+
+
+def run_upload(monkeypatch, states_by_poll: list[dict[str, str]]) -> list[Path]:
+    """Runs the bulk upload with the states of the attachments returned by the page on each check."""
+    polls = iter(states_by_poll)
+    last: list[dict[str, str]] = [states_by_poll[0]]
+
+    def get_upload_states_of_photos(driver, point_xpath, filenames):
+        last[0] = next(polls, last[0])
+        spinners: int = sum(state == "uploading" for state in last[0].values())
+        return (dict(last[0]), spinners)
+
+    monkeypatch.setattr(forms, "get_upload_states_of_photos", get_upload_states_of_photos)
+    photos: list[Path] = [Path("new/A.jpg"), Path("new/B.jpg")]
+    _, uploaded = forms.upload_photos_to_point_2_3_in_bulk(
+        None, FakeInput(), photos, "//point", timeout=5, poll_interval=0.01
+    )
+    return uploaded
+
+
+def test_photos_seen_uploaded_are_returned(monkeypatch):
+    uploaded = run_upload(
+        monkeypatch,
+        [
+            {"A.jpg": "uploading", "B.jpg": "uploading"},
+            {"A.jpg": "uploaded", "B.jpg": "uploading"},
+            {"A.jpg": "uploaded", "B.jpg": "uploaded"},
+        ],
+    )
+
+    assert uploaded == [Path("new/A.jpg"), Path("new/B.jpg")]
+
+
+def test_photo_never_in_attachments_is_not_uploaded(monkeypatch):
+    # B.jpg never appears in the list of attachments: its upload failed
+    uploaded = run_upload(
+        monkeypatch,
+        [{"A.jpg": "uploading", "B.jpg": "pending"}, {"A.jpg": "uploaded", "B.jpg": "pending"}],
+    )
+
+    assert uploaded == [Path("new/A.jpg")]
@@ -0,0 +1,53 @@
+import json
+import logging
+from pathlib import Path
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
+)
+
+
+def save_checkpoint(checkpoint_file: Path, block_level_plot: str) -> None:
+    """Remembers the last processed plot of the current pass.
+
+    Args:
+        checkpoint_file (Path): For example: Path("checkpoint.json")
+        block_level_plot (str): The apartment code. For example: "B_L2_Plot_105"
+    """
+    tmp_file: Path = checkpoint_file.with_suffix(".tmp")
+    tmp_file.write_text(json.dumps({"block_level_plot": block_level_plot}), encoding="utf-8")
+    tmp_file.replace(checkpoint_file)
+
+
+def load_checkpoint(checkpoint_file: Path) -> tuple[str, str, str] | None:
+    """Returns the start position of the last processed plot of an unfinished pass
+    in the format of the start position of moving_through_quality_checklist.
+
+    Args:
+        checkpoint_file (Path): For example: Path("checkpoint.json")
+
+    Returns:
+        tuple[str, str, str] | None: Block letter, level number and plot number.
+            For example:
+                ("b", "02", "105")
+            None if the previous pass was finished.
+    """
+    try:
+        block_level_plot: str = json.loads(checkpoint_file.read_text(encoding="utf-8"))[
+            "block_level_plot"
+        ]
+        block_letter, level, _, plot_number = block_level_plot.split("_")
+    except (OSError, ValueError, KeyError) as err:
+        if checkpoint_file.exists():
+            logging.info(f"The checkpoint {checkpoint_file} can not be read: {err!r}")
+        return None
+    return (
+        block_letter.lower(),
+        level.removeprefix("L").zfill(2),
+        plot_number.zfill(2),
+    )
+
+
+def clear_checkpoint(checkpoint_file: Path) -> None:
+    """Deletes the checkpoint when the pass is finished, so that the next pass starts from the beginning."""
+    checkpoint_file.unlink(missing_ok=True)
@@ -0,0 +1,150 @@
+import argparse
+import json
+import logging
+import os
+from dataclasses import dataclass, fields
+from pathlib import Path
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
+)
+
+
+@dataclass
+class RunConfig:
+    r"""Settings of a run of the script.
+    The values are taken, from the lowest priority to the highest, from the defaults below,
+    the JSON file (--config, env ASITE_CONFIG, default "config.json"), the environment variables and the command line.
+
+    For example, config.json:
+        {
+            "base_dir": "D:\\WORK\\Horand_LTD\\TASK TO DO\\Locations with data for inspections\\SideRise",
+            "number_of_workers": 2,
+            "letter_block_to_start": "b"
+        }
+    """
+
+    # Folder where folders with apartment location names are stored
+    base_dir: Path = Path(r"D:\WORK\Horand_LTD\TASK TO DO\Locations with data for inspections\SideRise")
+    # Folder for uploading photos from point 2.3
+    download_dir: Path = Path(r"C:\Users\Human\Downloads\download_from_asite")
+    # Folder with photos from WhatsApp
+    chat_dir: Path = Path(r"chats\Python dev chat")
+    # Start position of the first pass. Empty - from the beginning of the table or from the checkpoint
+    letter_block_to_start: str = ""
+    number_level_to_start: str = ""
+    number_plot_to_start: str = ""
+    # Number of browsers that process plots at the same time
+    number_of_workers: int = 1
+    # Number of forms of the next plots opened in advance in background tabs. 0 - off, each form is opened in turn
+    number_of_prefetch_tabs: int = 0
+    # Process photos with the staged pipeline instead of the passes of the loop
+    use_pipeline: bool = False
+    # Move photos between the folders as hard links of one copy in base_dir/.photo_store (utils/photo_store.py)
+    use_photo_store: bool = True
+    # Ask the start position with input() before each pass, as before
+    interactive: bool = False
+    # File with the last processed plot of an unfinished pass
+    checkpoint_file: Path = Path("checkpoint.json")
+    # Pause between the passes of the loop in seconds
+    pass_interval: float = 60
+    # File of the JSON-lines log, rotated by size
+    log_file: Path = Path("logs") / "run.jsonl"
+    # Records below the level are dropped: DEBUG, INFO, WARNING
+    log_level: str = "INFO"
+    # What the run does, one of RUN_MODES
+    mode: str = "run"
+
+
+# "run" - uploads new photos to the asite, "sync" - only downloads the photos of the WhatsApp chats,
+# "report" - prints the state of the database and exits. Only "run" imports selenium and easyocr
+RUN_MODES: tuple[str, ...] = ("run", "sync", "report")
+
+
+# Field of RunConfig -> environment variable
+ENV_VARIABLES: dict[str, str] = {
+    "base_dir": "ASITE_BASE_DIR",
+    "download_dir": "ASITE_DOWNLOAD_DIR",
+    "chat_dir": "ASITE_CHAT_DIR",
+    "letter_block_to_start": "START_BLOCK",
+    "number_level_to_start": "START_LEVEL",
+    "number_plot_to_start": "START_PLOT",
+    "number_of_workers": "NUMBER_OF_WORKERS",
+    "number_of_prefetch_tabs": "NUMBER_OF_PREFETCH_TABS",
+    "use_pipeline": "USE_PIPELINE",
+    "use_photo_store": "USE_PHOTO_STORE",
+    "interactive": "ASITE_INTERACTIVE",
+    "checkpoint_file": "CHECKPOINT_FILE",
+    "pass_interval": "PASS_INTERVAL",
+    "log_file": "LOG_FILE",
+    "log_level": "LOG_LEVEL",
+    "mode": "ASITE_MODE",
+}
+
+
+def convert_value(value: object, field_type: type) -> object:
+    """Converts a value from the JSON file, an environment variable or the command line to the type of the field."""
+    if field_type is bool and isinstance(value, str):
+        return value.lower() in ("1", "true", "yes")
+    return field_type(value)
+
+
+def format_number_to_start(number: str) -> str:
+    """Adds 0 to a one-digit number, as in the titles of the table: "level 01", "plot 03".
+
+    Args:
+        number (str): For example: "3"
+
+    Returns:
+        str: For example: "03". Empty string if the number is not set.
+    """
+    number = str(number).strip()
+    return "0" + number if len(number) == 1 else number
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parses the command line. Every field of RunConfig has its option, for example --base-dir."""
+    parser = argparse.ArgumentParser(
+        description="Uploads new photos of point 2.3 to the Side-Rise inspections on the asite."
+    )
+    parser.add_argument("--config", type=Path, default=None, help="JSON file with the settings.")
+    for field in fields(RunConfig):
+        option: str = "--" + field.name.replace("_", "-")
+        if field.type is bool:
+            parser.add_argument(option, action=argparse.BooleanOptionalAction, default=None)
+        else:
+            parser.add_argument(option, type=field.type, default=None)
+    return parser.parse_args(argv)
+
+
+def load_config(argv: list[str] | None = None) -> RunConfig:
+    """Builds the settings of the run from the JSON file, the environment variables and the command line.
+
+    Args:
+        argv (list[str] | None, optional): Arguments of the command line. Defaults to None - sys.argv.
+
+    Returns:
+        RunConfig
+    """
+    args: argparse.Namespace = parse_args(argv)
+    config = RunConfig()
+    config_file: Path = args.config or Path(os.getenv("ASITE_CONFIG", "config.json"))
+    values: dict = {}
+    if config_file.exists():
+        values.update(json.loads(config_file.read_text(encoding="utf-8")))
+        logging.info(f"Settings are read from {config_file}")
+    for field in fields(RunConfig):
+        env_value: str | None = os.getenv(ENV_VARIABLES[field.name])
+        if env_value is not None:
+            values[field.name] = env_value
+        arg_value = getattr(args, field.name)
+        if arg_value is not None:
+            values[field.name] = arg_value
+        if field.name in values:
+            setattr(config, field.name, convert_value(values[field.name], field.type))
+    if config.mode not in RUN_MODES:
+        raise ValueError(f"Unknown mode {config.mode!r}, expected one of {RUN_MODES}")
+    config.letter_block_to_start = config.letter_block_to_start.strip().lower()
+    config.number_level_to_start = format_number_to_start(config.number_level_to_start)
+    config.number_plot_to_start = format_number_to_start(config.number_plot_to_start)
+    return config
@@ -2,6 +2,8 @@ import logging
 import sqlite3
 from pathlib import Path
 
+from utils.tracing import traced
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
 )
@@ -76,6 +78,7 @@ def create_index_for_column_data_base(
     connection.close()
 
 
+@traced(plot_argument="building_code")
 def add_photos_to_data_base(
     building_code: str,
     subfolder: str,
@@ -144,3 +147,20 @@ def add_photos_to_data_base(
             )
     # Close the database connection
     connection.close()
+
+
+def count_photos_by_building_code(
+    name_database: str = "side_rise_database.db",
+    name_table: str = "photos",
+) -> dict[str, int]:
+    """Returns the number of photos recorded in the database for each apartment.
+
+    Returns:
+        dict[str, int]: For example: {"A_L1_Plot_1": 12, "B_L2_Plot_105": 4}
+    """
+    connection = sqlite3.connect(name_database)
+    rows = connection.execute(
+        f"SELECT building_code, COUNT(*) FROM {name_table} GROUP BY building_code ORDER BY building_code"
+    ).fetchall()
+    connection.close()
+    return dict(rows)
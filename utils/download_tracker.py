@@ -0,0 +1,205 @@
+import logging
+import re
+import time
+from pathlib import Path
+
+from selenium.webdriver.chrome.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
+)
+
+# Extensions of files that Chrome has not finished downloading yet
+PARTIAL_DOWNLOAD_EXTENSIONS: tuple[str, ...] = (".crdownload", ".tmp", ".part")
+
+
+def set_download_dir_for_driver(driver: WebDriver, download_dir: Path) -> WebDriver:
+    r"""Switches the folder into which Chrome saves downloaded files, without restarting the browser.
+    Uses the CDP command "Browser.setDownloadBehavior".
+
+    Args:
+        driver (WebDriver)
+        download_dir (Path): Absolute path to the folder for downloaded files.
+            For example:
+                Path(r"C:\Users\Human\Downloads\download_from_asite\A_L1_Plot_6")
+
+    Returns:
+        WebDriver
+    """
+    download_dir.mkdir(parents=True, exist_ok=True)
+    driver.execute_cdp_cmd(
+        "Browser.setDownloadBehavior",
+        {
+            "behavior": "allow",
+            "downloadPath": str(download_dir.resolve()),
+            "eventsEnabled": True,
+        },
+    )
+    logging.info(f"Chrome downloads files to {download_dir}")
+    return driver
+
+
+def get_expected_filenames_from_elements(
+    driver: WebDriver, photos_on_asite_elements: list[WebElement]
+) -> list[str]:
+    """Reads the names of the files of the attachment links of point 2.3 in one request to the browser.
+    The name is taken from the "download" or "title" attribute or from the text of the link.
+
+    Args:
+        driver (WebDriver)
+        photos_on_asite_elements (list[WebElement]): List of "<a>" elements of photos in point 2.3.
+
+    Returns:
+        list[str]: List of file names. Empty if at least one name could not be determined.
+            For example:
+                ["APIM8352.JPG", "IMG-20250204-WA0036.jpg"]
+    """
+    names: list[str] = driver.execute_script(
+        """
+        return arguments[0].map(element =>
+            (element.getAttribute("download") || element.getAttribute("title") || element.textContent || "").trim()
+        );
+        """,
+        photos_on_asite_elements,
+    )
+    if all(re.search(r"\.\w{2,5}$", name) for name in names):
+        return names
+    return []
+
+
+def is_partial_download(file: Path) -> bool:
+    """Checks whether the file is a file that Chrome has not finished downloading yet.
+
+    Args:
+        file (Path): Path to the file.
+
+    Returns:
+        bool
+    """
+    return file.suffix.lower() in PARTIAL_DOWNLOAD_EXTENSIONS
+
+
+def get_completed_files(download_dir: Path) -> list[Path]:
+    """Returns the list of fully downloaded files in the "download_dir" folder.
+
+    Args:
+        download_dir (Path): Folder with downloaded files.
+
+    Returns:
+        list[Path]
+    """
+    return [
+        obj
+        for obj in download_dir.glob("*")
+        if obj.is_file() and not is_partial_download(obj)
+    ]
+
+
+def match_expected_filenames(
+    expected_filenames: list[str], completed_files: list[Path]
+) -> dict[str, Path]:
+    """Matches the expected file names with the downloaded files.
+    Chrome adds a number to the name if a file with the same name is already in the folder,
+    so the file "viewThumb (1).jpg" matches the expected name "viewThumb.jpg".
+
+    Args:
+        expected_filenames (list[str]): Names of the files that should be downloaded.
+            For example:
+                ["viewThumb.jpg", "viewThumb.jpg", "APIM8352.JPG"]
+        completed_files (list[Path]): Downloaded files.
+
+    Returns:
+        dict[str, Path]: Expected name with its index -> downloaded file.
+            For example:
+                {
+                    "0:viewThumb.jpg": WindowsPath(".../viewThumb.jpg"),
+                    "1:viewThumb.jpg": WindowsPath(".../viewThumb (1).jpg"),
+                }
+    """
+    matched: dict[str, Path] = {}
+    free_files: list[Path] = sorted(completed_files, key=lambda file: file.name)
+    for index, expected_filename in enumerate(expected_filenames):
+        stem: str = Path(expected_filename).stem
+        suffix: str = Path(expected_filename).suffix
+        pattern = re.compile(rf"^{re.escape(stem)}( \(\d+\))?{re.escape(suffix)}$", re.IGNORECASE)
+        for file in free_files:
+            if pattern.match(file.name):
+                matched[f"{index}:{expected_filename}"] = file
+                free_files.remove(file)
+                break
+    return matched
+
+
+def wait_for_downloads(
+    download_dir: Path,
+    expected_filenames: list[str] | None = None,
+    expected_count: int | None = None,
+    timeout: float = 60,
+    poll_interval: float = 0.2,
+) -> list[Path]:
+    """Waits until all expected files are fully downloaded into the "download_dir" folder.
+    A file is considered downloaded when Chrome has renamed it from ".crdownload"
+    and its size has not changed between two checks.
+    If the names of the files are unknown, waits for "expected_count" files.
+    The names read from the links may differ from the names under which Chrome saves the files,
+    so "expected_count" completed files are also enough: the folder must contain only the new downloads.
+
+    Args:
+        download_dir (Path): Folder with downloaded files.
+        expected_filenames (list[str] | None, optional): Names of the files that should be downloaded.
+            Defaults to None.
+        expected_count (int | None, optional): Number of files that should be downloaded.
+            Used if "expected_filenames" is not specified. Defaults to None.
+        timeout (float, optional): Maximum waiting time in seconds. Defaults to 60.
+        poll_interval (float, optional): Time between checks of the folder in seconds. Defaults to 0.2.
+
+    Raises:
+        TimeoutError: If not all files were downloaded in "timeout" seconds.
+
+    Returns:
+        list[Path]: List of downloaded files.
+    """
+    if expected_filenames:
+        expected_count = len(expected_filenames)
+    start: float = time.perf_counter()
+    previous_sizes: dict[Path, int] = {}
+
+    while True:
+        completed_files: list[Path] = get_completed_files(download_dir)
+        has_partial: bool = any(
+            is_partial_download(obj) for obj in download_dir.glob("*")
+        )
+        sizes: dict[Path, int] = {file: file.stat().st_size for file in completed_files}
+        is_stable: bool = sizes == previous_sizes
+        previous_sizes = sizes
+
+        if expected_filenames:
+            matched: dict[str, Path] = match_expected_filenames(
+                expected_filenames, completed_files
+            )
+            is_done: bool = len(matched) == expected_count
+            ready_files: list[Path] = list(matched.values())
+            if not is_done and len(completed_files) >= expected_count:
+                # Chrome saved some files under other names than the links show
+                is_done = True
+                ready_files = completed_files
+        else:
+            is_done = len(completed_files) >= (expected_count or 0)
+            ready_files = completed_files
+
+        if is_done and is_stable and not has_partial:
+            logging.info(
+                f"{len(ready_files)} files downloaded to {download_dir} "
+                f"in {time.perf_counter() - start:.2f}s"
+            )
+            return ready_files
+
+        if time.perf_counter() - start > timeout:
+            message_error: str = (
+                f"Error in function wait_for_downloads.\n"
+                f"Only {len(ready_files)} of {expected_count} files were downloaded "
+                f"to {download_dir} in {timeout}s."
+            )
+            raise TimeoutError(message_error)
+        time.sleep(poll_interval)
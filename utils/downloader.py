@@ -0,0 +1,238 @@
+import logging
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from selenium.webdriver.chrome.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
+)
+
+# Protects the choice of file names when several threads save files into one folder
+_file_name_lock: threading.Lock = threading.Lock()
+
+
+def get_attachment_urls_from_elements(
+    driver: WebDriver, photos_on_asite_elements: list[WebElement]
+) -> list[str]:
+    """Reads the "href" attributes of all attachment links of point 2.3 in one request to the browser.
+
+    Args:
+        driver (WebDriver)
+        photos_on_asite_elements (list[WebElement]): List of "<a>" elements of photos
+            that are already on asite in point 2.3.
+
+    Returns:
+        list[str]: List of absolute links to attachments. Links of the "javascript:" type are skipped.
+            For example:
+                ["https://adoddleak.asite.com/adoddle/download?fileId=123456"]
+    """
+    hrefs: list[str | None] = driver.execute_script(
+        "return arguments[0].map(element => element.href);", photos_on_asite_elements
+    )
+    return [
+        href
+        for href in hrefs
+        if href and href.lower().startswith(("http://", "https://"))
+    ]
+
+
+def create_session_with_driver_cookies(
+    driver: WebDriver, pool_size: int = 8
+) -> requests.Session:
+    """Creates a "requests.Session" with a connection pool and copies into it the cookies
+    and the User-Agent of the authorized browser, so that files can be downloaded without clicks.
+
+    Args:
+        driver (WebDriver): Authorized driver.
+        pool_size (int, optional): Number of connections kept open to one host.
+            Defaults to 8.
+
+    Returns:
+        requests.Session
+    """
+    session: requests.Session = requests.Session()
+    adapter: HTTPAdapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = driver.execute_script("return navigator.userAgent;")
+    for cookie in driver.get_cookies():
+        session.cookies.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie.get("domain"),
+            path=cookie.get("path", "/"),
+        )
+    return session
+
+
+def get_filename_from_response(
+    response: requests.Response, url: str, index: int
+) -> str:
+    """Gets the file name from the "Content-Disposition" header of the response.
+    If there is no such header, the file name is taken from the last part of the link.
+
+    Args:
+        response (requests.Response): Response of the server with the file.
+        url (str): Link to the file.
+        index (int): Sequence number of the file. Used if the name could not be determined.
+
+    Returns:
+        str: File name.
+            For example:
+                "IMG-20250204-WA0036.jpg"
+    """
+    content_disposition: str = response.headers.get("Content-Disposition", "")
+    match = re.search(r"filename\*=(?:UTF-8'')?([^;]+)", content_disposition, re.IGNORECASE)
+    if not match:
+        match = re.search(r'filename="?([^";]+)"?', content_disposition, re.IGNORECASE)
+    if match:
+        filename: str = unquote(match.group(1).strip().strip('"'))
+    else:
+        filename = unquote(Path(urlparse(url).path).name)
+    # Remove characters that can not be used in file names on Windows
+    filename = re.sub(r'[\\/:*?"<>|]+', "_", filename).strip()
+    if not filename or "." not in filename:
+        filename = f"attachment_{index}.jpg"
+    return filename
+
+
+def reserve_file_path(target_dir: Path, filename: str) -> Path:
+    """Returns a free path for the file in "target_dir".
+    If a file with this name already exists, adds the number to the name the way Chrome does it.
+        For example:
+            "viewThumb.jpg" -> "viewThumb (1).jpg"
+
+    Args:
+        target_dir (Path): Folder to save the file.
+        filename (str): Desired file name.
+
+    Returns:
+        Path
+    """
+    with _file_name_lock:
+        dest: Path = target_dir / filename
+        number: int = 1
+        while dest.exists():
+            dest = target_dir / f"{Path(filename).stem} ({number}){Path(filename).suffix}"
+            number += 1
+        # Create an empty file so that another thread does not take the same name
+        dest.touch()
+    return dest
+
+
+def download_attachment(
+    session: requests.Session,
+    url: str,
+    target_dir: Path,
+    index: int,
+    timeout: int = 60,
+) -> Path:
+    """Downloads one file by "url" to the "target_dir" folder.
+    The file is first written with the ".part" extension and renamed only after it has been fully received,
+    so an incomplete file is never visible in "target_dir".
+
+    Args:
+        session (requests.Session): Session with the browser cookies.
+        url (str): Link to the file.
+        target_dir (Path): Folder to save the file.
+        index (int): Sequence number of the file.
+        timeout (int, optional): Timeout of the request in seconds. Defaults to 60.
+
+    Returns:
+        Path: Path to the downloaded file.
+    """
+    with session.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        content_type: str = response.headers.get("Content-Type", "")
+        # If the session is not valid, the server returns the login page instead of the file
+        if content_type.startswith("text/html"):
+            raise Exception(f"Expected a file but received a html page from {url}")
+        dest: Path = reserve_file_path(
+            target_dir, get_filename_from_response(response, url, index)
+        )
+        part_file: Path = dest.with_name(dest.name + ".part")
+        try:
+            with open(part_file, "wb") as file:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    file.write(chunk)
+        except Exception:
+            # Do not leave an empty reserved file and a partial file in the folder
+            part_file.unlink(missing_ok=True)
+            dest.unlink(missing_ok=True)
+            raise
+    part_file.replace(dest)
+    return dest
+
+
+def download_attachments_concurrently(
+    session: requests.Session,
+    urls: list[str],
+    target_dir: Path,
+    max_workers: int = 8,
+) -> tuple[list[Path], list[str]]:
+    r"""Downloads all files from the "urls" list at the same time into the "target_dir" folder.
+    Writes to the log about each downloaded file as soon as it is received.
+
+    Args:
+        session (requests.Session): Session with the browser cookies.
+        urls (list[str]): List of links to files.
+        target_dir (Path): Folder to save the files.
+            For example:
+                Path(r"C:\Users\Human\Downloads\download_from_asite\A_L1_Plot_6")
+        max_workers (int, optional): Number of files downloaded at the same time. Defaults to 8.
+
+    Returns:
+        (downloaded, failed) tuple[list[Path], list[str]]: Paths to the downloaded files
+            and links of the files that could not be downloaded.
+    """
+    target_dir.mkdir(parents=True, exist_ok=True)
+    downloaded: list[Path] = []
+    failed: list[str] = []
+    start: float = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(download_attachment, session, url, target_dir, index): url
+            for index, url in enumerate(urls, start=1)
+        }
+        for future in as_completed(futures):
+            url: str = futures[future]
+            try:
+                photo: Path = future.result()
+                downloaded.append(photo)
+                logging.info(
+                    f"[{len(downloaded) + len(failed)}/{len(urls)}] Downloaded {photo.name} "
+                    f"({photo.stat().st_size} bytes) in {time.perf_counter() - start:.2f}s"
+                )
+            except Exception as err:
+                failed.append(url)
+                logging.info(f"Error downloading {url}: {err}")
+
+    logging.info(
+        f"Downloaded {len(downloaded)} of {len(urls)} files to {target_dir} "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    return (downloaded, failed)
+
+
+def clear_dir(target_dir: Path) -> None:
+    """Deletes the "target_dir" folder with all files and creates it again empty.
+    Needed so that files left over from the previous plot do not get into the current one.
+
+    Args:
+        target_dir (Path): Folder to clear.
+    """
+    if target_dir.exists():
+        shutil.rmtree(target_dir)
+    target_dir.mkdir(parents=True, exist_ok=True)
@@ -1,14 +1,9 @@
 # Importing Selenium WebDriver to interact with the browser
 import hashlib
 import logging
-import shutil
 import time
 from pathlib import Path
 
-import imagehash
-from PIL import Image
-from PIL.Image import Image as PILImage
-
 # from pprint import pprint
 from selenium import webdriver
 from selenium.webdriver.chrome.webdriver import WebDriver
@@ -20,7 +15,22 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
 from auth.decorators import check_session
+from auth.web_driver import is_production_mode
+from utils.downloader import reserve_file_path
+from utils.ingest_index import (
+    add_ingested_photo,
+    check_repeated_photo,
+    create_ingest_table,
+    get_ingest_stats,
+)
+from utils.lazy_import import lazy_import
+from utils.photo_store import move_photo
 from utils.scroll_to_element import scroll_down_to_element, scroll_up_to_element
+from utils.tracing import traced
+
+# Imported on the first hash of a photo: imagehash pulls in numpy and scipy
+imagehash = lazy_import("imagehash")
+Image = lazy_import("PIL.Image")
 
 # from pprint import pprint
 
@@ -36,6 +46,7 @@ def set_color_to_element(
 ) -> WebDriver:
     """Highlights the received element with color for 1 second.
     To control the script operation and for demonstration.
+    Does nothing in the production mode.
 
     Args:
         driver (WebDriver):
@@ -45,6 +56,8 @@ def set_color_to_element(
     Returns:
         WebDriver
     """
+    if is_production_mode():
+        return driver
     original_style = element.get_attribute("style")
     # Highlight the active element "element"
     driver.execute_script(
@@ -289,7 +302,7 @@ def create_sub_dir_in_dir(base_dir, sub_dir) -> None:
         create_sub_dir(plot_dir, sub_dir)
 
 
-def get_hash_photo_by_dhash(photo_path: Path) -> imagehash.ImageHash:
+def get_hash_photo_by_dhash(photo_path: Path) -> "imagehash.ImageHash":
     """The function receives the hash of the photo file and returns it.
 
     Args:
@@ -299,7 +312,7 @@ def get_hash_photo_by_dhash(photo_path: Path) -> imagehash.ImageHash:
         hash_photo(imagehash.ImageHash): Photo hash.
     """
     # Create a PILImage object of the photo
-    photo: PILImage = Image.open(str(photo_path))
+    photo: Image.Image = Image.open(str(photo_path))
     # Get hash for photo
     hash_photo: imagehash.ImageHash = imagehash.dhash(photo)
     return hash_photo
@@ -335,7 +348,7 @@ def get_hash_photo_by_pixel_plus_file_size(
     """
     # logging.info(f"{photo_path=}")
     # Open photo
-    image: PILImage = Image.open(photo_path).convert(mode)
+    image: Image.Image = Image.open(photo_path).convert(mode)
     # Change size of image to fixed size
     if resize_to:
         image = image.resize(resize_to)
@@ -381,6 +394,7 @@ def collect_photos_from_photo_dir(
 
 def transfer_files_received_from_whatsapp(
     rel_path_to_photo_from_whatsapp: Path,
+    name_database: str = "side_rise_database.db",
 ) -> None:
     r"""Move files from folder
     D:/WORK/Horand_LTD/TASKS_DOING_NOW/side_rise_download_photo_to_asite_point_2_3_refactor_ready/chats/Python dev chat/
@@ -388,10 +402,15 @@ def transfer_files_received_from_whatsapp(
     to folder
     D:\WORK\Horand_LTD\TASKS_DOING_NOW\side_rise_download_photo_to_asite_point_2_3_refactor_ready\image_sorter_ocr\pics
 
+    A photo that was already received (the same bytes, or the same picture sent to the other chat
+    or forwarded again) is moved to image_sorter_ocr/duplicates instead, so the OCR does not read it again.
+
     Args:
         path_to_photo_from_whatsapp (Path): Relative path to folder with photo from WhatsApp.
             For example:
                 Path(r"chats\Python dev chat")
+        name_database (str, optional): Name of file database with the index of the received photos.
+            Defaults to "side_rise_database.db".
     """
     # Project root folder
     current_dir: Path = Path.cwd()
@@ -401,18 +420,37 @@ def transfer_files_received_from_whatsapp(
         current_dir / rel_path_to_photo_from_whatsapp
     )
     photos: list[Path] = collect_photos_from_photo_dir(abs_path_to_photo_from_whatsapp)
+    create_ingest_table(name_database)
+    duplicates_dir: Path = current_dir / Path("image_sorter_ocr/duplicates")
+    duplicates_dir.mkdir(parents=True, exist_ok=True)
 
     for photo in photos:
+        try:
+            repeat, sha256, dhash = check_repeated_photo(photo, name_database=name_database)
+        except OSError as err:
+            # A photo that is still being written by WhatsApp is read on the next pass
+            logging.info(f"{photo.name} can not be read yet, skipped: {err}")
+            continue
+        if repeat is not None:
+            # Kept for a check by hand, but not sent to the OCR
+            # The copies of one photo often have the same name, a new name keeps the earlier ones
+            duplicate: Path = move_photo(photo, reserve_file_path(duplicates_dir, photo.name))
+            logging.info(f"{photo.name} is a repeat ({repeat[0]}) of {repeat[1]}, moved to {duplicate}")
+            continue
         dest: Path = current_dir / Path("image_sorter_ocr/pics") / photo.name
         logging.info(f"{dest=}")
         # Move photo "photo":
         # WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/side_rise_download_photo_to_asite_point_2_3_refactor_ready/chats/Python dev chat/Marius_175.jpg')
         # on the path "dest":
         # WindowsPath("D:\WORK\Horand_LTD\TASKS_DOING_NOW\side_rise_download_photo_to_asite_point_2_3_refactor_ready\image_sorter_ocr\pics")
-        shutil.move(str(photo), str(dest))
+        move_photo(photo, dest)
+        add_ingested_photo(sha256, dhash, photo.name, name_database)
         logging.info(f"\nMove {str(photo)} \nto {str(dest)}")
+    if photos:
+        logging.info(f"Ingest of the WhatsApp photos: {get_ingest_stats()}")
 
 
+@traced()
 def move_duplicate_photos_to_dir_double(
     base_dir: Path, dir_with_new_photo: Path
 ) -> None:
@@ -489,7 +527,7 @@ def move_duplicate_photos_to_dir_double(
                 dest: Path = plot_dir / Path(r"2.3\duplicated_photos") / path_photo.name
                 # logging.info(f"{dest=}")
                 # Move photo path_photo to path dest
-                shutil.move(str(path_photo), str(dest))
+                move_photo(path_photo, dest)
         # logging.info("\n\n")
 
 
@@ -577,9 +615,15 @@ def edit_or_create_inspection(
     btn_select_form_action_xpath: str = (
         f'//*[@id="table_body_content_scroller"]/div/div[{number_line}]/div/div[{column_number_side_rise}]/div/img'
     )
+    # In the production mode images of the table are blocked and the image button has no size
+    btn_condition = (
+        EC.presence_of_element_located
+        if is_production_mode()
+        else EC.visibility_of_element_located
+    )
     try:
         btn_select_form_action: WebElement | None = wait.until(
-            EC.visibility_of_element_located((By.XPATH, btn_select_form_action_xpath))
+            btn_condition((By.XPATH, btn_select_form_action_xpath))
         )
     except Exception:
         btn_select_form_action = None
@@ -0,0 +1,168 @@
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+from utils.photo_store import get_file_digest
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
+)
+
+# Only the photos with the same bytes (sha256) are repeats by default. INGEST_NEAR_REPEATS=1 also drops
+# the photos with a close dhash: a photo sent to both chats or forwarded again is recompressed by WhatsApp,
+# its bytes change, but its dhash stays. The dhash is a 9x8 thumbnail of the whole photo, so the photos
+# of the labels of two plots taken from the same place usually have the same dhash: the number of the plot
+# is far below its resolution, and the photo of the second plot would never reach the OCR
+INGEST_NEAR_REPEATS: bool = os.getenv("INGEST_NEAR_REPEATS", "0") == "1"
+# Largest number of different bits of the dhashes (64 bits) of two photos for them to be one photo.
+# 0 - only the same dhash
+INGEST_DHASH_DISTANCE: int = int(os.getenv("INGEST_DHASH_DISTANCE", "0"))
+
+# Photos seen by the ingest of this run, the repeats among them did not go to the OCR
+_ingest_stats: dict[str, int] = {"photos": 0, "exact": 0, "near": 0}
+_ingest_stats_lock: threading.Lock = threading.Lock()
+
+
+def create_ingest_table(name_database: str = "side_rise_database.db") -> None:
+    """Creates the table "ingested_photos" of the photos that came from the WhatsApp chats, if it does not exist.
+
+    TABLE ingested_photos:
+        sha256 TEXT PRIMARY KEY,
+        dhash TEXT NOT NULL,
+        filename TEXT NOT NULL,
+        ingested_at TIMESTAMP
+
+    Args:
+        name_database (str, optional): Name of file database. Defaults to "side_rise_database.db".
+    """
+    connection = sqlite3.connect(name_database)
+    connection.execute(
+        """CREATE TABLE IF NOT EXISTS ingested_photos (
+        sha256 TEXT PRIMARY KEY,
+        dhash TEXT NOT NULL,
+        filename TEXT NOT NULL,
+        ingested_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )"""
+    )
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_ingested_photos_dhash ON ingested_photos (dhash)")
+    connection.commit()
+    connection.close()
+
+
+def get_dhash_distance(dhash: str, other_dhash: str) -> int:
+    """Returns the number of different bits of two dhashes in hex.
+
+    For example:
+        get_dhash_distance("0f0f0f0f0f0f0f0f", "0f0f0f0f0f0f0f0e") -> 1
+    """
+    return bin(int(dhash, 16) ^ int(other_dhash, 16)).count("1")
+
+
+def find_ingested_photo(
+    sha256: str,
+    dhash: str | None,
+    max_distance: int = INGEST_DHASH_DISTANCE,
+    name_database: str = "side_rise_database.db",
+) -> tuple[str, str] | None:
+    """Looks for an ingested photo with the same bytes or, if the dhash is given, a close dhash.
+
+    Returns:
+        tuple[str, str] | None: Kind of the repeat ("exact" or "near") and the name of the first photo.
+            For example: ("near", "IMG-20250204-WA0036.jpg")
+    """
+    connection = sqlite3.connect(name_database)
+    try:
+        row = connection.execute(
+            "SELECT filename FROM ingested_photos WHERE sha256 = ?", (sha256,)
+        ).fetchone()
+        if row is not None:
+            return "exact", row[0]
+        if dhash is None:
+            return None
+        row = connection.execute(
+            "SELECT filename FROM ingested_photos WHERE dhash = ?", (dhash,)
+        ).fetchone()
+        if row is not None:
+            return "near", row[0]
+        if max_distance > 0:
+            for other_dhash, filename in connection.execute("SELECT dhash, filename FROM ingested_photos"):
+                if get_dhash_distance(dhash, other_dhash) <= max_distance:
+                    return "near", filename
+        return None
+    finally:
+        connection.close()
+
+
+def add_ingested_photo(
+    sha256: str, dhash: str, filename: str, name_database: str = "side_rise_database.db"
+) -> None:
+    """Records the photo moved to the OCR in the index of the ingest.
+    Call it only after the photo is moved to "pics": a photo that stayed in the chat folder
+    would be found in the index as a repeat of itself on the next pass.
+    """
+    connection = sqlite3.connect(name_database)
+    connection.execute(
+        "INSERT OR IGNORE INTO ingested_photos (sha256, dhash, filename) VALUES (?, ?, ?)",
+        (sha256, dhash, filename),
+    )
+    connection.commit()
+    connection.close()
+
+
+def check_repeated_photo(
+    photo: Path,
+    max_distance: int = INGEST_DHASH_DISTANCE,
+    name_database: str = "side_rise_database.db",
+    near_repeats: bool | None = None,
+) -> tuple[tuple[str, str] | None, str, str | None]:
+    """Checks whether the photo from a WhatsApp chat was already ingested: the same bytes (sha256)
+    or, if near repeats are turned on, the same picture recompressed by WhatsApp (dhash).
+    A new photo is not recorded here, pass its hashes to add_ingested_photo after it is moved to the OCR.
+    The photo is decoded for its dhash only if its bytes are new. The dhash is recorded
+    even without near repeats, so that they can be turned on with the history of the photos.
+
+    Args:
+        photo (Path): Photo in the folder of the chat.
+        max_distance (int, optional): Largest distance of the dhashes of one photo. Defaults to INGEST_DHASH_DISTANCE.
+        name_database (str, optional): Name of file database. Defaults to "side_rise_database.db".
+        near_repeats (bool | None, optional): Drop the photos with a close dhash too.
+            Defaults to None - INGEST_NEAR_REPEATS.
+
+    Raises:
+        OSError: The photo can not be read or decoded, for example it is still being written
+            (PIL.UnidentifiedImageError is an OSError too).
+
+    Returns:
+        tuple[tuple[str, str] | None, str, str | None]: Kind of the repeat and the name of the first photo
+            (None for a new photo), the sha256 and the dhash of the photo (None for an exact repeat).
+            For example: (("exact", "Marius_175.jpg"), "4ef74692c099...", None)
+    """
+    # utils.helpers imports this module
+    from utils.helpers import get_hash_photo_by_dhash
+
+    sha256: str = get_file_digest(photo)
+    dhash: str | None = None
+    repeat: tuple[str, str] | None = find_ingested_photo(sha256, None, max_distance, name_database)
+    if repeat is None:
+        dhash = str(get_hash_photo_by_dhash(photo))
+        if INGEST_NEAR_REPEATS if near_repeats is None else near_repeats:
+            repeat = find_ingested_photo(sha256, dhash, max_distance, name_database)
+    with _ingest_stats_lock:
+        _ingest_stats["photos"] += 1
+        if repeat is not None:
+            _ingest_stats[repeat[0]] += 1
+    return repeat, sha256, dhash
+
+
+def get_ingest_stats() -> dict:
+    """Returns the counters of the ingest of this run.
+
+    Returns:
+        dict: For example: {"photos": 40, "exact": 3, "near": 2, "ocr_calls_avoided": 5}
+    """
+    with _ingest_stats_lock:
+        stats: dict = dict(_ingest_stats)
+    stats["ocr_calls_avoided"] = stats["exact"] + stats["near"]
+    return stats
@@ -0,0 +1,38 @@
+import importlib.util
+import sys
+import types
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Returns the module, which is executed on the first access to its attribute.
+    The heavy dependencies (easyocr with torch, selenium, PIL) take seconds to import,
+    so the runs that do not use them (python main.py --mode report) do not wait for them.
+
+    The proxy is put into sys.modules, so "import name" in other modules returns the same module
+    and executes it on the first access too. Only "import name" is lazy, "from name import x" executes it.
+
+    Args:
+        name (str): Full name of the module.
+            For example:
+                "image_sorter_ocr.OCR.easy_ocr_type_2"
+
+    Returns:
+        types.ModuleType: For example:
+            easy_ocr = lazy_import("image_sorter_ocr.OCR.easy_ocr_type_2")
+            easy_ocr.main()  # easyocr and torch are imported here
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module: types.ModuleType = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    # The parent package gets the module as its attribute, as after a usual import
+    parent_name, _, child_name = name.rpartition(".")
+    if parent_name:
+        setattr(sys.modules[parent_name], child_name, module)
+    return module
@@ -1,10 +1,10 @@
 import logging
-import shutil
 from pathlib import Path
 from pprint import pprint
 
 from core.forms import get_list_photos_from_download_dir_os
 from utils.helpers import collect_photos_from_photo_dir, find_plot_dirs
+from utils.photo_store import move_photo
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
@@ -53,7 +53,7 @@ def move_photos_sorted_to_side_rise_structure(base_dir: Path, target_path: Path)
             # WindowsPath('D:/WORK/Horand_LTD/TASKS_DOING_NOW/side_rise_download_photo_to_asite_point_2_3_refactor_ready/image_sorter_ocr/sorted/B_L1_Plot_100/DFKV5430.JPG')
             # on the path "dest":
             # WindowsPath("D:\WORK\Horand_LTD\TASK TO DO\Locations with data for inspections\SideRise\B_L1_Plot_100\2.3\new_photos_send_to_asite")
-            shutil.move(str(photo), str(dest))
+            move_photo(photo, dest)
             logging.info(f"\nMove {str(photo)} \nto {str(dest)}")
         plot_dir.rmdir()
         # break
@@ -0,0 +1,212 @@
+import hashlib
+import logging
+import os
+import shutil
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from PIL import Image, ImageOps
+from PIL.Image import Image as PILImage
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
+)
+
+# Thread pool in which photos are recompressed while the browser is busy with navigation
+_executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=4)
+# Recompression started in advance for each plot: block_level_plot -> Future
+_prepared_photos: dict[str, Future] = {}
+
+
+def get_recompress_settings() -> dict[str, str | int | bool]:
+    """Reads the settings of photo recompression from the environment variables.
+
+        PHOTO_RECOMPRESS - "1" to recompress photos before upload. Defaults to "0".
+        PHOTO_MAX_DIMENSION - maximum width or height of the photo in pixels. Defaults to 2048.
+        PHOTO_JPEG_QUALITY - JPEG quality from 1 to 95. Defaults to 85.
+        PHOTO_CACHE_DIR - folder for recompressed photos. Defaults to "photo_cache".
+
+    Returns:
+        dict[str, str | int | bool]:
+            For example:
+                {"enabled": True, "max_dimension": 2048, "quality": 85, "cache_dir": "photo_cache"}
+    """
+    return {
+        "enabled": os.getenv("PHOTO_RECOMPRESS", "0") == "1",
+        "max_dimension": int(os.getenv("PHOTO_MAX_DIMENSION", "2048")),
+        "quality": int(os.getenv("PHOTO_JPEG_QUALITY", "85")),
+        "cache_dir": os.getenv("PHOTO_CACHE_DIR", "photo_cache"),
+    }
+
+
+def get_content_hash(photo: Path) -> str:
+    """Calculates the sha256 hash of the bytes of the photo file.
+
+    Args:
+        photo (Path): Path to the photo.
+
+    Returns:
+        str:
+            For example:
+                '4ef74692c099ff52838a320d7d6ec5e044daf329c0802e5991c207df9a2559ad'
+    """
+    hash_func = hashlib.sha256()
+    with open(photo, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            hash_func.update(chunk)
+    return hash_func.hexdigest()
+
+
+def recompress_photo(
+    photo: Path, cache_dir: Path, max_dimension: int = 2048, quality: int = 85
+) -> Path:
+    """Reduces the photo to "max_dimension" on the longest side and saves it as JPEG with "quality".
+    The photo is rotated according to the EXIF orientation, the rest of EXIF is kept.
+    The result is saved in the cache folder by the hash of the content of the photo
+    and keeps the original file name, so the same photo is never recompressed twice.
+    If the recompressed photo is not smaller than the original, the original is returned.
+
+    Args:
+        photo (Path): Path to the photo.
+        cache_dir (Path): Folder for recompressed photos.
+        max_dimension (int, optional): Maximum width or height in pixels. Defaults to 2048.
+        quality (int, optional): JPEG quality. Defaults to 85.
+
+    Returns:
+        Path: Path to the photo that should be uploaded.
+            For example:
+                WindowsPath('photo_cache/4ef74692c099ff52_2048_85/WhatsApp Image 2025-04-29 at 16.00.05_71d3d084.jpg')
+    """
+    key: str = f"{get_content_hash(photo)}_{max_dimension}_{quality}"
+    dest: Path = cache_dir / key / photo.name
+    if dest.exists():
+        return dest if dest.stat().st_size < photo.stat().st_size else photo
+
+    image: PILImage = Image.open(photo)
+    # Rotate the pixels according to EXIF, the orientation tag is reset
+    image = ImageOps.exif_transpose(image)
+    exif = image.getexif()
+    image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    part_file: Path = dest.with_name(dest.name + ".part")
+    image.save(part_file, "JPEG", quality=quality, optimize=True, exif=exif)
+    part_file.replace(dest)
+    return dest if dest.stat().st_size < photo.stat().st_size else photo
+
+
+def remove_cached_photos(photos: list[Path]) -> int:
+    """Deletes the recompressed copies of the photos from the cache folder, with any settings.
+    Called when the photos of the plot are moved to photos_on_asite: they are not uploaded again,
+    and without it the cache grows with every uploaded photo.
+
+    Args:
+        photos (list[Path]): Original photos, before they are moved.
+
+    Returns:
+        int: Number of deleted folders of the cache.
+    """
+    cache_dir: Path = Path(get_recompress_settings()["cache_dir"])
+    if not cache_dir.is_dir():
+        return 0
+    deleted: int = 0
+    for photo in photos:
+        try:
+            # The folders of the photo are named by its hash and the settings: "4ef74692c099..._2048_85"
+            for cached_dir in cache_dir.glob(f"{get_content_hash(photo)}_*"):
+                shutil.rmtree(cached_dir)
+                deleted += 1
+        except OSError as err:
+            logging.info(f"Error removing the recompressed copy of {photo}: {err}")
+    return deleted
+
+
+def recompress_photos(photos: list[Path]) -> dict[Path, Path]:
+    """Recompresses the list of photos with the settings from get_recompress_settings.
+    If recompression is disabled or failed for a photo, the original photo is used.
+
+    Args:
+        photos (list[Path]): Photos to upload.
+
+    Returns:
+        dict[Path, Path]: Original photo -> photo that should be uploaded.
+    """
+    settings = get_recompress_settings()
+    photos_for_upload: dict[Path, Path] = {}
+    for photo in photos:
+        if not settings["enabled"]:
+            photos_for_upload[photo] = photo
+            continue
+        try:
+            photos_for_upload[photo] = recompress_photo(
+                photo,
+                Path(settings["cache_dir"]),
+                settings["max_dimension"],
+                settings["quality"],
+            )
+        except Exception as err:
+            logging.info(f"Error recompressing photo {photo}: {err}")
+            photos_for_upload[photo] = photo
+    return photos_for_upload
+
+
+def prepare_photos_for_upload(block_level_plot: str, photos: list[Path]) -> None:
+    """Starts recompression of the photos of the plot in the thread pool,
+    so that it runs while the browser is opening the inspection form.
+
+    Args:
+        block_level_plot (str): The apartment code adopted in this project.
+            For example:
+                "A_L1_Plot_1"
+        photos (list[Path]): New photos of the plot.
+    """
+    if not get_recompress_settings()["enabled"] or block_level_plot in _prepared_photos:
+        return
+    _prepared_photos[block_level_plot] = _executor.submit(recompress_photos, list(photos))
+
+
+def get_photos_for_upload(block_level_plot: str, photos: list[Path]) -> dict[Path, Path]:
+    """Returns the photos that should be uploaded instead of "photos".
+    Waits for the recompression started by prepare_photos_for_upload or does it now.
+
+    Args:
+        block_level_plot (str): The apartment code adopted in this project.
+            For example:
+                "A_L1_Plot_1"
+        photos (list[Path]): New photos of the plot that are left after removing duplicates.
+
+    Returns:
+        dict[Path, Path]: Original photo -> photo that should be uploaded.
+    """
+    future: Future | None = _prepared_photos.pop(block_level_plot, None)
+    prepared: dict[Path, Path] = future.result() if future else {}
+    missing: list[Path] = [photo for photo in photos if photo not in prepared]
+    prepared.update(recompress_photos(missing))
+    return {photo: prepared[photo] for photo in photos}
+
+
+def log_recompression_savings(
+    block_level_plot: str, photos_for_upload: dict[Path, Path], upload_seconds: float
+) -> None:
+    """Writes to the log how many bytes were saved by recompression of the photos of the plot
+    and how much upload time was saved, estimated by the measured upload speed.
+
+    Args:
+        block_level_plot (str): The apartment code adopted in this project.
+        photos_for_upload (dict[Path, Path]): Original photo -> uploaded photo.
+        upload_seconds (float): Time of uploading the photos in seconds.
+    """
+    original_bytes: int = sum(photo.stat().st_size for photo in photos_for_upload)
+    uploaded_bytes: int = sum(photo.stat().st_size for photo in photos_for_upload.values())
+    saved_bytes: int = original_bytes - uploaded_bytes
+    if not saved_bytes or not uploaded_bytes:
+        return
+    # Upload speed in bytes per second
+    speed: float = uploaded_bytes / max(upload_seconds, 0.001)
+    logging.info(
+        f"{block_level_plot}: uploaded {uploaded_bytes} bytes instead of {original_bytes}, "
+        f"saved {saved_bytes} bytes ({saved_bytes / original_bytes:.0%}) "
+        f"and about {saved_bytes / speed:.1f}s of upload time."
+    )
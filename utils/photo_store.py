@@ -0,0 +1,159 @@
+import errno
+import hashlib
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
+)
+
+# Folder of the store in base_dir. find_plot_dirs skips it: its name has no "plot"
+PHOTO_STORE_DIR_NAME: str = ".photo_store"
+
+# Folder of the store of the run, None - the store is not used
+_store: dict[str, Path | None] = {"dir": None}
+_store_lock: threading.Lock = threading.Lock()
+
+
+def configure_photo_store(store_dir: Path | None) -> None:
+    r"""Sets the folder of the content-addressed store of the photos.
+    The store must be on the volume of the folders of the plots, for example:
+        D:\WORK\Horand_LTD\TASK TO DO\Locations with data for inspections\SideRise\.photo_store
+
+    Args:
+        store_dir (Path | None): Folder of the store. None - the photos are moved without the store.
+    """
+    if store_dir is not None:
+        store_dir.mkdir(parents=True, exist_ok=True)
+    with _store_lock:
+        _store["dir"] = store_dir
+    logging.info(f"Photo store: {store_dir}")
+
+
+def get_file_digest(photo: Path) -> str:
+    """Returns the sha256 of the bytes of the file.
+
+    Returns:
+        str: For example: "4ef74692c099ff52838a320d7d6ec5e044daf329c0802e5991c207df9a2559ad"
+    """
+    hash_func = hashlib.sha256()
+    with open(photo, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            hash_func.update(chunk)
+    return hash_func.hexdigest()
+
+
+def get_blob_path(store_dir: Path, digest: str) -> Path:
+    r"""Returns the path of the bytes of the photo in the store: store_dir\4e\4ef74692c099..."""
+    return store_dir / digest[:2] / digest
+
+
+def is_same_volume(path: Path, other_path: Path) -> bool:
+    """Checks whether two existing paths are on the same volume, where a hard link can be made."""
+    return os.stat(path).st_dev == os.stat(other_path).st_dev
+
+
+def copy_to_store(photo: Path, store_dir: Path) -> Path:
+    """Copies the photo from another volume into the store, reading it once for the copy and the hash.
+    If the store already has the same bytes, the copy is deleted and the existing blob is returned.
+
+    Returns:
+        Path: The blob of the photo.
+    """
+    hash_func = hashlib.sha256()
+    tmp_path: Path = store_dir / f"{photo.name}.{threading.get_ident()}.tmp"
+    with open(photo, "rb") as source, open(tmp_path, "wb") as target:
+        for chunk in iter(lambda: source.read(1024 * 1024), b""):
+            hash_func.update(chunk)
+            target.write(chunk)
+    shutil.copystat(photo, tmp_path)
+    blob: Path = get_blob_path(store_dir, hash_func.hexdigest())
+    blob.parent.mkdir(exist_ok=True)
+    if blob.exists():
+        tmp_path.unlink()
+    else:
+        os.replace(tmp_path, blob)
+    return blob
+
+
+def add_photo_to_store(photo: Path) -> Path | None:
+    """Puts the bytes of the photo into the store once. A photo on the volume of the store becomes
+    a hard link of its blob: a new blob is the photo itself, a duplicate of a photo already in the store
+    is replaced with a link of that blob, so its bytes are kept once.
+
+    Args:
+        photo (Path): For example: Path(r"C:\\Users\\Human\\Downloads\\download_from_asite\\APIM8352.JPG")
+
+    Returns:
+        Path | None: The blob of the photo. None if the store is not configured.
+    """
+    store_dir: Path | None = _store["dir"]
+    if store_dir is None:
+        return None
+    if not is_same_volume(photo, store_dir):
+        return copy_to_store(photo, store_dir)
+    blob: Path = get_blob_path(store_dir, get_file_digest(photo))
+    blob.parent.mkdir(exist_ok=True)
+    try:
+        os.link(photo, blob)
+    except FileExistsError:
+        if not os.path.samefile(photo, blob):
+            # The same bytes are already in the store: the photo becomes one more link of them
+            tmp_path: Path = photo.with_name(photo.name + ".tmp")
+            os.link(blob, tmp_path)
+            os.replace(tmp_path, photo)
+    return blob
+
+
+def move_photo(photo: Path, dest: Path) -> Path:
+    r"""Moves the photo to "dest". On the same volume only the entry of the directory changes (os.replace).
+    A move to another volume, for example from C:\Users\Human\Downloads to the folders of the plots on D:,
+    copies the bytes into the store only if the store does not have them yet, and "dest" becomes
+    a hard link of the blob. Without the store, shutil.move copies the photo as before.
+
+    Args:
+        photo (Path): Photo to move.
+        dest (Path): New path of the photo, an existing file is replaced.
+
+    Returns:
+        Path: "dest".
+    """
+    try:
+        os.replace(photo, dest)
+        return dest
+    except OSError as err:
+        # Windows error ERROR_NOT_SAME_DEVICE is also reported as EXDEV
+        if err.errno != errno.EXDEV:
+            raise
+    store_dir: Path | None = _store["dir"]
+    if store_dir is None or not is_same_volume(dest.parent, store_dir):
+        shutil.move(str(photo), str(dest))
+        return dest
+    blob: Path = add_photo_to_store(photo)
+    tmp_path: Path = dest.with_name(dest.name + ".tmp")
+    os.link(blob, tmp_path)
+    os.replace(tmp_path, dest)
+    photo.unlink()
+    return dest
+
+
+def prune_photo_store() -> int:
+    """Deletes the blobs that are not linked from any folder any more (the photos were deleted).
+
+    Returns:
+        int: Number of deleted blobs.
+    """
+    store_dir: Path | None = _store["dir"]
+    if store_dir is None:
+        return 0
+    deleted: int = 0
+    for blob in store_dir.glob("*/*"):
+        if blob.is_file() and blob.stat().st_nlink == 1:
+            blob.unlink()
+            deleted += 1
+    if deleted:
+        logging.info(f"Photo store: {deleted} blobs without photos are deleted")
+    return deleted
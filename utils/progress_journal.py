@@ -0,0 +1,185 @@
+import hashlib
+import logging
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from utils.tracing import traced
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
+)
+
+# States of a plot in the order of its processing. "failed" - the last attempt raised an error
+PLOT_STATES: tuple[str, ...] = ("queued", "downloaded", "deduped", "uploaded", "saved", "failed")
+
+
+def create_progress_table(name_database: str = "side_rise_database.db") -> None:
+    """Creates the table "plot_progress" of the progress journal if it does not exist.
+
+    TABLE plot_progress:
+        block_level_plot TEXT PRIMARY KEY,
+        state TEXT NOT NULL,
+        signature TEXT,
+        attempts INTEGER NOT NULL,
+        error TEXT,
+        updated_at TIMESTAMP
+
+    Args:
+        name_database (str, optional): Name of file database. Defaults to "side_rise_database.db".
+    """
+    connection = sqlite3.connect(name_database)
+    connection.execute(
+        """CREATE TABLE IF NOT EXISTS plot_progress (
+        block_level_plot TEXT PRIMARY KEY,
+        state TEXT NOT NULL,
+        signature TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )"""
+    )
+    connection.commit()
+    connection.close()
+
+
+def get_photos_signature(photos: list[Path]) -> str:
+    """Returns a signature of a set of photos built from their names and sizes.
+    The same photos give the same signature in any order.
+
+    Args:
+        photos (list[Path]): Photos of a plot.
+
+    Returns:
+        str: For example: "9a0364b9e99bb480dd25e1f0284c8555"
+    """
+    hash_func = hashlib.md5()
+    for photo in sorted(photos, key=lambda photo: photo.name):
+        hash_func.update(f"{photo.name}:{photo.stat().st_size}\n".encode())
+    return hash_func.hexdigest()
+
+
+@traced()
+def set_plot_state(
+    block_level_plot: str,
+    state: str,
+    signature: str | None = None,
+    error: str | None = None,
+    name_database: str = "side_rise_database.db",
+) -> None:
+    """Records the state of the plot. The signature is kept if a new one is not given.
+
+    Args:
+        block_level_plot (str): The apartment code. For example: "A_L1_Plot_1"
+        state (str): One of PLOT_STATES.
+        signature (str | None, optional): Signature of the photos of the plot. Defaults to None.
+        error (str | None, optional): Error of the "failed" state. Defaults to None.
+        name_database (str, optional): Name of file database. Defaults to "side_rise_database.db".
+    """
+    if state not in PLOT_STATES:
+        raise ValueError(f"Unknown state of the plot: {state}")
+    connection = sqlite3.connect(name_database)
+    connection.execute(
+        """INSERT INTO plot_progress (block_level_plot, state, signature, attempts, error, updated_at)
+        VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(block_level_plot) DO UPDATE SET
+            state = excluded.state,
+            signature = COALESCE(excluded.signature, plot_progress.signature),
+            attempts = plot_progress.attempts + excluded.attempts,
+            error = excluded.error,
+            updated_at = CURRENT_TIMESTAMP""",
+        (block_level_plot, state, signature, 1 if state == "queued" else 0, error),
+    )
+    connection.commit()
+    connection.close()
+
+
+def get_plot_progress(
+    block_level_plot: str, name_database: str = "side_rise_database.db"
+) -> dict | None:
+    """Returns the record of the plot in the progress journal.
+
+    Returns:
+        dict | None:
+            For example:
+                {"state": "saved", "signature": "9a0364b9...", "attempts": 1, "error": None}
+    """
+    connection = sqlite3.connect(name_database)
+    row = connection.execute(
+        "SELECT state, signature, attempts, error FROM plot_progress WHERE block_level_plot = ?",
+        (block_level_plot,),
+    ).fetchone()
+    connection.close()
+    if row is None:
+        return None
+    return dict(zip(("state", "signature", "attempts", "error"), row))
+
+
+def count_plots_by_state(name_database: str = "side_rise_database.db") -> dict[str, int]:
+    """Returns the number of plots in each state of the progress journal.
+
+    Returns:
+        dict[str, int]: For example: {"saved": 120, "failed": 2}
+    """
+    connection = sqlite3.connect(name_database)
+    rows = connection.execute(
+        "SELECT state, COUNT(*) FROM plot_progress GROUP BY state ORDER BY state"
+    ).fetchall()
+    connection.close()
+    return dict(rows)
+
+
+def queue_plots(
+    dict_plots_with_new_photos: dict[str, list[Path]],
+    name_database: str = "side_rise_database.db",
+) -> tuple[dict[str, list[Path]], dict[str, list[Path]]]:
+    """Separates the plots whose current new photos have already been saved on the asite
+    (the previous run stopped after saving the form, but before moving the photos)
+    from the plots that must be processed. The plots to process are recorded as "queued".
+
+    Args:
+        dict_plots_with_new_photos (dict[str, list[Path]]): Apartment code -> list with new photos.
+        name_database (str, optional): Name of file database. Defaults to "side_rise_database.db".
+
+    Returns:
+        (plots_to_process, plots_already_saved) tuple[dict[str, list[Path]], dict[str, list[Path]]]
+    """
+    plots_to_process: dict[str, list[Path]] = {}
+    plots_already_saved: dict[str, list[Path]] = {}
+    for block_level_plot, photos in dict_plots_with_new_photos.items():
+        progress: dict | None = get_plot_progress(block_level_plot, name_database)
+        if (
+            progress is not None
+            and progress["state"] == "saved"
+            and progress["signature"] == get_photos_signature(photos)
+        ):
+            plots_already_saved[block_level_plot] = photos
+            continue
+        if progress is not None and progress["state"] not in ("saved", "queued"):
+            logging.info(
+                f"Retry {block_level_plot}: the previous attempt stopped in the state "
+                f"{progress['state']} {progress['error'] or ''}"
+            )
+        set_plot_state(block_level_plot, "queued", name_database=name_database)
+        plots_to_process[block_level_plot] = photos
+    if plots_already_saved:
+        logging.info(f"Already saved on the asite: {sorted(plots_already_saved)}")
+    return (plots_to_process, plots_already_saved)
+
+
+@contextmanager
+def track_plot_failure(
+    block_level_plot: str, name_database: str = "side_rise_database.db"
+) -> Iterator[None]:
+    """Records the plot as "failed" with the error if the processing of the plot raises an error.
+
+    Args:
+        block_level_plot (str): The apartment code. For example: "A_L1_Plot_1"
+        name_database (str, optional): Name of file database. Defaults to "side_rise_database.db".
+    """
+    try:
+        yield
+    except Exception as err:
+        set_plot_state(block_level_plot, "failed", error=repr(err)[:500], name_database=name_database)
+        raise
@@ -0,0 +1,113 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from pathlib import Path
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
+)
+
+# Attributes of a record that are written to the JSON line if they are passed with "extra"
+EXTRA_FIELDS: tuple[str, ...] = ("photo", "plot", "stage")
+# Loggers that are written only to the file, without the console. For example, the details of the OCR of each image
+FILE_ONLY_LOGGERS: tuple[str, ...] = ("ocr",)
+
+# The listener that writes the records of all loggers to the file in its own thread
+_logging_state: dict = {"listener": None, "handler": None}
+_logging_lock: threading.Lock = threading.Lock()
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Formats a record as one JSON line.
+
+    For example:
+        {"time": "2025-05-14 10:21:07,512", "level": "INFO", "logger": "ocr",
+         "message": "Moved to folder B_L1_Plot_100", "photo": "DFKV5430.JPG", "plot": "B_L1_Plot_100"}
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        line: dict = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in EXTRA_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                line[field] = str(value)
+        if record.exc_info:
+            line["exception"] = self.formatException(record.exc_info)
+        return json.dumps(line, ensure_ascii=False)
+
+
+def setup_structured_logging(
+    log_file: Path | None = None,
+    level: str | None = None,
+    max_bytes: int = 10 * 1024 * 1024,
+    backup_count: int = 5,
+) -> logging.handlers.QueueListener:
+    """Writes the records of all loggers as JSON lines to a rotated file.
+    The loggers only put the records into a queue, the file is written by a separate thread,
+    so that a record does not open and flush the file in the loop of the images or the plots.
+    The records below the level are dropped before they are formatted.
+    Calling the function again returns the running listener.
+
+    Args:
+        log_file (Path | None, optional): Defaults to None - environment variable LOG_FILE or "logs/run.jsonl".
+        level (str | None, optional): Defaults to None - environment variable LOG_LEVEL or "INFO".
+        max_bytes (int, optional): Size of the file after which it is rotated. Defaults to 10 MB.
+        backup_count (int, optional): Number of kept rotated files. Defaults to 5.
+
+    Returns:
+        logging.handlers.QueueListener
+    """
+    with _logging_lock:
+        if _logging_state["listener"] is not None:
+            return _logging_state["listener"]
+        log_file = log_file or Path(os.getenv("LOG_FILE", Path("logs") / "run.jsonl"))
+        level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        file_handler.setFormatter(JsonLinesFormatter())
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+
+        root_logger = logging.getLogger()
+        root_logger.setLevel(level)
+        root_logger.addHandler(queue_handler)
+        for name in FILE_ONLY_LOGGERS:
+            file_only_logger = logging.getLogger(name)
+            file_only_logger.propagate = False
+            file_only_logger.addHandler(queue_handler)
+
+        listener = logging.handlers.QueueListener(log_queue, file_handler)
+        listener.start()
+        # Write the records left in the queue when the script stops
+        atexit.register(stop_structured_logging)
+        _logging_state["listener"] = listener
+        _logging_state["handler"] = queue_handler
+        logging.info(f"Logs are written to {log_file} with the level {level}")
+        return listener
+
+
+def stop_structured_logging() -> None:
+    """Writes the records left in the queue to the file and stops the listener."""
+    with _logging_lock:
+        listener: logging.handlers.QueueListener | None = _logging_state["listener"]
+        if listener is None:
+            return
+        logging.getLogger().removeHandler(_logging_state["handler"])
+        for name in FILE_ONLY_LOGGERS:
+            logging.getLogger(name).removeHandler(_logging_state["handler"])
+            logging.getLogger(name).propagate = True
+        listener.stop()
+        _logging_state["listener"] = None
+        _logging_state["handler"] = None
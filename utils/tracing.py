@@ -0,0 +1,157 @@
+import inspect
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s"
+)
+
+# Tracing is switched off with the environment variable TRACING=0
+TRACING_ENABLED: bool = os.getenv("TRACING", "1") != "0"
+# The last spans of the run. Old spans are dropped, so that a long run does not grow in memory
+_spans: deque = deque(maxlen=int(os.getenv("TRACING_MAX_SPANS", "200000")))
+_spans_lock: threading.Lock = threading.Lock()
+# Start of the time axis of the trace
+_trace_start: float = time.perf_counter()
+
+
+@contextmanager
+def span(name: str, plot: str | None = None, **attrs) -> Iterator[None]:
+    """Measures the duration of the block of code and records it as a span.
+
+    Args:
+        name (str): Name of the step. For example: "ocr" or "processs_form_qc4j_side_rise_rain_screen_firebreak"
+        plot (str | None, optional): The apartment code. For example: "A_L1_Plot_1". Defaults to None.
+        **attrs: Other attributes of the span shown in the trace.
+
+    Example:
+        with span("dedup", plot=block_level_plot):
+            ...
+    """
+    if not TRACING_ENABLED:
+        yield
+        return
+    start: float = time.perf_counter()
+    try:
+        yield
+    finally:
+        end: float = time.perf_counter()
+        if plot is not None:
+            attrs["plot"] = plot
+        with _spans_lock:
+            _spans.append((name, start, end, threading.get_ident(), attrs))
+
+
+def traced(name: str | None = None, plot_argument: str = "block_level_plot"):
+    """DECORATOR that records each call of the function as a span.
+    The apartment code is taken from the argument "plot_argument" of the function, if it has one.
+
+    Args:
+        name (str | None, optional): Name of the span. Defaults to None - the name of the function.
+        plot_argument (str, optional): Argument with the apartment code. Defaults to "block_level_plot".
+    """
+
+    def decorator(func):
+        span_name: str = name or func.__name__
+        parameters: list[str] = list(inspect.signature(func).parameters)
+        plot_index: int | None = (
+            parameters.index(plot_argument) if plot_argument in parameters else None
+        )
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            plot: str | None = kwargs.get(plot_argument)
+            if plot is None and plot_index is not None and plot_index < len(args):
+                plot = args[plot_index]
+            with span(span_name, plot=plot):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def get_span_summary() -> dict[str, dict[str, float]]:
+    """Returns the number of calls, the total time and the percentiles of the duration of each step.
+
+    Returns:
+        dict[str, dict[str, float]]: Durations are in seconds.
+            For example:
+                {"edit_form": {"count": 12, "total": 240.5, "p50": 18.2, "p95": 31.0, "p99": 33.4}}
+    """
+    with _spans_lock:
+        spans: list = list(_spans)
+    durations: dict[str, list[float]] = {}
+    for name, start, end, _, _ in spans:
+        durations.setdefault(name, []).append(end - start)
+    summary: dict[str, dict[str, float]] = {}
+    for name, values in durations.items():
+        if len(values) > 1:
+            percentiles: list[float] = statistics.quantiles(values, n=100, method="inclusive")
+            p50, p95, p99 = percentiles[49], percentiles[94], percentiles[98]
+        else:
+            p50 = p95 = p99 = values[0]
+        summary[name] = {
+            "count": len(values),
+            "total": sum(values),
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+        }
+    return dict(sorted(summary.items(), key=lambda item: item[1]["total"], reverse=True))
+
+
+def log_span_summary() -> None:
+    """Logs the summary of the steps sorted by the total time, the slowest steps first."""
+    summary: dict[str, dict[str, float]] = get_span_summary()
+    if not summary:
+        return
+    lines: list[str] = [
+        f"{'step':<70}{'count':>7}{'total, s':>10}{'p50':>8}{'p95':>8}{'p99':>8}"
+    ]
+    for name, values in summary.items():
+        lines.append(
+            f"{name:<70}{values['count']:>7}{values['total']:>10.1f}"
+            f"{values['p50']:>8.2f}{values['p95']:>8.2f}{values['p99']:>8.2f}"
+        )
+    logging.info("Trace summary:\n" + "\n".join(lines))
+
+
+def export_chrome_trace(trace_file: Path | None = None) -> Path:
+    """Saves the spans in the Chrome trace format. The file is opened in chrome://tracing or https://ui.perfetto.dev
+
+    Args:
+        trace_file (Path | None, optional): Defaults to None - environment variable TRACE_FILE or "trace.json".
+
+    Returns:
+        Path: The saved file.
+    """
+    trace_file = trace_file or Path(os.getenv("TRACE_FILE", "trace.json"))
+    with _spans_lock:
+        spans: list = list(_spans)
+    pid: int = os.getpid()
+    events: list[dict] = [
+        {
+            "name": name,
+            "cat": attrs.get("plot", "run"),
+            "ph": "X",
+            "ts": (start - _trace_start) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": pid,
+            "tid": thread_id,
+            "args": {key: str(value) for key, value in attrs.items()},
+        }
+        for name, start, end, thread_id, attrs in spans
+    ]
+    trace_file.write_text(json.dumps({"traceEvents": events}), encoding="utf-8")
+    logging.info(f"Saved {len(events)} spans to {trace_file}")
+    return trace_file